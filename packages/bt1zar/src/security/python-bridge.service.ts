@@ -1,7 +1,9 @@
 import { Injectable, Logger, OnModuleInit } from '@nestjs/common';
 import { ConfigService } from '@nestjs/config';
 import { HttpService } from '@nestjs/axios';
-import { firstValueFrom, timeout, catchError } from 'rxjs';
+import { AxiosRequestConfig } from 'axios';
+import { decode as decodeMsgpack } from '@msgpack/msgpack';
+import { firstValueFrom, timeout, catchError, map, Observable } from 'rxjs';
 import {
   PathValidationRequest,
   PathValidationResponse,
@@ -9,9 +11,24 @@ import {
   CodeValidationResponse,
   CodeExecutionRequest,
   CodeExecutionResponse,
+  CodeExecutionOutputEvent,
+  CodeExecutionStreamEvent,
   SecurityVulnerability,
+  PathBatchValidationRequest,
+  PathBatchValidationResponse,
+  CodeBatchValidationRequest,
+  CodeBatchValidationResponse,
+  CodeValidationStreamEvent,
+  CodeValidationStreamResult,
+  FileValidationRequest,
+  FileListRequest,
+  FileListResponse,
 } from '../types/security.types';
 
+const MSGPACK_MEDIA_TYPE = 'application/msgpack';
+// Prefer MessagePack; the sidecar answers in JSON when it cannot (and for errors)
+const NEGOTIATED_ACCEPT = `${MSGPACK_MEDIA_TYPE}, application/json;q=0.9`;
+
 /**
  * PythonSecurityBridge - HTTP bridge to Python sidecar
  *
@@ -27,6 +44,8 @@ export class PythonSecurityBridge implements OnModuleInit {
   private readonly logger = new Logger(PythonSecurityBridge.name);
   private sidecarUrl: string;
   private readonly defaultTimeout = 30000; // 30 seconds
+  private readonly msgpackResponses: boolean;
+  private readonly socketPath?: string;
 
   constructor(
     private readonly httpService: HttpService,
@@ -35,20 +54,70 @@ export class PythonSecurityBridge implements OnModuleInit {
     this.sidecarUrl =
       this.configService.get<string>('PYTHON_SIDECAR_URL') ||
       'http://localhost:8766';
+    this.msgpackResponses =
+      this.configService.get<string>('PYTHON_SIDECAR_MSGPACK') !== 'false';
+    // A co-located sidecar can be reached over its Unix socket instead of TCP
+    this.socketPath =
+      this.configService.get<string>('PYTHON_SIDECAR_SOCKET') || undefined;
   }
 
   async onModuleInit() {
-    this.logger.log(`Python security bridge initialized: ${this.sidecarUrl}`);
+    this.logger.log(
+      `Python security bridge initialized: ${this.socketPath ?? this.sidecarUrl}`,
+    );
     await this.checkHealth();
   }
 
+  /**
+   * Per-request axios options, routed through the Unix socket when configured
+   */
+  private requestConfig(config: AxiosRequestConfig = {}): AxiosRequestConfig {
+    return this.socketPath ? { ...config, socketPath: this.socketPath } : config;
+  }
+
+  /**
+   * POST to the sidecar, asking for MessagePack instead of JSON when enabled
+   *
+   * Used for responses that can be large (execution output, vulnerability
+   * lists). The body is decoded according to the Content-Type the sidecar
+   * actually chose.
+   */
+  private postNegotiated<T>(path: string, body: unknown): Observable<T> {
+    if (!this.msgpackResponses) {
+      return this.httpService
+        .post<T>(`${this.sidecarUrl}${path}`, body, this.requestConfig())
+        .pipe(map((response) => response.data));
+    }
+
+    return this.httpService
+      .post<ArrayBuffer>(
+        `${this.sidecarUrl}${path}`,
+        body,
+        this.requestConfig({
+          responseType: 'arraybuffer',
+          headers: { Accept: NEGOTIATED_ACCEPT },
+        }),
+      )
+      .pipe(
+        map((response) => {
+          const bytes = Buffer.from(response.data);
+          const contentType = String(response.headers['content-type'] ?? '');
+          return (
+            contentType.startsWith(MSGPACK_MEDIA_TYPE)
+              ? decodeMsgpack(bytes)
+              : JSON.parse(bytes.toString('utf8'))
+          ) as T;
+        }),
+      );
+  }
+
   /**
    * Check if the Python sidecar is healthy
    */
   async checkHealth(): Promise<boolean> {
     try {
       const response = await firstValueFrom(
-        this.httpService.get(`${this.sidecarUrl}/health`).pipe(
+        this.httpService.get(`${this.sidecarUrl}/health`, this.requestConfig()).pipe(
           timeout(5000),
           catchError((error) => {
             this.logger.warn(`Python sidecar health check failed: ${error.message}`);
@@ -84,7 +153,11 @@ export class PythonSecurityBridge implements OnModuleInit {
 
       const response = await firstValueFrom(
         this.httpService
-          .post<PathValidationResponse>(`${this.sidecarUrl}/validate/path`, request)
+          .post<PathValidationResponse>(
+            `${this.sidecarUrl}/validate/path`,
+            request,
+            this.requestConfig(),
+          )
           .pipe(
             timeout(this.defaultTimeout),
             catchError((error) => {
@@ -124,22 +197,131 @@ export class PythonSecurityBridge implements OnModuleInit {
         authorizedImports,
       };
 
+      const response = await firstValueFrom(
+        this.postNegotiated<CodeValidationResponse>('/validate/code', request).pipe(
+          timeout(this.defaultTimeout),
+          catchError((error) => {
+            this.logger.error(`Code validation request failed: ${error.message}`);
+            throw error;
+          }),
+        ),
+      );
+
+      return response;
+    } catch (error) {
+      this.logger.error(`Code validation failed: ${error}`);
+      return {
+        valid: false,
+        vulnerabilities: [
+          {
+            id: 'BRIDGE_ERROR',
+            category: 'Bridge Error',
+            severity: 'high',
+            title: 'Security validation unavailable',
+            description:
+              error instanceof Error ? error.message : 'Unknown error',
+          },
+        ] as SecurityVulnerability[],
+      };
+    }
+  }
+
+  /**
+   * Validate many paths against one project root in a single request
+   *
+   * @param projectRoot - The project root directory
+   * @param paths - The paths to validate
+   * @returns Per-path validation results, in the same order as `paths`
+   */
+  async validatePaths(
+    projectRoot: string,
+    paths: string[],
+  ): Promise<PathValidationResponse[]> {
+    try {
+      const request: PathBatchValidationRequest = {
+        projectRoot,
+        paths,
+      };
+
       const response = await firstValueFrom(
         this.httpService
-          .post<CodeValidationResponse>(`${this.sidecarUrl}/validate/code`, request)
+          .post<PathBatchValidationResponse>(
+            `${this.sidecarUrl}/validate/paths:batch`,
+            request,
+            this.requestConfig(),
+          )
           .pipe(
             timeout(this.defaultTimeout),
             catchError((error) => {
-              this.logger.error(`Code validation request failed: ${error.message}`);
+              this.logger.error(`Path batch validation request failed: ${error.message}`);
               throw error;
             }),
           ),
       );
 
-      return response.data;
+      return response.data.results;
     } catch (error) {
-      this.logger.error(`Code validation failed: ${error}`);
-      return {
+      this.logger.error(`Path batch validation failed: ${error}`);
+      const message = error instanceof Error ? error.message : 'Unknown error';
+      return paths.map(() => ({ valid: false, error: message }));
+    }
+  }
+
+  /**
+   * List project entries matching a glob pattern, a page at a time
+   *
+   * @param projectRoot - The project root to list
+   * @param pattern - Glob pattern relative to the project root
+   * @param cursor - nextCursor of the previous page, if any
+   * @param limit - Maximum entries in the page
+   * @returns The page; pass its nextCursor to get the next one
+   */
+  async listFiles(
+    projectRoot: string,
+    pattern: string = '*',
+    cursor?: string,
+    limit?: number,
+  ): Promise<FileListResponse> {
+    const request: FileListRequest = { projectRoot, pattern, cursor, limit };
+
+    return firstValueFrom(
+      this.postNegotiated<FileListResponse>('/files/list', request).pipe(
+        timeout(this.defaultTimeout),
+        catchError((error) => {
+          this.logger.error(`File listing request failed: ${error.message}`);
+          throw error;
+        }),
+      ),
+    );
+  }
+
+  /**
+   * Validate many code snippets in a single request
+   *
+   * @param items - The snippets to validate
+   * @returns Per-snippet validation results, in the same order as `items`
+   */
+  async validateCodeBatch(
+    items: CodeValidationRequest[],
+  ): Promise<CodeValidationResponse[]> {
+    try {
+      const request: CodeBatchValidationRequest = { items };
+
+      const response = await firstValueFrom(
+        this.postNegotiated<CodeBatchValidationResponse>('/validate/code:batch', request).pipe(
+          timeout(this.defaultTimeout),
+          catchError((error) => {
+            this.logger.error(`Code batch validation request failed: ${error.message}`);
+            throw error;
+          }),
+        ),
+      );
+
+      return response.results;
+    } catch (error) {
+      this.logger.error(`Code batch validation failed: ${error}`);
+      const message = error instanceof Error ? error.message : 'Unknown error';
+      return items.map(() => ({
         valid: false,
         vulnerabilities: [
           {
@@ -147,10 +329,94 @@ export class PythonSecurityBridge implements OnModuleInit {
             category: 'Bridge Error',
             severity: 'high',
             title: 'Security validation unavailable',
-            description:
-              error instanceof Error ? error.message : 'Unknown error',
+            description: message,
           },
         ] as SecurityVulnerability[],
+      }));
+    }
+  }
+
+  /**
+   * Validate a file inside the project, of any size, receiving findings as
+   * the sidecar scans it
+   *
+   * @param projectRoot - The project root the file must lie in
+   * @param path - The file to validate
+   * @param onVulnerability - Called with each finding as it arrives
+   * @param timeoutMs - Time allowed until the first byte of the response
+   * @returns Summary of the validation; the findings went to onVulnerability
+   */
+  async validateFileStreaming(
+    projectRoot: string,
+    path: string,
+    onVulnerability: (vulnerability: SecurityVulnerability) => void,
+    timeoutMs: number = this.defaultTimeout,
+  ): Promise<CodeValidationStreamResult> {
+    try {
+      const request: FileValidationRequest = { projectRoot, path };
+
+      const response = await firstValueFrom(
+        this.httpService
+          .post<NodeJS.ReadableStream>(
+            `${this.sidecarUrl}/validate/file`,
+            request,
+            this.requestConfig({ responseType: 'stream' }),
+          )
+          .pipe(
+            timeout(timeoutMs),
+            catchError((error) => {
+              this.logger.error(`Streaming file validation request failed: ${error.message}`);
+              throw error;
+            }),
+          ),
+      );
+
+      const stream = response.data;
+      stream.setEncoding('utf8');
+
+      let buffer = '';
+      let result: CodeValidationStreamResult | undefined;
+      for await (const chunk of stream) {
+        buffer += chunk as string;
+        let newline = buffer.indexOf('\n');
+        while (newline !== -1) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          newline = buffer.indexOf('\n');
+          if (!line) {
+            continue;
+          }
+
+          const event = JSON.parse(line) as CodeValidationStreamEvent;
+          if (event.type === 'vulnerability') {
+            const { type: _type, ...vulnerability } = event;
+            onVulnerability(vulnerability);
+          } else {
+            const { type: _type, ...rest } = event;
+            result = rest;
+          }
+        }
+      }
+
+      return (
+        result ?? {
+          valid: false,
+          complianceScore: 0,
+          vulnerabilityCount: 0,
+          chars: 0,
+          lines: 0,
+          error: 'Validation stream ended without a result',
+        }
+      );
+    } catch (error) {
+      this.logger.error(`Streaming file validation failed: ${error}`);
+      return {
+        valid: false,
+        complianceScore: 0,
+        vulnerabilityCount: 0,
+        chars: 0,
+        lines: 0,
+        error: error instanceof Error ? error.message : 'Unknown error',
       };
     }
   }
@@ -178,21 +444,101 @@ export class PythonSecurityBridge implements OnModuleInit {
         timeout: timeoutMs,
       };
 
+      const response = await firstValueFrom(
+        this.postNegotiated<CodeExecutionResponse>('/execute', request).pipe(
+          timeout(timeoutMs + 5000), // Add buffer for HTTP overhead
+          catchError((error) => {
+            this.logger.error(`Code execution request failed: ${error.message}`);
+            throw error;
+          }),
+        ),
+      );
+
+      return response;
+    } catch (error) {
+      this.logger.error(`Code execution failed: ${error}`);
+      return {
+        success: false,
+        error: error instanceof Error ? error.message : 'Unknown error',
+      };
+    }
+  }
+
+  /**
+   * Execute code and receive its output while it runs
+   *
+   * @param projectRoot - The project root for isolation
+   * @param code - The code to execute
+   * @param onOutput - Called with each chunk of stdout/stderr as it arrives
+   * @param authorizedImports - List of authorized imports
+   * @param timeoutMs - Execution timeout in milliseconds
+   * @returns Execution result; its output was delivered through onOutput
+   */
+  async executeStreaming(
+    projectRoot: string,
+    code: string,
+    onOutput: (event: CodeExecutionOutputEvent) => void,
+    authorizedImports: string[] = [],
+    timeoutMs: number = 60000,
+  ): Promise<CodeExecutionResponse> {
+    try {
+      const request: CodeExecutionRequest = {
+        projectRoot,
+        code,
+        authorizedImports,
+        timeout: timeoutMs,
+      };
+
       const response = await firstValueFrom(
         this.httpService
-          .post<CodeExecutionResponse>(`${this.sidecarUrl}/execute`, request)
+          .post<NodeJS.ReadableStream>(
+            `${this.sidecarUrl}/execute/stream`,
+            request,
+            this.requestConfig({ responseType: 'stream' }),
+          )
           .pipe(
-            timeout(timeoutMs + 5000), // Add buffer for HTTP overhead
+            timeout(timeoutMs + 5000), // Time to first byte; the body streams afterwards
             catchError((error) => {
-              this.logger.error(`Code execution request failed: ${error.message}`);
+              this.logger.error(`Streaming execution request failed: ${error.message}`);
               throw error;
             }),
           ),
       );
 
-      return response.data;
+      const stream = response.data;
+      stream.setEncoding('utf8');
+
+      let buffer = '';
+      let result: CodeExecutionResponse | undefined;
+      for await (const chunk of stream) {
+        buffer += chunk as string;
+        let newline = buffer.indexOf('\n');
+        while (newline !== -1) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          newline = buffer.indexOf('\n');
+          if (!line) {
+            continue;
+          }
+
+          const event = JSON.parse(line) as CodeExecutionStreamEvent;
+          if (event.type === 'output') {
+            onOutput(event);
+          } else {
+            const { type: _type, ...rest } = event;
+            result = rest;
+          }
+        }
+      }
+
+      return (
+        result ?? {
+          success: false,
+          error: 'Execution stream ended without a result',
+        }
+      );
     } catch (error) {
-      this.logger.error(`Code execution failed: ${error}`);
+      this.logger.error(`Streaming execution failed: ${error}`);
       return {
         success: false,
         error: error instanceof Error ? error.message : 'Unknown error',
@@ -212,9 +558,11 @@ export class PythonSecurityBridge implements OnModuleInit {
     try {
       const response = await firstValueFrom(
         this.httpService
-          .post<CodeValidationResponse>(`${this.sidecarUrl}/validate/owasp`, {
-            config,
-          })
+          .post<CodeValidationResponse>(
+            `${this.sidecarUrl}/validate/owasp`,
+            { config },
+            this.requestConfig(),
+          )
           .pipe(
             timeout(this.defaultTimeout),
             catchError((error) => {
@@ -248,10 +596,11 @@ export class PythonSecurityBridge implements OnModuleInit {
     try {
       const response = await firstValueFrom(
         this.httpService
-          .post<CodeValidationResponse>(`${this.sidecarUrl}/validate/stride`, {
-            component,
-            context,
-          })
+          .post<CodeValidationResponse>(
+            `${this.sidecarUrl}/validate/stride`,
+            { component, context },
+            this.requestConfig(),
+          )
           .pipe(
             timeout(this.defaultTimeout),
             catchError((error) => {
@@ -47,6 +47,14 @@ export interface SecurityVulnerability {
   description: string;
   location?: string;
   remediation?: string;
+  /** 1-based start line of the finding */
+  line?: number;
+  /** 1-based start column of the finding */
+  column?: number;
+  /** 1-based end line of the finding */
+  endLine?: number;
+  /** 1-based end column of the finding (exclusive) */
+  endColumn?: number;
 }
 
 /**
@@ -67,12 +75,26 @@ export interface PathValidationResponse {
 }
 
 /**
- * Code validation request
+ * A changed region of a revised text, as in a diff hunk (1-based starts)
+ */
+export interface LineChange {
+  oldStart: number;
+  oldLines: number;
+  newStart: number;
+  newLines: number;
+}
+
+/**
+ * Code validation request; baseHash (SHA-256 hex of a previously validated
+ * text) with a patch or changes asks for incremental revalidation
  */
 export interface CodeValidationRequest {
   code: string;
   projectRoot?: string;
   authorizedImports?: string[];
+  baseHash?: string;
+  patch?: string;
+  changes?: LineChange[];
 }
 
 /**
@@ -84,6 +106,110 @@ export interface CodeValidationResponse {
   complianceScore?: number;
 }
 
+/**
+ * Batch path validation request (one project root, many paths)
+ */
+export interface PathBatchValidationRequest {
+  projectRoot: string;
+  paths: string[];
+}
+
+/**
+ * Batch path validation response; results are in request order
+ */
+export interface PathBatchValidationResponse {
+  results: PathValidationResponse[];
+}
+
+/**
+ * Batch code validation request
+ */
+export interface CodeBatchValidationRequest {
+  items: CodeValidationRequest[];
+}
+
+/**
+ * Result for one snippet of a batch code validation
+ */
+export interface CodeBatchValidationResult extends CodeValidationResponse {
+  error?: string;
+}
+
+/**
+ * Batch code validation response; results are in request order
+ */
+export interface CodeBatchValidationResponse {
+  results: CodeBatchValidationResult[];
+}
+
+/**
+ * Request for one page of project entries matching a glob (POST /files/list)
+ */
+export interface FileListRequest {
+  projectRoot: string;
+  pattern?: string;
+  cursor?: string;
+  limit?: number;
+}
+
+/**
+ * A listed path, relative to the project root
+ */
+export interface FileEntry {
+  path: string;
+  isDir: boolean;
+}
+
+/**
+ * One page of entries in path order; nextCursor is null on the last page
+ */
+export interface FileListResponse {
+  entries: FileEntry[];
+  nextCursor: string | null;
+}
+
+/**
+ * Request to validate a file inside a project root (POST /validate/file)
+ */
+export interface FileValidationRequest {
+  projectRoot: string;
+  path: string;
+}
+
+/**
+ * A finding from POST /validate/stream or /validate/file, sent as soon as
+ * the chunk containing it has been scanned
+ */
+export interface CodeValidationVulnerabilityEvent extends SecurityVulnerability {
+  type: 'vulnerability';
+}
+
+/**
+ * Summary of a streamed validation
+ */
+export interface CodeValidationStreamResult {
+  valid: boolean;
+  complianceScore: number;
+  vulnerabilityCount: number;
+  chars: number;
+  lines: number;
+  error?: string | null;
+}
+
+/**
+ * The final line of a streamed validation
+ */
+export interface CodeValidationResultEvent extends CodeValidationStreamResult {
+  type: 'result';
+}
+
+/**
+ * One newline-delimited JSON line of a streamed validation
+ */
+export type CodeValidationStreamEvent =
+  | CodeValidationVulnerabilityEvent
+  | CodeValidationResultEvent;
+
 /**
  * Code execution request to Python sidecar
  */
@@ -92,6 +218,10 @@ export interface CodeExecutionRequest {
   code: string;
   authorizedImports?: string[];
   timeout?: number;
+  /** Tighter limits than the sidecar's configured maximums */
+  memoryLimitMb?: number;
+  cpuTimeLimit?: number;
+  outputLimitKb?: number;
 }
 
 /**
@@ -103,8 +233,36 @@ export interface CodeExecutionResponse {
   output?: string;
   error?: string;
   executionTime?: number;
+  timedOut?: boolean;
+  limitExceeded?: 'memory' | 'cpu' | 'output' | null;
+  cpuTime?: number;
+  wallTime?: number;
+  peakRssBytes?: number | null;
+}
+
+/**
+ * A chunk of output from POST /execute/stream
+ */
+export interface CodeExecutionOutputEvent {
+  type: 'output';
+  stream: 'stdout' | 'stderr';
+  data: string;
 }
 
+/**
+ * The final line of POST /execute/stream
+ */
+export interface CodeExecutionResultEvent extends CodeExecutionResponse {
+  type: 'result';
+}
+
+/**
+ * One newline-delimited JSON line of POST /execute/stream
+ */
+export type CodeExecutionStreamEvent =
+  | CodeExecutionOutputEvent
+  | CodeExecutionResultEvent;
+
 /**
  * Security audit log entry
  */
@@ -0,0 +1 @@
+"""Benchmarks for the sidecar's hot paths; run with ``python -m benchmarks.run``."""
@@ -0,0 +1,53 @@
+"""SecurePythonExecutor.execute, cold and warm."""
+
+import itertools
+import tempfile
+
+from src.security.isolation import ProjectIsolation
+from src.security.secure_executor import SecurePythonExecutor
+
+from .harness import BenchmarkResult, measure
+
+SNIPPETS = {
+    "trivial": "result = 1 + 1",
+    "loop": "result = sum(i * i for i in range(10000))",
+    "file-io": (
+        "secure_write_file('bench.txt', 'x' * 4096)\n"
+        "result = len(secure_read_file('bench.txt'))"
+    ),
+    "print": "for i in range(200):\n    print('line', i)\nresult = i",
+}
+
+
+def _check(result) -> None:
+    if not result.success:
+        raise RuntimeError(f"Benchmark snippet failed: {result.error}")
+
+
+def run(min_time_s: float) -> list[BenchmarkResult]:
+    results = []
+    counter = itertools.count()
+    with tempfile.TemporaryDirectory(prefix="sidecar-bench-") as tmp:
+        isolation = ProjectIsolation(tmp)
+        warm_executor = SecurePythonExecutor(isolation)
+
+        for name, code in SNIPPETS.items():
+            # Warm: a long-lived executor re-running a snippet it has compiled
+            results.append(
+                measure(
+                    f"executor.execute[{name}-warm]",
+                    lambda: _check(warm_executor.execute(code)),
+                    min_time_s=min_time_s,
+                )
+            )
+
+            # Cold: a fresh executor and isolation, and source never seen
+            # before, so nothing is served from the compiled-code cache
+            def cold():
+                executor = SecurePythonExecutor(ProjectIsolation(tmp))
+                _check(executor.execute(f"# run {next(counter)}\n{code}"))
+
+            results.append(
+                measure(f"executor.execute[{name}-cold]", cold, min_time_s=min_time_s)
+            )
+    return results
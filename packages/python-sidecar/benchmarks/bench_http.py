@@ -0,0 +1,99 @@
+"""End-to-end HTTP latency and throughput against the FastAPI app, in process."""
+
+import asyncio
+import itertools
+import tempfile
+import time
+
+import httpx
+
+from .harness import BenchmarkResult, summarize
+
+CONCURRENCY = 16
+
+
+async def _load(
+    client: httpx.AsyncClient,
+    make_request,
+    duration_s: float,
+    concurrency: int,
+) -> tuple[list[float], float]:
+    """Issue requests from ``concurrency`` tasks for ``duration_s``.
+
+    Returns the per-request latencies and the elapsed time.
+    """
+    latencies: list[float] = []
+    start = time.perf_counter()
+    deadline = start + duration_s
+
+    async def user():
+        while time.perf_counter() < deadline:
+            method, url, body = make_request()
+            sent = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - sent)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}")
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def _run(min_time_s: float) -> list[BenchmarkResult]:
+    # Imported here so the app picks up the environment set by the runner
+    from src.main import app
+
+    counter = itertools.count()
+    with tempfile.TemporaryDirectory(prefix="sidecar-bench-") as root:
+        cases = {
+            "GET /health": lambda: ("GET", "/health", None),
+            "POST /validate/path": lambda: (
+                "POST",
+                "/validate/path",
+                {"projectRoot": root, "path": f"src/module{next(counter) % 100}.py"},
+            ),
+            "POST /validate/code[cached]": lambda: (
+                "POST",
+                "/validate/code",
+                {"code": "import os\nos.system('ls ' + path)\n"},
+            ),
+            "POST /validate/code[uncached]": lambda: (
+                "POST",
+                "/validate/code",
+                {"code": f"import os\nos.system('ls ' + path{next(counter)})\n"},
+            ),
+            "POST /execute": lambda: (
+                "POST",
+                "/execute",
+                {"projectRoot": root, "code": "result = sum(range(1000))"},
+            ),
+        }
+
+        results = []
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://sidecar", timeout=60
+            ) as client:
+                for case, make_request in cases.items():
+                    # Warm up connections, caches and workers
+                    await _load(client, make_request, min(0.2, min_time_s), CONCURRENCY)
+                    latencies, elapsed = await _load(
+                        client, make_request, max(min_time_s, 1.0), CONCURRENCY
+                    )
+                    results.append(
+                        summarize(
+                            f"http[{case}]",
+                            latencies,
+                            extra={
+                                "concurrency": CONCURRENCY,
+                                "requests": len(latencies),
+                                "throughput_rps": len(latencies) / elapsed,
+                            },
+                        )
+                    )
+    return results
+
+
+def run(min_time_s: float) -> list[BenchmarkResult]:
+    return asyncio.run(_run(min_time_s))
@@ -0,0 +1,91 @@
+"""ProjectIsolation.validate_path on deep and symlink-heavy trees."""
+
+import itertools
+import os
+import tempfile
+from pathlib import Path
+
+from src.security.isolation import ProjectIsolation
+
+from .harness import BenchmarkResult, measure
+
+DEPTH = 40
+SYMLINK_CHAIN = 20
+SYMLINK_FAN_OUT = 200
+
+
+def build_deep_tree(root: Path) -> str:
+    """Create a DEPTH-deep directory chain; return a relative file path at the bottom."""
+    parts = [f"level{i}" for i in range(DEPTH)]
+    leaf = root.joinpath(*parts)
+    leaf.mkdir(parents=True)
+    (leaf / "module.py").write_text("x = 1\n")
+    return os.path.join(*parts, "module.py")
+
+
+def build_symlink_tree(root: Path) -> tuple[str, list[str]]:
+    """
+    Create a chain of directory symlinks and a fan of links into nested directories.
+
+    Returns the relative path of a file reached through the whole chain and
+    the relative paths of files reached through each fan-out link.
+    """
+    real = root / "real"
+    real.mkdir()
+    (real / "data.txt").write_text("data\n")
+
+    previous = "real"
+    for i in range(SYMLINK_CHAIN):
+        name = f"chain{i}"
+        os.symlink(previous, root / name)
+        previous = name
+    chained = os.path.join(previous, "data.txt")
+
+    links = root / "links"
+    links.mkdir()
+    fanned = []
+    for i in range(SYMLINK_FAN_OUT):
+        target = real / f"group{i % 10}" / f"item{i}"
+        target.mkdir(parents=True)
+        (target / "file.txt").write_text(str(i))
+        os.symlink(target, links / f"link{i}")
+        fanned.append(os.path.join("links", f"link{i}", "file.txt"))
+    return chained, fanned
+
+
+def _validate_blocked(isolation: ProjectIsolation, path: str) -> None:
+    try:
+        isolation.validate_path(path)
+    except PermissionError:
+        pass
+
+
+def run(min_time_s: float) -> list[BenchmarkResult]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sidecar-bench-") as tmp:
+        root = Path(tmp).resolve()
+        deep = build_deep_tree(root)
+        chained, fanned = build_symlink_tree(root)
+        traversal = os.path.join(*([".."] * (DEPTH + 2)), "etc", "passwd")
+
+        for cache_name, cache_size in (("cached", 4096), ("uncached", 0)):
+            isolation = ProjectIsolation(str(root), path_cache_size=cache_size)
+            next_fanned = itertools.cycle(fanned).__next__
+            cases = {
+                "deep": lambda: isolation.validate_path(deep),
+                "deep-absolute": lambda: isolation.validate_path(str(root / deep)),
+                "symlink-chain": lambda: isolation.validate_path(chained),
+                "symlink-fan-out": lambda: isolation.validate_path(next_fanned()),
+                "traversal-blocked": lambda: _validate_blocked(
+                    isolation, os.path.join(deep, traversal)
+                ),
+            }
+            for case, func in cases.items():
+                results.append(
+                    measure(
+                        f"isolation.validate_path[{case}-{cache_name}]",
+                        func,
+                        min_time_s=min_time_s,
+                    )
+                )
+    return results
@@ -0,0 +1,27 @@
+"""Cold start: a fresh interpreter importing the app."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from .harness import BenchmarkResult, measure
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _import_app() -> None:
+    subprocess.run(
+        [sys.executable, "-c", "import src.main"],
+        cwd=PACKAGE_ROOT,
+        env=os.environ,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def run(min_time_s: float) -> list[BenchmarkResult]:
+    # Each round starts an interpreter, so a few rounds are enough
+    return [
+        measure("startup.import_app", _import_app, warmup=1, min_rounds=3, min_time_s=min_time_s)
+    ]
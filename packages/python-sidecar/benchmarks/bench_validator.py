@@ -0,0 +1,77 @@
+"""OWASPValidator.validate across input sizes and finding densities."""
+
+import random
+
+from src.security.owasp_validator import OWASPValidator
+
+from .harness import BenchmarkResult, measure
+
+SIZES = {"1kb": 1024, "10kb": 10 * 1024, "100kb": 100 * 1024, "1mb": 1024 * 1024}
+
+# Roughly one finding per this many bytes (None = no findings)
+DENSITIES = {"clean": None, "sparse": 10 * 1024, "dense": 256}
+
+_CLEAN_LINES = [
+    "def handler_{n}(request, context):",
+    "    values = [item * 2 for item in range({n})]",
+    "    total = sum(values) / max(len(values), 1)",
+    "    logger.info('processed %d items', len(values))",
+    "    return {{'total': total, 'count': len(values)}}",
+    "",
+    "class Model{n}:",
+    "    def __init__(self, name: str):",
+    "        self.name = name.strip().lower()",
+    "# Cache the parsed configuration for subsequent lookups",
+    "config_{n} = load_config(os.path.join(BASE_DIR, 'settings.toml'))",
+]
+
+_FINDING_LINES = [
+    "os.system('rm -rf ' + user_path_{n})",
+    "cursor.execute('SELECT * FROM users WHERE id = ' + user_id_{n})",
+    "password = 'hunter{n}'",
+    "data_{n} = pickle.loads(request.body)",
+    "subprocess.call(command_{n}, shell=True)",
+    "open('../../etc/passwd').read()",
+    "result_{n} = eval(request.args['expr'])",
+    "requests.get(url_{n}, verify=False)",
+]
+
+
+def generate_source(size: int, density: int | None, seed: int = 0) -> str:
+    """Deterministic Python-like source of ``size`` bytes with findings spread through it."""
+    rng = random.Random(f"{seed}:{size}:{density}")
+    lines: list[str] = []
+    length = 0
+    next_finding = rng.randint(0, density) if density else None
+    n = 0
+    while length < size:
+        if next_finding is not None and length >= next_finding:
+            line = rng.choice(_FINDING_LINES)
+            next_finding = length + rng.randint(density // 2, density * 3 // 2)
+        else:
+            line = rng.choice(_CLEAN_LINES)
+        line = line.format(n=n)
+        n += 1
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def run(min_time_s: float) -> list[BenchmarkResult]:
+    validator = OWASPValidator()
+    results = []
+    for size_name, size in SIZES.items():
+        for density_name, density in DENSITIES.items():
+            source = generate_source(size, density)
+            findings = len(validator.validate(source).vulnerabilities)
+            results.append(
+                measure(
+                    f"validator.validate[{size_name}-{density_name}]",
+                    lambda: validator.validate(source),
+                    warmup=1,
+                    min_rounds=3,
+                    min_time_s=min_time_s,
+                    extra={"bytes": len(source), "findings": findings},
+                )
+            )
+    return results
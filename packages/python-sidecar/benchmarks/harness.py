@@ -0,0 +1,189 @@
+"""
+Timing, statistics and baseline comparison shared by the benchmarks.
+
+Every benchmark reports seconds per operation. A benchmark is run for a
+number of rounds after a warm-up, adding rounds until ``min_time_s`` has been
+spent (within ``[min_rounds, max_rounds]``), so fast and slow operations get
+comparable statistical weight.
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable
+
+# Bump when the result layout changes incompatibly
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing statistics for one benchmark, in seconds per operation."""
+
+    name: str
+    rounds: int
+    median: float
+    mean: float
+    stdev: float
+    min: float
+    max: float
+    p50: float
+    p99: float
+    ops_per_s: float
+    # Benchmark-specific figures, e.g. input size or HTTP throughput
+    extra: dict = field(default_factory=dict)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (0 < pct <= 100)."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(name: str, samples: list[float], extra: dict | None = None) -> BenchmarkResult:
+    """Build a BenchmarkResult from per-operation timings."""
+    median = statistics.median(samples)
+    return BenchmarkResult(
+        name=name,
+        rounds=len(samples),
+        median=median,
+        mean=statistics.fmean(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        min=min(samples),
+        max=max(samples),
+        p50=percentile(samples, 50),
+        p99=percentile(samples, 99),
+        ops_per_s=1 / median if median > 0 else 0.0,
+        extra=extra or {},
+    )
+
+
+def measure(
+    name: str,
+    func: Callable[[], object],
+    *,
+    warmup: int = 3,
+    min_rounds: int = 5,
+    max_rounds: int = 10000,
+    min_time_s: float = 0.5,
+    extra: dict | None = None,
+) -> BenchmarkResult:
+    """Time ``func()`` repeatedly and summarize the per-call timings."""
+    for _ in range(warmup):
+        func()
+
+    samples: list[float] = []
+    deadline = time.perf_counter() + min_time_s
+    while len(samples) < max_rounds and (
+        len(samples) < min_rounds or time.perf_counter() < deadline
+    ):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(name, samples, extra)
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict:
+    """Describe the machine and interpreter the results were taken on."""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def write_results(path: str, results: list[BenchmarkResult]) -> None:
+    document = {
+        "schema": SCHEMA_VERSION,
+        "environment": environment(),
+        "benchmarks": {result.name: asdict(result) for result in results},
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> dict[str, dict]:
+    """Load the benchmarks section of a results file written by ``write_results``."""
+    with open(path) as f:
+        document = json.load(f)
+    if document.get("schema") != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path}: unsupported results schema {document.get('schema')!r}, "
+            f"expected {SCHEMA_VERSION}"
+        )
+    return document["benchmarks"]
+
+
+@dataclass
+class Comparison:
+    """Change of one benchmark's median against the baseline."""
+
+    name: str
+    baseline: float
+    current: float
+    # current / baseline; above 1 is slower
+    ratio: float
+    regressed: bool
+
+
+def compare(
+    results: list[BenchmarkResult],
+    baseline: dict[str, dict],
+    threshold: float,
+) -> list[Comparison]:
+    """
+    Compare medians against ``baseline``.
+
+    A benchmark regresses when its median is more than ``threshold`` (a
+    fraction, e.g. 0.2) slower than the baseline median. Benchmarks missing
+    from either side are skipped.
+    """
+    comparisons = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None or previous["median"] <= 0:
+            continue
+        ratio = result.median / previous["median"]
+        comparisons.append(
+            Comparison(
+                name=result.name,
+                baseline=previous["median"],
+                current=result.median,
+                ratio=ratio,
+                regressed=ratio > 1 + threshold,
+            )
+        )
+    return comparisons
+
+
+def format_seconds(value: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if value >= scale:
+            return f"{value / scale:.2f}{unit}"
+    return f"{value / 1e-9:.0f}ns"
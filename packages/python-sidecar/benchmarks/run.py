@@ -0,0 +1,118 @@
+"""
+Run the sidecar benchmark suite.
+
+Usage (from packages/python-sidecar):
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.2
+    python -m benchmarks.run --only validator,isolation --quick
+
+Results are written as JSON (seconds per operation, with median, p50, p99
+and friends). With ``--baseline``, each benchmark's median is compared to
+the baseline's and the run exits with status 1 if any is more than
+``--threshold`` slower. Baselines are only comparable when taken on the
+same machine; save one from the target branch, then run the PR against it.
+"""
+
+import argparse
+import os
+import sys
+
+SUITES = ("validator", "isolation", "executor", "http", "startup")
+
+
+def _configure_environment() -> None:
+    # Keep log output out of the measurements and the console, and size the
+    # execution pool the same way on every machine
+    os.environ.setdefault("SIDECAR_LOG_LEVEL", "CRITICAL")
+    os.environ.setdefault("SIDECAR_EXECUTOR_WORKERS", "4")
+
+    from src.config import get_settings
+    from src.logging_config import configure_logging
+
+    configure_logging(get_settings(), background=False)
+
+
+def _suite(name: str):
+    if name == "validator":
+        from . import bench_validator as module
+    elif name == "isolation":
+        from . import bench_isolation as module
+    elif name == "executor":
+        from . import bench_executor as module
+    elif name == "http":
+        from . import bench_http as module
+    else:
+        from . import bench_startup as module
+    return module
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", "-o", help="Write results to this JSON file")
+    parser.add_argument("--baseline", "-b", help="Compare against this results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed median slowdown before a benchmark counts as a regression (default 0.2)",
+    )
+    parser.add_argument(
+        "--only",
+        help=f"Comma-separated suites to run (default: all of {', '.join(SUITES)})",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Shorter runs, for smoke-testing the suite"
+    )
+    args = parser.parse_args(argv)
+
+    suites = args.only.split(",") if args.only else list(SUITES)
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    _configure_environment()
+
+    from .harness import compare, format_seconds, load_results, write_results
+
+    baseline = load_results(args.baseline) if args.baseline else None
+    min_time_s = 0.1 if args.quick else 1.0
+
+    results = []
+    for name in suites:
+        print(f"== {name}", file=sys.stderr)
+        for result in _suite(name).run(min_time_s):
+            results.append(result)
+            print(
+                f"{result.name:<55} median {format_seconds(result.median):>9}"
+                f"  p99 {format_seconds(result.p99):>9}  ({result.rounds} rounds)",
+                file=sys.stderr,
+            )
+
+    if args.output:
+        write_results(args.output, results)
+
+    if baseline is None:
+        return 0
+
+    comparisons = compare(results, baseline, args.threshold)
+    print(f"\n== compared with {args.baseline}", file=sys.stderr)
+    for comparison in comparisons:
+        marker = "REGRESSION" if comparison.regressed else ""
+        print(
+            f"{comparison.name:<55} {format_seconds(comparison.baseline):>9}"
+            f" -> {format_seconds(comparison.current):>9}  {comparison.ratio:6.2f}x  {marker}",
+            file=sys.stderr,
+        )
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions:
+        print(
+            f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Admission control for expensive requests.
+
+Executions are admitted through a Lane: at most ``max_active`` run at once
+(the pool's capacity), each tenant (project root) may run at most
+``tenant_max_active`` of them, and the rest wait in a bounded FIFO per
+tenant. Free slots are handed out round-robin across tenants, so a burst
+from one agent queues behind its own cap instead of in front of everyone
+else. Validation requests never enter a lane, so they are not delayed by
+queued executions.
+
+Requests that cannot be queued are rejected immediately with a status and
+a Retry-After estimate:
+
+- TenantLimitError (429): the tenant's own queue is full.
+- OverloadedError (503): the lane's total queue is full, or a request
+  waited longer than ``max_wait_s`` for a slot.
+
+Everything runs on the event loop thread; no locks are needed.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+
+# Bounds of the Retry-After estimate, in seconds
+MIN_RETRY_AFTER_S = 1
+MAX_RETRY_AFTER_S = 60
+
+
+class AdmissionRejected(Exception):
+    """A request was not admitted; ``status_code`` and ``retry_after`` describe the response."""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TenantLimitError(AdmissionRejected):
+    """The tenant has too many requests queued."""
+
+    status_code = 429
+
+
+class OverloadedError(AdmissionRejected):
+    """The sidecar as a whole cannot take more work right now."""
+
+    status_code = 503
+
+
+class Ticket:
+    """An admitted request; release it exactly once when the work is done."""
+
+    __slots__ = ("lane", "tenant", "started", "released")
+
+    def __init__(self, lane: "Lane", tenant: str):
+        self.lane = lane
+        self.tenant = tenant
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self) -> None:
+        """Free the slot (idempotent)."""
+        if not self.released:
+            self.released = True
+            self.lane._release(self)
+
+
+class Lane:
+    """
+    Bounded, per-tenant fair admission for one class of requests.
+
+    Args:
+        name: Lane name, used in logs and messages
+        max_active: Requests running at once
+        max_queued: Requests waiting across all tenants (0 = never wait)
+        tenant_max_active: Requests one tenant may run at once (0 = no cap)
+        tenant_max_queued: Requests one tenant may have waiting
+        max_wait_s: Longest a request waits for a slot before it is rejected
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_active: int,
+        max_queued: int,
+        tenant_max_active: int = 0,
+        tenant_max_queued: int = 0,
+        max_wait_s: float = 30.0,
+    ):
+        self.name = name
+        self.max_active = max(1, max_active)
+        self.max_queued = max(0, max_queued)
+        self.tenant_max_active = tenant_max_active or self.max_active
+        self.tenant_max_queued = tenant_max_queued or self.max_queued
+        self.max_wait_s = max_wait_s
+
+        self.active = 0
+        self.queued = 0
+        self.rejected_tenant = 0
+        self.rejected_overload = 0
+        self._tenant_active: dict[str, int] = {}
+        # Tenant -> waiters; iteration order is the round-robin order
+        self._waiting: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+        # Moving average of how long a slot is held, for Retry-After
+        self._hold_s = 1.0
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new request."""
+        estimate = self._hold_s * (self.queued + 1) / self.max_active
+        return min(max(math.ceil(estimate), MIN_RETRY_AFTER_S), MAX_RETRY_AFTER_S)
+
+    async def acquire(self, tenant: str) -> Ticket:
+        """Wait for a slot for ``tenant``; raises AdmissionRejected if none can be had."""
+        running = self._tenant_active.get(tenant, 0)
+        waiting = self._waiting.get(tenant)
+
+        # Every release hands free slots to eligible waiters, so a free slot
+        # here means nobody who could use it is waiting
+        if self.active < self.max_active and running < self.tenant_max_active and not waiting:
+            return self._start(tenant)
+
+        if waiting is not None and len(waiting) >= self.tenant_max_queued:
+            self.rejected_tenant += 1
+            raise TenantLimitError(
+                f"Too many {self.name} requests queued for this project", self.retry_after()
+            )
+        if self.queued >= self.max_queued:
+            self.rejected_overload += 1
+            raise OverloadedError(f"The {self.name} queue is full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(tenant, deque()).append(waiter)
+        self.queued += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_s)
+        except asyncio.TimeoutError:
+            self._abandon(tenant, waiter)
+            self.rejected_overload += 1
+            raise OverloadedError(
+                f"Timed out waiting for a {self.name} slot", self.retry_after()
+            ) from None
+        except asyncio.CancelledError:
+            # The client went away while queued
+            self._abandon(tenant, waiter)
+            raise
+
+    def _start(self, tenant: str) -> Ticket:
+        self.active += 1
+        self._tenant_active[tenant] = self._tenant_active.get(tenant, 0) + 1
+        return Ticket(self, tenant)
+
+    def _abandon(self, tenant: str, waiter: asyncio.Future) -> None:
+        """Withdraw a waiter; if a slot was granted to it in the meantime, give it back."""
+        if waiter.done() and not waiter.cancelled():
+            waiter.result().release()
+            return
+        waiter.cancel()
+        queue = self._waiting.get(tenant)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.queued -= 1
+            if not queue:
+                del self._waiting[tenant]
+
+    def _release(self, ticket: Ticket) -> None:
+        self.active -= 1
+        remaining = self._tenant_active[ticket.tenant] - 1
+        if remaining:
+            self._tenant_active[ticket.tenant] = remaining
+        else:
+            del self._tenant_active[ticket.tenant]
+
+        self._hold_s += 0.2 * ((time.monotonic() - ticket.started) - self._hold_s)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting tenants, one per tenant per round."""
+        progress = True
+        while self.active < self.max_active and self._waiting and progress:
+            progress = False
+            for tenant in list(self._waiting):
+                if self.active >= self.max_active:
+                    break
+                if self._tenant_active.get(tenant, 0) >= self.tenant_max_active:
+                    continue
+                queue = self._waiting[tenant]
+                waiter = queue.popleft()
+                self.queued -= 1
+                if not queue:
+                    del self._waiting[tenant]
+                else:
+                    # Served tenants go to the back of the round-robin order
+                    self._waiting.move_to_end(tenant)
+                waiter.set_result(self._start(tenant))
+                progress = True
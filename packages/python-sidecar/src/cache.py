@@ -0,0 +1,141 @@
+"""
+Bounded in-process LRU cache with hit/miss accounting.
+
+Shared by the sidecar's caches (validation results, compiled code, resolved
+paths) so every cache evicts and reports statistics the same way.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def content_hash(text: str) -> str:
+    """Return the hex SHA-256 of ``text``, used to address cached entries."""
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Point-in-time counters for a cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+    @classmethod
+    def total(cls, reports: "list[CacheStats]") -> "CacheStats":
+        """Sum the counters of several caches of the same kind."""
+        return cls(
+            hits=sum(r.hits for r in reports),
+            misses=sum(r.misses for r in reports),
+            evictions=sum(r.evictions for r in reports),
+            entries=sum(r.entries for r in reports),
+            bytes=sum(r.bytes for r in reports),
+        )
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache bounded by entry count and, optionally, bytes.
+
+    Args:
+        max_entries: Maximum number of entries (0 disables caching)
+        max_bytes: Maximum total size reported by ``sizeof`` (0 = unbounded)
+        sizeof: Estimates the size of a value in bytes
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int = 0,
+        sizeof: Callable[[V], int] | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._data: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value and mark it most recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        """Insert or replace a value, evicting least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        size = self._sizeof(value)
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        """Remove and return a value without counting a lookup."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def values(self) -> list[V]:
+        """Return a snapshot of the cached values without counting lookups."""
+        with self._lock:
+            return [value for value, _ in self._data.values()]
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._data),
+                bytes=self._bytes,
+            )
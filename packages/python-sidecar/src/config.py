@@ -0,0 +1,171 @@
+"""
+Sidecar runtime configuration.
+
+All settings are read from ``SIDECAR_*`` environment variables so the same
+image can be tuned per deployment (docker compose, helm) without rebuilding.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to ``default``."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from e
+
+
+def _env_str(name: str, default: str) -> str:
+    """Read a string environment variable, falling back to ``default``."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def _env_octal(name: str, default: int) -> int:
+    """Read an octal environment variable (e.g. file permissions)."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value, 8)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an octal number, got {value!r}") from e
+
+
+@dataclass(frozen=True)
+class SidecarSettings:
+    """Tunable settings for the sidecar process."""
+
+    # TCP listener (port 0 disables it)
+    host: str
+    port: int
+    # Optional Unix domain socket listener, and the permission bits of the
+    # socket file (octal, e.g. "660")
+    uds_path: str
+    uds_mode: int
+    # HTTP worker processes forked from one parent that has already loaded
+    # the app (1 = serve from a single process)
+    http_workers: int
+    # Log a warning when a process takes longer than this to start serving
+    # (0 = no budget)
+    startup_budget_ms: int
+    # Where /execute runs user code: "process" (worker pool) or "thread"
+    executor_mode: str
+    # Number of long-lived worker processes serving /execute, per HTTP
+    # worker (defaults to the CPU count divided among the HTTP workers)
+    executor_workers: int
+    # Recycle a worker after it has served this many jobs (0 = never)
+    worker_max_jobs: int
+    # Recycle a worker once its resident set exceeds this many MB (0 = never)
+    worker_max_rss_mb: int
+    # multiprocessing start method for workers: forkserver, spawn or fork
+    worker_start_method: str
+    # Extra time a worker gets past a job's timeout before it is killed
+    execution_kill_grace_ms: int
+    # Characters of stdout plus stderr kept per execution before truncating
+    max_output_kb: int
+    # Address space an execution may add, and CPU time it may use
+    # (0 = unlimited); requests may ask for less but not for more
+    execution_memory_limit_mb: int
+    execution_cpu_limit_s: int
+    # Admission control for /execute: executions waiting for a worker in
+    # total, executions one project root may run at once and have waiting,
+    # and how long an execution may wait before it is rejected
+    execute_queue_size: int
+    execute_max_per_root: int
+    execute_queue_per_root: int
+    execute_max_wait_ms: int
+    # Output chunks buffered per streaming execution before the job is paused
+    stream_buffer_chunks: int
+    # Validation result cache bounds (0 entries disables the cache)
+    validation_cache_entries: int
+    validation_cache_mb: int
+    # Worker processes that validate large inputs in parallel, per HTTP
+    # worker (fewer than 2 disables sharding), and the input size from
+    # which validation is sharded across them
+    validation_workers: int
+    validation_shard_threshold_kb: int
+    # New input scanned at a time by the streaming validation endpoints
+    validation_stream_chunk_kb: int
+    # ProjectIsolation instances kept per process, and resolved parent
+    # directories cached per instance
+    isolation_registry_size: int
+    path_cache_size: int
+    # How long a project file index trusts a directory listing before
+    # checking the directory's mtime again (0 = on every query)
+    file_index_recheck_ms: int
+    # Compiled code-object cache, per executing process
+    code_cache_entries: int
+    code_cache_mb: int
+    # Persistent execution sessions
+    max_sessions: int
+    session_idle_ttl_s: int
+    session_memory_limit_mb: int
+    # Root log level, records buffered for the background log writer, and
+    # per-event sample rates as "event=rate,..." (merged over the defaults)
+    log_level: str
+    log_queue_size: int
+    log_sample_rates: str
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> SidecarSettings:
+    """Load settings from the environment (cached for the process lifetime)."""
+    http_workers = max(1, _env_int("SIDECAR_HTTP_WORKERS", 1))
+    executor_workers = max(
+        1, _env_int("SIDECAR_EXECUTOR_WORKERS", (os.cpu_count() or 1) // http_workers)
+    )
+    return SidecarSettings(
+        host=_env_str("SIDECAR_HOST", "0.0.0.0"),
+        port=max(0, _env_int("SIDECAR_PORT", 8766)),
+        uds_path=_env_str("SIDECAR_UDS_PATH", ""),
+        uds_mode=_env_octal("SIDECAR_UDS_MODE", 0o660),
+        http_workers=http_workers,
+        startup_budget_ms=max(0, _env_int("SIDECAR_STARTUP_BUDGET_MS", 5000)),
+        executor_mode=_env_str("SIDECAR_EXECUTOR_MODE", "process"),
+        executor_workers=executor_workers,
+        worker_max_jobs=max(0, _env_int("SIDECAR_WORKER_MAX_JOBS", 500)),
+        worker_max_rss_mb=max(0, _env_int("SIDECAR_WORKER_MAX_RSS_MB", 512)),
+        worker_start_method=_env_str("SIDECAR_WORKER_START_METHOD", "forkserver"),
+        execution_kill_grace_ms=max(0, _env_int("SIDECAR_EXECUTION_KILL_GRACE_MS", 2000)),
+        max_output_kb=max(0, _env_int("SIDECAR_MAX_OUTPUT_KB", 10240)),
+        execution_memory_limit_mb=max(0, _env_int("SIDECAR_EXECUTION_MEMORY_LIMIT_MB", 1024)),
+        execution_cpu_limit_s=max(0, _env_int("SIDECAR_EXECUTION_CPU_LIMIT_S", 0)),
+        execute_queue_size=max(0, _env_int("SIDECAR_EXECUTE_QUEUE_SIZE", 64)),
+        execute_max_per_root=max(
+            1, _env_int("SIDECAR_EXECUTE_MAX_PER_ROOT", max(1, executor_workers // 2))
+        ),
+        execute_queue_per_root=max(1, _env_int("SIDECAR_EXECUTE_QUEUE_PER_ROOT", 16)),
+        execute_max_wait_ms=max(1, _env_int("SIDECAR_EXECUTE_MAX_WAIT_MS", 30000)),
+        stream_buffer_chunks=max(1, _env_int("SIDECAR_STREAM_BUFFER_CHUNKS", 64)),
+        validation_cache_entries=max(0, _env_int("SIDECAR_VALIDATION_CACHE_ENTRIES", 1024)),
+        validation_cache_mb=max(0, _env_int("SIDECAR_VALIDATION_CACHE_MB", 64)),
+        validation_workers=max(
+            0, _env_int("SIDECAR_VALIDATION_WORKERS", (os.cpu_count() or 1) // http_workers)
+        ),
+        validation_shard_threshold_kb=max(
+            1, _env_int("SIDECAR_VALIDATION_SHARD_THRESHOLD_KB", 1024)
+        ),
+        validation_stream_chunk_kb=max(
+            1, _env_int("SIDECAR_VALIDATION_STREAM_CHUNK_KB", 1024)
+        ),
+        isolation_registry_size=max(0, _env_int("SIDECAR_ISOLATION_REGISTRY_SIZE", 256)),
+        path_cache_size=max(0, _env_int("SIDECAR_PATH_CACHE_SIZE", 4096)),
+        file_index_recheck_ms=max(0, _env_int("SIDECAR_FILE_INDEX_RECHECK_MS", 0)),
+        code_cache_entries=max(0, _env_int("SIDECAR_CODE_CACHE_ENTRIES", 512)),
+        code_cache_mb=max(0, _env_int("SIDECAR_CODE_CACHE_MB", 64)),
+        max_sessions=max(0, _env_int("SIDECAR_MAX_SESSIONS", 16)),
+        session_idle_ttl_s=max(1, _env_int("SIDECAR_SESSION_IDLE_TTL_S", 600)),
+        session_memory_limit_mb=max(0, _env_int("SIDECAR_SESSION_MEMORY_LIMIT_MB", 1024)),
+        log_level=_env_str("SIDECAR_LOG_LEVEL", "INFO"),
+        log_queue_size=max(1, _env_int("SIDECAR_LOG_QUEUE_SIZE", 10000)),
+        log_sample_rates=_env_str("SIDECAR_LOG_SAMPLE_RATES", ""),
+    )
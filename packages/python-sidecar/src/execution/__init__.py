@@ -0,0 +1,18 @@
+"""Off-loop code execution for the Python sidecar."""
+
+from .pool import ExecutionPool, ThreadExecutionPool, create_execution_pool
+from .sessions import SessionLimitError, SessionManager, SessionNotFoundError
+from .streaming import OutputStream
+from .worker import ExecutionJob, OutputChunk
+
+__all__ = [
+    "ExecutionPool",
+    "ThreadExecutionPool",
+    "ExecutionJob",
+    "OutputChunk",
+    "OutputStream",
+    "create_execution_pool",
+    "SessionManager",
+    "SessionNotFoundError",
+    "SessionLimitError",
+]
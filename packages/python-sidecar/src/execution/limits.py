@@ -0,0 +1,125 @@
+"""
+Per-execution resource limits and accounting for worker processes.
+
+Limits are applied with setrlimit around each job, relative to what the
+long-lived worker has already used, and lifted again afterwards:
+
+- RLIMIT_AS caps how much address space a snippet may add, so a runaway
+  allocation raises MemoryError instead of getting the container OOM-killed.
+- RLIMIT_CPU caps the CPU seconds a snippet may consume; the kernel sends
+  SIGXCPU, which is turned into CPUTimeExceeded inside the snippet.
+
+Peak resident memory is measured per job by resetting the kernel's
+high-water mark (VmHWM) before the job where supported.
+"""
+
+import math
+import resource
+import signal
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+import structlog
+
+from ..security.secure_executor import CPUTimeExceeded
+
+logger = structlog.get_logger(__name__)
+
+_job_active = False
+
+
+@dataclass
+class JobUsage:
+    """Resources used by one job."""
+
+    peak_rss_bytes: int | None = None
+
+
+def _on_sigxcpu(signum, frame) -> None:
+    # Only interrupt user code; a late signal between jobs is ignored
+    if _job_active:
+        raise CPUTimeExceeded()
+
+
+def install_limit_handlers() -> None:
+    """Turn SIGXCPU into CPUTimeExceeded; call once from the worker's main thread."""
+    signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+
+def _read_status_kb(field: str) -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS; False if the kernel does not allow it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _set_soft_limit(which: int, soft: int) -> int:
+    """Lower a soft limit (never above the hard limit); return the previous one."""
+    previous, hard = resource.getrlimit(which)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(which, (soft, hard))
+    return previous
+
+
+def _restore_soft_limit(which: int, soft: int) -> None:
+    _, hard = resource.getrlimit(which)
+    resource.setrlimit(which, (soft, hard))
+
+
+@contextmanager
+def job_limits(memory_limit_mb: int = 0, cpu_limit_ms: int = 0) -> Iterator[JobUsage]:
+    """
+    Run the enclosed job under memory and CPU limits (0 = no limit).
+
+    Yields a JobUsage that holds the job's peak RSS once the block exits.
+    """
+    global _job_active
+
+    usage = JobUsage()
+    hwm_reset = _reset_peak_rss()
+    restore: list[tuple[int, int]] = []
+
+    try:
+        if memory_limit_mb:
+            size_kb = _read_status_kb("VmSize")
+            if size_kb is not None:
+                soft = size_kb * 1024 + memory_limit_mb * 1024 * 1024
+                restore.append((resource.RLIMIT_AS, _set_soft_limit(resource.RLIMIT_AS, soft)))
+        if cpu_limit_ms:
+            used = resource.getrusage(resource.RUSAGE_SELF)
+            soft = math.ceil(used.ru_utime + used.ru_stime + cpu_limit_ms / 1000)
+            restore.append((resource.RLIMIT_CPU, _set_soft_limit(resource.RLIMIT_CPU, soft)))
+    except (OSError, ValueError) as e:
+        logger.warning("Could not apply execution limits", error=str(e))
+
+    _job_active = True
+    try:
+        yield usage
+    finally:
+        _job_active = False
+        for which, soft in reversed(restore):
+            _restore_soft_limit(which, soft)
+
+        if hwm_reset:
+            peak_kb = _read_status_kb("VmHWM")
+            usage.peak_rss_bytes = peak_kb * 1024 if peak_kb is not None else None
+        else:
+            # Lifetime peak of the process, in kilobytes on Linux
+            usage.peak_rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
@@ -0,0 +1,412 @@
+"""
+Pre-forked pool of warm execution workers.
+
+The pool keeps ``size`` long-lived worker processes. Jobs are handed to an
+idle worker by a dispatcher thread, so the asyncio event loop never blocks on
+user code. Workers are recycled after a configurable number of jobs or once
+their resident set grows past a configurable limit.
+
+Timeouts are enforced twice: the worker interrupts the snippet at its
+deadline and returns the partial output, and if the worker has not answered
+``kill_grace_ms`` later the pool kills it and spawns a replacement. Workers
+forward output as it is written, so a killed job still returns the stdout
+it produced, as a timeout in the executor does. If a
+replacement fails to start, its slot stays queued empty and is respawned by
+the next job that takes it, so the pool never loses capacity for good.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Callable
+
+import structlog
+
+from ..cache import CacheStats
+from ..config import SidecarSettings
+from ..security.secure_executor import ExecutionResult, code_cache_stats
+from .worker import WORKER_READY, ExecutionJob, OutputChunk, WorkerReply, run_job, worker_main
+
+logger = structlog.get_logger(__name__)
+
+# Modules imported once in the fork server so every worker starts warm
+PRELOAD_MODULES = [
+    "src.execution.worker",
+    "src.execution.sessions",
+    "src.security.sharded_validation",
+]
+
+# How long a new worker may take to report that it is warm
+WORKER_START_TIMEOUT_S = 30
+
+
+def get_worker_context(start_method: str) -> multiprocessing.context.BaseContext:
+    """Return the multiprocessing context used for worker processes."""
+    if start_method not in multiprocessing.get_all_start_methods():
+        logger.warning("Worker start method unavailable, using spawn", start_method=start_method)
+        start_method = "spawn"
+
+    ctx = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        ctx.set_forkserver_preload(PRELOAD_MODULES)
+    return ctx
+
+
+@dataclass
+class _Worker:
+    """Parent-side handle for a worker process."""
+
+    process: BaseProcess
+    conn: Connection
+    jobs_served: int = 0
+    code_cache: CacheStats | None = None
+
+
+class ExecutionPool:
+    """Pool of long-lived processes that run SecurePythonExecutor jobs."""
+
+    def __init__(
+        self,
+        size: int,
+        max_jobs_per_worker: int = 0,
+        max_rss_mb: int = 0,
+        start_method: str = "forkserver",
+        kill_grace_ms: int = 2000,
+    ):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.start_method = start_method
+        self.kill_grace_ms = kill_grace_ms
+
+        self._ctx: multiprocessing.context.BaseContext | None = None
+        # Idle workers; None marks a slot whose worker failed to (re)spawn
+        self._idle: queue.Queue[_Worker | None] = queue.Queue()
+        self._dispatcher: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._workers: list[_Worker] = []
+        self._closed = False
+        # Jobs waiting for a worker, and jobs currently running
+        self._queued = 0
+        self._running = 0
+
+    @property
+    def started(self) -> bool:
+        return self._dispatcher is not None
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but not yet running."""
+        return self._queued
+
+    @property
+    def active_workers(self) -> int:
+        """Workers currently running a job."""
+        return self._running
+
+    def start(self) -> None:
+        """Spawn the worker processes."""
+        if self.started:
+            return
+
+        self._ctx = get_worker_context(self.start_method)
+
+        for _ in range(self.size):
+            self._idle.put(self._spawn_worker())
+
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=self.size,
+            thread_name_prefix="exec-dispatch",
+        )
+
+        logger.info(
+            "Execution pool started",
+            workers=self.size,
+            start_method=self._ctx.get_start_method(),
+            max_jobs_per_worker=self.max_jobs_per_worker,
+            max_rss_mb=self.max_rss_bytes // (1024 * 1024),
+        )
+
+    def shutdown(self) -> None:
+        """Stop the dispatcher and terminate all workers."""
+        self._closed = True
+        if self._dispatcher is not None:
+            self._dispatcher.shutdown(wait=False, cancel_futures=True)
+            self._dispatcher = None
+
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            self._stop_worker(worker)
+
+        logger.info("Execution pool stopped")
+
+    def submit(
+        self,
+        job: ExecutionJob,
+        on_output: Callable[[OutputChunk], None] | None = None,
+    ) -> "Future[ExecutionResult]":
+        """
+        Queue a job and return a future for its result.
+
+        For streaming jobs ``on_output`` is called from a dispatcher thread
+        with each chunk of output, before the future resolves.
+        """
+        if self._dispatcher is None or self._closed:
+            raise RuntimeError("Execution pool is not running")
+        with self._lock:
+            self._queued += 1
+        return self._dispatcher.submit(self._dispatch, job, on_output)
+
+    async def run(self, job: ExecutionJob) -> ExecutionResult:
+        """Run a job on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(job))
+
+    def code_cache_stats(self) -> CacheStats:
+        """Sum the compiled code cache counters last reported by live workers."""
+        with self._lock:
+            reports = [w.code_cache for w in self._workers if w.code_cache is not None]
+        return CacheStats.total(reports)
+
+    def _spawn_worker(self) -> _Worker:
+        assert self._ctx is not None
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(child_conn,),
+            name="exec-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        # Block until the worker has imported the sandbox and is warm
+        try:
+            ready = (
+                parent_conn.poll(WORKER_START_TIMEOUT_S) and parent_conn.recv() == WORKER_READY
+            )
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            parent_conn.close()
+            process.kill()
+            process.join()
+            raise RuntimeError("Execution worker failed to start")
+
+        worker = _Worker(process=process, conn=parent_conn)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _stop_worker(self, worker: _Worker) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        try:
+            worker.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        worker.conn.close()
+        worker.process.join(timeout=1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+
+    def _try_spawn_worker(self) -> _Worker | None:
+        """Spawn a worker, or log the failure and return None for an empty slot."""
+        try:
+            return self._spawn_worker()
+        except (OSError, RuntimeError) as e:
+            logger.error("Execution worker failed to spawn", error=str(e))
+            return None
+
+    def _replace_worker(self, worker: _Worker, reason: str) -> _Worker | None:
+        logger.info(
+            "Recycling execution worker",
+            pid=worker.process.pid,
+            jobs_served=worker.jobs_served,
+            reason=reason,
+        )
+        self._stop_worker(worker)
+        return self._try_spawn_worker()
+
+    def _dispatch(
+        self,
+        job: ExecutionJob,
+        on_output: Callable[[OutputChunk], None] | None = None,
+    ) -> ExecutionResult:
+        worker = self._idle.get()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            if worker is None:
+                worker = self._try_spawn_worker()
+                if worker is None:
+                    self._idle.put(None)
+                    return ExecutionResult(
+                        success=False, error="No execution worker could be started"
+                    )
+            return self._run_on(worker, job, on_output)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _run_on(
+        self,
+        worker: _Worker,
+        job: ExecutionJob,
+        on_output: Callable[[OutputChunk], None] | None,
+    ) -> ExecutionResult:
+        deadline = time.monotonic() + (job.timeout_ms + self.kill_grace_ms) / 1000
+        # Stdout of a non-streaming job, kept in case the worker is killed
+        stdout: list[str] = []
+        try:
+            worker.conn.send(job)
+            # Relay output until the reply arrives or the deadline passes
+            message = None
+            while worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                message = worker.conn.recv()
+                if not isinstance(message, OutputChunk):
+                    break
+                if on_output is not None:
+                    on_output(message)
+                elif not job.stream and message.stream == "stdout":
+                    stdout.append(message.text)
+            if not isinstance(message, WorkerReply):
+                logger.warning(
+                    "Execution worker missed its deadline, killing it",
+                    pid=worker.process.pid,
+                    timeout_ms=job.timeout_ms,
+                )
+                worker.process.kill()
+                self._idle.put(self._replace_worker(worker, "timeout"))
+                return ExecutionResult(
+                    success=False,
+                    error=f"Execution timed out after {job.timeout_ms}ms",
+                    output="".join(stdout) or None,
+                    timed_out=True,
+                )
+            reply: WorkerReply = message
+        except (EOFError, OSError) as e:
+            logger.error("Execution worker died", pid=worker.process.pid, error=str(e))
+            self._idle.put(self._replace_worker(worker, "crashed"))
+            return ExecutionResult(
+                success=False,
+                error="Execution worker terminated unexpectedly",
+                output="".join(stdout) or None,
+            )
+
+        worker.jobs_served += 1
+        worker.code_cache = reply.code_cache
+        if self.max_jobs_per_worker and worker.jobs_served >= self.max_jobs_per_worker:
+            worker = self._replace_worker(worker, "max_jobs")
+        elif self.max_rss_bytes and reply.rss_bytes > self.max_rss_bytes:
+            worker = self._replace_worker(worker, "max_rss")
+
+        if self._closed and worker is not None:
+            self._stop_worker(worker)
+        else:
+            self._idle.put(worker)
+        return reply.result
+
+
+class ThreadExecutionPool:
+    """
+    In-process alternative to ExecutionPool that runs jobs on threads.
+
+    Each job gets its own ExecutionContext, so working directory and output
+    capture do not leak between concurrent jobs. Threads cannot be killed:
+    a snippet that ignores its timeout interruption keeps its thread busy.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but not yet running."""
+        return self._queued
+
+    @property
+    def active_workers(self) -> int:
+        """Threads currently running a job."""
+        return self._running
+
+    def start(self) -> None:
+        """Create the worker threads."""
+        if self.started:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="exec")
+        logger.info("Thread execution pool started", workers=self.size)
+
+    def shutdown(self) -> None:
+        """Stop accepting work; running jobs finish in the background."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("Thread execution pool stopped")
+
+    def submit(
+        self,
+        job: ExecutionJob,
+        on_output: Callable[[OutputChunk], None] | None = None,
+    ) -> "Future[ExecutionResult]":
+        """Queue a job and return a future for its result."""
+        if self._executor is None:
+            raise RuntimeError("Execution pool is not running")
+        with self._lock:
+            self._queued += 1
+        return self._executor.submit(self._run, job, on_output)
+
+    async def run(self, job: ExecutionJob) -> ExecutionResult:
+        """Run a job on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(job))
+
+    def code_cache_stats(self) -> CacheStats:
+        """Compiled code cache counters; threads share this process's cache."""
+        return code_cache_stats()
+
+    def _run(
+        self,
+        job: ExecutionJob,
+        on_output: Callable[[OutputChunk], None] | None,
+    ) -> ExecutionResult:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return run_job(job, on_output)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+def create_execution_pool(settings: SidecarSettings) -> ExecutionPool | ThreadExecutionPool:
+    """Build the execution pool selected by ``settings.executor_mode``."""
+    if settings.executor_mode == "thread":
+        return ThreadExecutionPool(size=settings.executor_workers)
+    if settings.executor_mode != "process":
+        raise ValueError(f"Unknown executor mode: {settings.executor_mode}")
+    return ExecutionPool(
+        size=settings.executor_workers,
+        max_jobs_per_worker=settings.worker_max_jobs,
+        max_rss_mb=settings.worker_max_rss_mb,
+        start_method=settings.worker_start_method,
+        kill_grace_ms=settings.execution_kill_grace_ms,
+    )
@@ -0,0 +1,385 @@
+"""
+Persistent execution sessions (REPL mode).
+
+A session owns a dedicated worker process whose globals survive between
+calls, so a multi-step agent workflow can load data once and reuse it.
+Each session is bound to one project root, capped in memory, and closed
+explicitly or once it has been idle for longer than its TTL.
+"""
+
+import asyncio
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, Callable
+
+import structlog
+
+from ..config import get_settings
+from ..logging_config import configure_logging
+from ..security.isolation import ProjectIsolation
+from ..security.secure_executor import ExecutionResult, SecurePythonExecutor
+from .limits import install_limit_handlers, job_limits
+from .worker import (
+    WORKER_READY,
+    WorkerReply,
+    current_rss_bytes,
+    describe_memory_limit,
+    portable_result,
+)
+
+logger = structlog.get_logger(__name__)
+
+# How long a new session may take to report ready
+SESSION_START_TIMEOUT_S = 30
+
+
+class SessionError(Exception):
+    """Base class for session management errors."""
+
+
+class SessionNotFoundError(SessionError):
+    """The session does not exist, was closed or has expired."""
+
+
+class SessionLimitError(SessionError):
+    """The maximum number of concurrent sessions has been reached."""
+
+
+@dataclass
+class SessionJob:
+    """A snippet to run against a session's retained globals."""
+
+    code: str
+    timeout_ms: int = 60000
+    output_limit: int = 0
+    cpu_limit_ms: int = 0
+
+
+def _limit_address_space(limit_bytes: int) -> None:
+    """Allow the process to map at most ``limit_bytes`` beyond its current size."""
+    import os
+    import resource
+
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return
+
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = current + limit_bytes
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def session_main(
+    conn: Connection,
+    project_root: str,
+    authorized_imports: list[str],
+    memory_limit_mb: int,
+) -> None:
+    """Serve SessionJobs against one retained namespace until closed."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    install_limit_handlers()
+    configure_logging(get_settings(), background=False)
+
+    try:
+        isolation = ProjectIsolation(project_root, enable_audit=True)
+        executor = SecurePythonExecutor(
+            project_isolation=isolation,
+            additional_authorized_imports=authorized_imports,
+        )
+        namespace = executor.create_namespace()
+        if memory_limit_mb:
+            _limit_address_space(memory_limit_mb * 1024 * 1024)
+    except Exception as e:
+        conn.send(str(e))
+        conn.close()
+        return
+
+    conn.send(WORKER_READY)
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        try:
+            # Memory is capped for the session as a whole, CPU per call
+            with job_limits(cpu_limit_ms=job.cpu_limit_ms) as usage:
+                result = executor.execute(
+                    job.code,
+                    timeout_ms=job.timeout_ms,
+                    namespace=namespace,
+                    output_limit=job.output_limit,
+                )
+            result.peak_rss_bytes = usage.peak_rss_bytes
+            result = portable_result(describe_memory_limit(result, memory_limit_mb))
+        except Exception as e:
+            result = ExecutionResult(success=False, error=str(e))
+        try:
+            conn.send(WorkerReply(result=result, rss_bytes=current_rss_bytes()))
+        except (BrokenPipeError, OSError):
+            break
+
+    conn.close()
+
+
+@dataclass
+class _Session:
+    """Parent-side handle for a session process."""
+
+    id: str
+    project_root: str
+    process: BaseProcess
+    conn: Connection
+    last_used: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SessionManager:
+    """Creates, runs and expires persistent execution sessions."""
+
+    def __init__(
+        self,
+        max_sessions: int,
+        idle_ttl_s: int,
+        memory_limit_mb: int = 0,
+        kill_grace_ms: int = 2000,
+        start_method: str = "forkserver",
+        output_limit: int = 0,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl_s = idle_ttl_s
+        self.memory_limit_mb = memory_limit_mb
+        self.kill_grace_ms = kill_grace_ms
+        self.start_method = start_method
+        self.output_limit = output_limit
+
+        self._ctx = None
+        self._sessions: dict[str, _Session] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._stop = threading.Event()
+        self._reaper: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the reaper that closes idle sessions."""
+        from .pool import get_worker_context
+
+        self._ctx = get_worker_context(self.start_method)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.max_sessions),
+            thread_name_prefix="session",
+        )
+        self._stop.clear()
+        self._reaper = threading.Thread(target=self._reap_loop, name="session-reaper", daemon=True)
+        self._reaper.start()
+        logger.info(
+            "Session manager started",
+            max_sessions=self.max_sessions,
+            idle_ttl_s=self.idle_ttl_s,
+            memory_limit_mb=self.memory_limit_mb,
+        )
+
+    def shutdown(self) -> None:
+        """Close every session and stop the reaper."""
+        self._stop.set()
+        with self._lock:
+            session_ids = list(self._sessions)
+        for session_id in session_ids:
+            self._close(session_id, "shutdown")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("Session manager stopped")
+
+    @property
+    def active_sessions(self) -> int:
+        return len(self._sessions)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking manager call without blocking the event loop."""
+        if self._executor is None:
+            raise RuntimeError("Session manager is not running")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def create(self, project_root: str, authorized_imports: list[str] | None = None) -> str:
+        """
+        Start a session bound to ``project_root``.
+
+        Returns:
+            The new session id
+
+        Raises:
+            SessionLimitError: If ``max_sessions`` sessions are already open
+            ValueError: If the session could not be initialised
+        """
+        with self._lock:
+            if len(self._sessions) + self._pending >= self.max_sessions:
+                raise SessionLimitError(f"Session limit reached ({self.max_sessions})")
+            self._pending += 1
+
+        try:
+            parent_conn, child_conn = self._ctx.Pipe()
+            process = self._ctx.Process(
+                target=session_main,
+                args=(child_conn, project_root, authorized_imports or [], self.memory_limit_mb),
+                name="exec-session",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+
+            try:
+                if not parent_conn.poll(SESSION_START_TIMEOUT_S):
+                    process.kill()
+                    raise ValueError("Session worker failed to start")
+                try:
+                    ready = parent_conn.recv()
+                except (EOFError, OSError):
+                    raise ValueError("Session worker failed to start") from None
+                if ready != WORKER_READY:
+                    raise ValueError(ready)
+            except ValueError:
+                parent_conn.close()
+                # A worker that reported an error exits on its own
+                process.join(timeout=1)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+                raise
+
+            session = _Session(
+                id=uuid.uuid4().hex,
+                project_root=project_root,
+                process=process,
+                conn=parent_conn,
+                last_used=time.monotonic(),
+            )
+            with self._lock:
+                self._sessions[session.id] = session
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        logger.info("Session created", session_id=session.id, project_root=project_root)
+        return session.id
+
+    def execute(
+        self,
+        session_id: str,
+        code: str,
+        timeout_ms: int = 60000,
+        cpu_limit_ms: int = 0,
+    ) -> ExecutionResult:
+        """
+        Run code against a session's retained globals.
+
+        Calls on the same session are serialised. A session whose worker
+        misses its hard deadline, dies, or grows past its memory limit is
+        closed and its state is lost.
+
+        Raises:
+            SessionNotFoundError: If the session does not exist
+        """
+        session = self._get(session_id)
+
+        with session.lock:
+            if session.id not in self._sessions:
+                raise SessionNotFoundError(f"Session not found: {session_id}")
+            session.last_used = time.monotonic()
+            try:
+                session.conn.send(
+                    SessionJob(
+                        code=code,
+                        timeout_ms=timeout_ms,
+                        output_limit=self.output_limit,
+                        cpu_limit_ms=cpu_limit_ms,
+                    )
+                )
+                if not session.conn.poll((timeout_ms + self.kill_grace_ms) / 1000):
+                    self._close(session_id, "timeout")
+                    return ExecutionResult(
+                        success=False,
+                        error=f"Execution timed out after {timeout_ms}ms; session closed",
+                        timed_out=True,
+                    )
+                reply: WorkerReply = session.conn.recv()
+            except (EOFError, OSError):
+                self._close(session_id, "crashed")
+                return ExecutionResult(
+                    success=False,
+                    error="Session worker terminated unexpectedly; session closed",
+                )
+            finally:
+                session.last_used = time.monotonic()
+
+        result = reply.result
+        if self.memory_limit_mb and reply.rss_bytes > self.memory_limit_mb * 1024 * 1024:
+            self._close(session_id, "memory_limit")
+            note = f"Session exceeded its {self.memory_limit_mb}MB memory limit and was closed"
+            result.error = f"{result.error}\n{note}" if result.error else note
+        return result
+
+    def close(self, session_id: str) -> None:
+        """
+        Close a session and terminate its worker.
+
+        Raises:
+            SessionNotFoundError: If the session does not exist
+        """
+        self._get(session_id)
+        self._close(session_id, "closed")
+
+    def _get(self, session_id: str) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise SessionNotFoundError(f"Session not found: {session_id}")
+        return session
+
+    def _close(self, session_id: str, reason: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+
+        try:
+            session.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        session.conn.close()
+        session.process.join(timeout=1)
+        if session.process.is_alive():
+            session.process.kill()
+            session.process.join()
+
+        logger.info("Session closed", session_id=session_id, reason=reason)
+
+    def _reap_loop(self) -> None:
+        interval = max(1.0, min(30.0, self.idle_ttl_s / 2))
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                sessions = list(self._sessions.values())
+            for session in sessions:
+                if now - session.last_used < self.idle_ttl_s:
+                    continue
+                # Skip sessions that are busy running code
+                if session.lock.acquire(blocking=False):
+                    try:
+                        self._close(session.id, "idle")
+                    finally:
+                        session.lock.release()
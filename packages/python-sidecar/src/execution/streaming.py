@@ -0,0 +1,82 @@
+"""
+Streaming execution output.
+
+Bridges OutputChunks produced on a pool thread to an asyncio consumer through
+a bounded queue. A slow consumer blocks the producing thread, which in turn
+stalls the worker, so at most ``max_chunks`` chunks of a job's output are
+held in the sidecar at any time.
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+import structlog
+
+from ..security.secure_executor import ExecutionResult
+from .pool import ExecutionPool, ThreadExecutionPool
+from .worker import ExecutionJob, OutputChunk
+
+logger = structlog.get_logger(__name__)
+
+
+class OutputStream:
+    """
+    Runs one streaming job and yields its output as it is produced.
+
+    Args:
+        pool: Pool to run the job on
+        max_chunks: Chunks buffered between the pool and the consumer
+        stall_timeout_s: How long a full buffer may block the job before the
+            consumer is considered gone and further output is dropped
+    """
+
+    def __init__(
+        self,
+        pool: ExecutionPool | ThreadExecutionPool,
+        max_chunks: int,
+        stall_timeout_s: float,
+    ):
+        self._pool = pool
+        self._stall_timeout_s = stall_timeout_s
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[OutputChunk] = asyncio.Queue(maxsize=max(1, max_chunks))
+        self._abandoned = False
+
+    def _put(self, chunk: OutputChunk) -> None:
+        """Hand a chunk to the consumer; called from a pool thread."""
+        if self._abandoned:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(chunk), self._loop)
+        try:
+            future.result(timeout=self._stall_timeout_s)
+        except Exception:
+            future.cancel()
+            self._abandoned = True
+            logger.warning("Output consumer stalled, dropping further output")
+
+    async def run(self, job: ExecutionJob) -> AsyncIterator[OutputChunk | ExecutionResult]:
+        """
+        Submit ``job`` and yield its OutputChunks, then its ExecutionResult.
+
+        If the consumer stops iterating, the job runs to completion (or its
+        timeout) and its remaining output is discarded.
+        """
+        job.stream = True
+        done = asyncio.wrap_future(self._pool.submit(job, self._put))
+        try:
+            while not done.done() or not self._queue.empty():
+                if not self._queue.empty():
+                    yield self._queue.get_nowait()
+                    continue
+                getter = asyncio.ensure_future(self._queue.get())
+                await asyncio.wait({getter, done}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            yield done.result()
+        finally:
+            self._abandoned = True
+            # Unblock a producer waiting on a full queue
+            while not self._queue.empty():
+                self._queue.get_nowait()
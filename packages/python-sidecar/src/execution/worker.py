@@ -0,0 +1,253 @@
+"""
+Execution worker process.
+
+Each worker is a long-lived process that imports the sandbox modules once and
+then serves ExecutionJobs sent by the ExecutionPool over a pipe.
+"""
+
+import os
+import signal
+import threading
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from typing import Callable
+
+import structlog
+
+from ..cache import CacheStats
+from ..config import get_settings
+from ..logging_config import configure_logging
+from ..security.isolation import IsolationRegistry
+from ..security.secure_executor import ExecutionResult, SecurePythonExecutor, code_cache_stats
+from .limits import install_limit_handlers, job_limits
+
+logger = structlog.get_logger(__name__)
+
+# Handshake message sent once a worker is warm
+WORKER_READY = "ready"
+
+# Streamed output is sent in chunks of at most this many characters, at
+# least every OUTPUT_FLUSH_INTERVAL_S while output is pending
+OUTPUT_CHUNK_CHARS = 8192
+OUTPUT_FLUSH_INTERVAL_S = 0.05
+
+# Per-process isolation reuse; each worker (or the thread pool) owns one
+_isolations = IsolationRegistry(
+    max_entries=get_settings().isolation_registry_size,
+    path_cache_size=get_settings().path_cache_size,
+)
+
+
+@dataclass
+class ExecutionJob:
+    """A unit of work sent from the pool to a worker."""
+
+    project_root: str
+    code: str
+    authorized_imports: list[str] = field(default_factory=list)
+    timeout_ms: int = 60000
+    # Characters of output kept before truncating (0 = unlimited)
+    output_limit: int = 0
+    # Address space the job may add, and CPU time it may use (0 = unlimited)
+    memory_limit_mb: int = 0
+    cpu_limit_ms: int = 0
+    # Deliver output only as OutputChunks while the job runs, not in the
+    # result; otherwise chunks are sent as well when a sink is given, so a
+    # pool can keep the output of a worker it has to kill
+    stream: bool = False
+
+
+@dataclass
+class WorkerReply:
+    """A worker's answer to an ExecutionJob."""
+
+    result: ExecutionResult
+    rss_bytes: int = 0
+    # The worker's compiled code cache counters after this job
+    code_cache: CacheStats | None = None
+
+
+@dataclass
+class OutputChunk:
+    """A piece of a streaming job's stdout or stderr."""
+
+    stream: str
+    text: str
+
+
+class OutputForwarder:
+    """
+    Batches a job's output into OutputChunks delivered from a helper thread.
+
+    The snippet's thread only appends to a buffer, so it is never inside a
+    pipe write when its timeout interruption arrives. When more than
+    ``max_pending`` characters are waiting, writers block until the
+    consumer catches up, which pushes back on a fast-printing snippet.
+    """
+
+    def __init__(
+        self, send: Callable[[OutputChunk], None], max_pending: int = 8 * OUTPUT_CHUNK_CHARS
+    ):
+        self._send = send
+        self._max_pending = max_pending
+        self._pending: list[OutputChunk] = []
+        self._pending_chars = 0
+        # _closing: the job finished; _closed: output can no longer be delivered
+        self._closing = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="output-forwarder", daemon=True)
+        self._thread.start()
+
+    def write(self, stream: str, text: str) -> None:
+        with self._cond:
+            while self._pending_chars >= self._max_pending and not self._closed:
+                self._cond.wait(OUTPUT_FLUSH_INTERVAL_S)
+            if self._closed:
+                return
+            if self._pending and self._pending[-1].stream == stream:
+                self._pending[-1].text += text
+            else:
+                self._pending.append(OutputChunk(stream=stream, text=text))
+            self._pending_chars += len(text)
+            if self._pending_chars >= OUTPUT_CHUNK_CHARS:
+                self._cond.notify_all()
+
+    def close(self) -> None:
+        """Deliver any remaining output and stop the helper thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closing and self._pending_chars < OUTPUT_CHUNK_CHARS:
+                    self._cond.wait(OUTPUT_FLUSH_INTERVAL_S)
+                batch, self._pending = self._pending, []
+                self._pending_chars = 0
+                done = self._closing
+                self._cond.notify_all()
+            try:
+                for chunk in batch:
+                    for start in range(0, len(chunk.text), OUTPUT_CHUNK_CHARS):
+                        end = start + OUTPUT_CHUNK_CHARS
+                        self._send(OutputChunk(chunk.stream, chunk.text[start:end]))
+            except Exception as e:
+                # The consumer is gone; drop the rest of the output
+                logger.warning("Output stream closed", error=str(e))
+                with self._cond:
+                    self._closed = True
+                    self._pending = []
+                    self._cond.notify_all()
+                return
+            if done:
+                return
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of the current process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # ru_maxrss is the peak, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def portable_result(result: ExecutionResult) -> ExecutionResult:
+    """Stringify the snippet's result so it can cross the process boundary."""
+    if result.result is not None:
+        result.result = str(result.result)
+    return result
+
+
+def describe_memory_limit(result: ExecutionResult, memory_limit_mb: int) -> ExecutionResult:
+    """Name the configured limit when a run failed with a bare MemoryError."""
+    if result.limit_exceeded == "memory" and memory_limit_mb and result.error == "Out of memory":
+        result.error = f"Memory limit of {memory_limit_mb}MB exceeded"
+    return result
+
+
+def run_job(
+    job: ExecutionJob,
+    on_chunk: Callable[[OutputChunk], None] | None = None,
+    enforce_limits: bool = False,
+) -> ExecutionResult:
+    """
+    Execute a single job inside this process.
+
+    Output is passed to ``on_chunk``, if given, while the job runs; every
+    chunk has been delivered by the time this returns. Only streaming jobs
+    leave it out of the result. Memory and CPU
+    limits are process-wide, so they are only applied when
+    ``enforce_limits`` says this process runs nothing else.
+    """
+    forwarder = OutputForwarder(on_chunk) if on_chunk else None
+    try:
+        isolation = _isolations.get(job.project_root, enable_audit=True)
+        executor = SecurePythonExecutor(
+            project_isolation=isolation,
+            additional_authorized_imports=job.authorized_imports,
+        )
+
+        def execute() -> ExecutionResult:
+            return executor.execute(
+                job.code,
+                timeout_ms=job.timeout_ms,
+                output_limit=job.output_limit,
+                on_output=forwarder.write if forwarder else None,
+                keep_output=not job.stream,
+            )
+
+        if not enforce_limits:
+            return portable_result(execute())
+
+        with job_limits(job.memory_limit_mb, job.cpu_limit_ms) as usage:
+            result = execute()
+        result.peak_rss_bytes = usage.peak_rss_bytes
+        return portable_result(describe_memory_limit(result, job.memory_limit_mb))
+    except Exception as e:
+        logger.error("Worker job failed", error=str(e))
+        return ExecutionResult(success=False, error=str(e))
+    finally:
+        if forwarder is not None:
+            forwarder.close()
+
+
+def worker_main(conn: Connection) -> None:
+    """Serve jobs from ``conn`` until the pool closes it or sends ``None``."""
+    # Shutdown is driven by the parent; ignore Ctrl-C delivered to the group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    install_limit_handlers()
+    configure_logging(get_settings(), background=False)
+
+    # Tell the pool this worker has finished importing and is ready to serve
+    conn.send(WORKER_READY)
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        # Streamed output travels over the same pipe, ahead of the reply
+        result = run_job(job, on_chunk=conn.send, enforce_limits=True)
+        try:
+            conn.send(
+                WorkerReply(
+                    result=result,
+                    rss_bytes=current_rss_bytes(),
+                    code_cache=code_cache_stats(),
+                )
+            )
+        except (BrokenPipeError, OSError):
+            break
+
+    conn.close()
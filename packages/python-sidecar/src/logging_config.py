@@ -0,0 +1,201 @@
+"""
+Structured logging setup.
+
+Log calls on the request path only filter, sample and timestamp an event;
+rendering it to JSON and writing it out happen on a background thread fed
+by a bounded queue. High-volume events can be sampled per event name, while
+audit events (``audit=True``) and anything at warning or above are always
+kept, both by the sampler and when the queue is full.
+
+orjson is used for rendering when it is installed, the standard library
+``json`` module otherwise.
+"""
+
+import atexit
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+import structlog
+
+from .config import SidecarSettings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Fraction of events kept, by event name, unless overridden by
+# SIDECAR_LOG_SAMPLE_RATES; unlisted events are always kept
+DEFAULT_SAMPLE_RATES = {
+    "Path validation successful": 0.01,
+    "Path validated": 0.01,
+    "Listed allowed paths": 0.01,
+}
+
+_ALWAYS_KEPT_LEVELS = frozenset({"warning", "warn", "error", "exception", "critical", "fatal"})
+
+_handler: "BackgroundQueueHandler | None" = None
+_listener: QueueListener | None = None
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    """
+    Parse ``"event=rate,event=rate"`` into a rate per event name.
+
+    Rates are clamped to [0, 1].
+    """
+    rates = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        event, sep, rate = item.rpartition("=")
+        if not sep or not event.strip():
+            raise ValueError(f"SIDECAR_LOG_SAMPLE_RATES entries must be event=rate, got {item!r}")
+        try:
+            rates[event.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError as e:
+            raise ValueError(f"Invalid sample rate for {event.strip()!r}: {rate!r}") from e
+    return rates
+
+
+def _is_audit(event_dict) -> bool:
+    return isinstance(event_dict, dict) and bool(event_dict.get("audit"))
+
+
+class EventSampler:
+    """structlog processor that keeps a configured fraction of each event."""
+
+    def __init__(self, rates: dict[str, float]):
+        self.rates = {event: rate for event, rate in rates.items() if rate < 1.0}
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        rate = self.rates.get(event_dict.get("event"))
+        if (
+            rate is not None
+            and method_name not in _ALWAYS_KEPT_LEVELS
+            and not _is_audit(event_dict)
+            and random.random() >= rate
+        ):
+            raise structlog.DropEvent
+        return event_dict
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Queue handler that defers all formatting to the listener thread.
+
+    When the queue is full, ordinary records are counted and dropped;
+    audit records and records at warning or above wait for room instead.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The structlog event dict travels as-is and is rendered by the listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING or _is_audit(record.msg):
+                self.queue.put(record)
+            else:
+                self.dropped += 1
+
+
+def _orjson_dumps(obj, default=None, **kwargs) -> str:
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _renderer() -> structlog.processors.JSONRenderer:
+    if orjson is not None:
+        return structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+    return structlog.processors.JSONRenderer()
+
+
+def configure_logging(settings: SidecarSettings, background: bool = True) -> None:
+    """
+    Configure structlog and the root logger for this process.
+
+    Args:
+        settings: Sidecar settings (log level, queue size, sample rates)
+        background: Write from a listener thread. Worker processes log
+            synchronously instead, since a worker killed at its deadline
+            would lose whatever was still queued.
+    """
+    global _handler, _listener
+
+    stop_logging()
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    rates.update(parse_sample_rates(settings.log_sample_rates))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(
+        structlog.stdlib.ProcessorFormatter(
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                _renderer(),
+            ],
+            # Records from plain stdlib loggers
+            foreign_pre_chain=[
+                structlog.stdlib.add_logger_name,
+                structlog.stdlib.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso"),
+            ],
+        )
+    )
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(settings.log_level.upper())
+
+    if background:
+        _handler = BackgroundQueueHandler(queue.Queue(maxsize=max(1, settings.log_queue_size)))
+        _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        root.addHandler(_handler)
+    else:
+        root.addHandler(output)
+
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            EventSampler(rates),
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            # Tracebacks must be captured while the exception is current
+            structlog.processors.format_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        wrapper_class=structlog.stdlib.BoundLogger,
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+
+
+def stop_logging() -> None:
+    """Flush queued records, stop the listener thread and log synchronously from now on."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    root.removeHandler(_handler)
+    for output in _listener.handlers:
+        root.addHandler(output)
+    _listener = None
+
+
+def dropped_log_records() -> int:
+    """Records dropped because the log queue was full."""
+    return _handler.dropped if _handler is not None else 0
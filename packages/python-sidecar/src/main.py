@@ -8,35 +8,190 @@ This sidecar preserves the proven Python security implementations:
 - SecurePythonExecutor for safe code execution
 """
 
-from fastapi import FastAPI, HTTPException
+import codecs
+import os
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import AsyncIterator, TextIO
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel, Field
 import structlog
 
-from .security.isolation import ProjectIsolation
-from .security.owasp_validator import OWASPValidator
-from .security.secure_executor import SecurePythonExecutor
-
-# Configure logging
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.JSONRenderer(),
-    ],
-    wrapper_class=structlog.stdlib.BoundLogger,
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
+from .admission import AdmissionRejected, Lane
+from .cache import content_hash
+from .config import get_settings
+from .logging_config import configure_logging, dropped_log_records
+from .metrics import Metrics, MetricsMiddleware
+from .responses import DuplexStreamingResponse, dumps_json, negotiated_response
+from .startup import report as startup_report
+from .execution import (
+    ExecutionJob,
+    OutputChunk,
+    OutputStream,
+    SessionLimitError,
+    SessionManager,
+    SessionNotFoundError,
+    create_execution_pool,
+)
+from .security.isolation import IsolationRegistry
+from .security.owasp_validator import (
+    LineEdit,
+    OWASPValidator,
+    StreamScanner,
+    ValidationResult,
+    Vulnerability,
+    parse_unified_diff,
 )
+from .security.code_analysis import summary_cache_stats
+from .security.secure_executor import ExecutionResult
+from .security.sharded_validation import ShardedValidator
+from .security.validation_cache import ValidationCache
+
+settings = get_settings()
+
+# Log records are rendered and written from a background thread
+configure_logging(settings)
 
 logger = structlog.get_logger(__name__)
 
+# Warm workers serving /execute, started with the application
+execution_pool = create_execution_pool(settings)
+
+# Persistent REPL-style sessions, each on its own worker process
+session_manager = SessionManager(
+    max_sessions=settings.max_sessions,
+    idle_ttl_s=settings.session_idle_ttl_s,
+    memory_limit_mb=settings.session_memory_limit_mb,
+    kill_grace_ms=settings.execution_kill_grace_ms,
+    start_method=settings.worker_start_method,
+    output_limit=settings.max_output_kb * 1024,
+)
+
+# Executions are admitted up to the pool's capacity; the rest wait in
+# bounded per-project queues, served round-robin
+execution_lane = Lane(
+    "execution",
+    max_active=execution_pool.size,
+    max_queued=settings.execute_queue_size,
+    tenant_max_active=settings.execute_max_per_root,
+    tenant_max_queued=settings.execute_queue_per_root,
+    max_wait_s=settings.execute_max_wait_ms / 1000,
+)
+
+# ProjectIsolation instances reused across requests for the same root
+isolation_registry = IsolationRegistry(
+    max_entries=settings.isolation_registry_size,
+    path_cache_size=settings.path_cache_size,
+    file_index_recheck_ms=settings.file_index_recheck_ms,
+)
+
+# Request, validator, pool and cache metrics served at /metrics
+metrics = Metrics(categories=OWASPValidator.CATEGORIES)
+
+# Validators are stateless, so one instance and one result cache serve all requests
+validator = OWASPValidator(observe_category=metrics.observe_validator_category)
+validation_cache = ValidationCache(
+    max_entries=settings.validation_cache_entries,
+    max_bytes=settings.validation_cache_mb * 1024 * 1024,
+)
+# Large inputs are validated in shards across a process pool
+sharded_validator = ShardedValidator(
+    validator,
+    workers=settings.validation_workers,
+    threshold_chars=settings.validation_shard_threshold_kb * 1024,
+    start_method=settings.worker_start_method,
+)
+
+metrics.register_gauge(
+    "sidecar_executor_queue_depth",
+    "Executions waiting for a worker.",
+    lambda: execution_pool.queue_depth,
+)
+metrics.register_gauge(
+    "sidecar_executor_active_workers",
+    "Workers currently running an execution.",
+    lambda: execution_pool.active_workers,
+)
+metrics.register_gauge(
+    "sidecar_executor_workers",
+    "Size of the execution pool.",
+    lambda: execution_pool.size,
+)
+metrics.register_gauge(
+    "sidecar_sessions_active",
+    "Open persistent execution sessions.",
+    lambda: session_manager.active_sessions,
+)
+metrics.register_gauge(
+    "sidecar_admission_active",
+    "Executions admitted and running.",
+    lambda: execution_lane.active,
+)
+metrics.register_gauge(
+    "sidecar_admission_queued",
+    "Executions waiting for admission.",
+    lambda: execution_lane.queued,
+)
+metrics.register_counter(
+    "sidecar_admission_rejected_tenant_total",
+    "Executions rejected with 429 because their project's queue was full.",
+    lambda: execution_lane.rejected_tenant,
+)
+metrics.register_counter(
+    "sidecar_admission_rejected_overload_total",
+    "Executions rejected with 503 because the sidecar was saturated.",
+    lambda: execution_lane.rejected_overload,
+)
+metrics.register_gauge(
+    "sidecar_startup_seconds",
+    "Time this process took from interpreter start until it was ready to serve.",
+    lambda: startup_report.total_s,
+)
+metrics.register_counter(
+    "sidecar_validations_sharded_total",
+    "Validations split across the validation workers.",
+    lambda: sharded_validator.sharded,
+)
+metrics.register_counter(
+    "sidecar_log_records_dropped_total",
+    "Log records dropped because the background log queue was full.",
+    dropped_log_records,
+)
+metrics.register_cache("validation", validation_cache.stats)
+metrics.register_cache("compiled_code", lambda: execution_pool.code_cache_stats())
+metrics.register_cache("code_analysis", summary_cache_stats)
+metrics.register_cache("isolation", isolation_registry.stats)
+metrics.register_cache("resolved_paths", isolation_registry.path_cache_stats)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the worker pools before serving and stop them on shutdown."""
+    metrics.register_endpoints(route.path for route in app.routes if hasattr(route, "path"))
+    metrics.set_worker(startup_report.worker or 0)
+    execution_pool.start()
+    session_manager.start()
+    sharded_validator.start()
+    startup_report.complete("lifespan", settings.startup_budget_ms)
+    try:
+        yield
+    finally:
+        sharded_validator.shutdown()
+        session_manager.shutdown()
+        execution_pool.shutdown()
+
+
 app = FastAPI(
     title="Python Security Sidecar",
     description="Security validation and code execution for BT1ZAR",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS for local development
@@ -48,6 +203,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency includes every other middleware
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    """Turn an admission rejection into 429/503 with Retry-After."""
+    logger.info(
+        "Request rejected by admission control",
+        path=request.url.path,
+        status=exc.status_code,
+        reason=str(exc),
+        retry_after=exc.retry_after,
+    )
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=exc.status_code,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 # Request/Response models
 class PathValidationRequest(BaseModel):
@@ -69,11 +244,28 @@ class PathValidationResponse(BaseModel):
         populate_by_name = True
 
 
+class LineChange(BaseModel):
+    """A changed region, as in a diff hunk (1-based starts)."""
+    old_start: int = Field(..., ge=1, alias="oldStart")
+    old_lines: int = Field(..., ge=0, alias="oldLines")
+    new_start: int = Field(..., ge=1, alias="newStart")
+    new_lines: int = Field(..., ge=0, alias="newLines")
+
+    class Config:
+        populate_by_name = True
+
+
 class CodeValidationRequest(BaseModel):
     """Request to validate code."""
     code: str
     project_root: str | None = Field(None, alias="projectRoot")
     authorized_imports: list[str] | None = Field(None, alias="authorizedImports")
+    # Optional revision info: the content hash of a previously validated
+    # text and how ``code`` differs from it, either as a unified diff or as
+    # changed regions. The base is only used if its result is still cached.
+    base_hash: str | None = Field(None, alias="baseHash")
+    patch: str | None = None
+    changes: list[LineChange] | None = None
 
     class Config:
         populate_by_name = True
@@ -88,6 +280,13 @@ class SecurityVulnerability(BaseModel):
     description: str
     location: str | None = None
     remediation: str | None = None
+    line: int | None = None
+    column: int | None = None
+    end_line: int | None = Field(None, alias="endLine")
+    end_column: int | None = Field(None, alias="endColumn")
+
+    class Config:
+        populate_by_name = True
 
 
 class CodeValidationResponse(BaseModel):
@@ -100,12 +299,94 @@ class CodeValidationResponse(BaseModel):
         populate_by_name = True
 
 
+# Upper bound on items accepted by the batch endpoints
+MAX_BATCH_ITEMS = 1000
+
+
+class PathBatchValidationRequest(BaseModel):
+    """Request to validate many paths against one project root."""
+    project_root: str = Field(..., alias="projectRoot")
+    paths: list[str] = Field(..., max_length=MAX_BATCH_ITEMS)
+
+    class Config:
+        populate_by_name = True
+
+
+class PathBatchValidationResponse(BaseModel):
+    """Per-path results, in request order."""
+    results: list[PathValidationResponse]
+
+
+# Upper bound on entries per page of /files/list
+MAX_LIST_LIMIT = 10000
+# Entries /files/list/stream matches per step off the event loop
+FILE_STREAM_BATCH = 1000
+
+
+class FileListRequest(BaseModel):
+    """Request to list the project files matching a glob pattern."""
+    project_root: str = Field(..., alias="projectRoot")
+    pattern: str = "*"
+    # nextCursor of the previous page; omitted for the first page
+    cursor: str | None = None
+    limit: int = Field(1000, ge=1, le=MAX_LIST_LIMIT)
+
+    class Config:
+        populate_by_name = True
+
+
+class FileEntry(BaseModel):
+    """A listed path, relative to the project root."""
+    path: str
+    is_dir: bool = Field(..., alias="isDir")
+
+    class Config:
+        populate_by_name = True
+
+
+class FileListResponse(BaseModel):
+    """One page of matching entries in path order; nextCursor is null on the last page."""
+    entries: list[FileEntry]
+    next_cursor: str | None = Field(None, alias="nextCursor")
+
+    class Config:
+        populate_by_name = True
+
+
+class CodeBatchValidationRequest(BaseModel):
+    """Request to validate many code snippets."""
+    items: list[CodeValidationRequest] = Field(..., max_length=MAX_BATCH_ITEMS)
+
+
+class CodeBatchValidationResult(CodeValidationResponse):
+    """Result for one snippet of a batch; ``error`` is set if it failed."""
+    error: str | None = None
+
+
+class CodeBatchValidationResponse(BaseModel):
+    """Per-snippet results, in request order."""
+    results: list[CodeBatchValidationResult]
+
+
+class FileValidationRequest(BaseModel):
+    """Request to validate a file inside a project root."""
+    project_root: str = Field(..., alias="projectRoot")
+    path: str
+
+    class Config:
+        populate_by_name = True
+
+
 class CodeExecutionRequest(BaseModel):
     """Request to execute code."""
     project_root: str = Field(..., alias="projectRoot")
     code: str
     authorized_imports: list[str] = Field(default_factory=list, alias="authorizedImports")
-    timeout: int = 60000  # milliseconds
+    timeout: int = Field(60000, gt=0)  # milliseconds
+    # Optional tighter limits; the sidecar's configured limits are the maximum
+    memory_limit_mb: int | None = Field(None, gt=0, alias="memoryLimitMb")
+    cpu_time_limit: int | None = Field(None, gt=0, alias="cpuTimeLimit")  # milliseconds
+    output_limit_kb: int | None = Field(None, gt=0, alias="outputLimitKb")
 
     class Config:
         populate_by_name = True
@@ -118,6 +399,42 @@ class CodeExecutionResponse(BaseModel):
     output: str | None = None
     error: str | None = None
     execution_time: int | None = Field(None, alias="executionTime")
+    timed_out: bool = Field(False, alias="timedOut")
+    # "memory", "cpu" or "output" when a limit stopped or truncated the run
+    limit_exceeded: str | None = Field(None, alias="limitExceeded")
+    # Resource accounting for the snippet itself (executionTime is end to end)
+    cpu_time: int | None = Field(None, alias="cpuTime")  # milliseconds
+    wall_time: int | None = Field(None, alias="wallTime")  # milliseconds
+    peak_rss_bytes: int | None = Field(None, alias="peakRssBytes")
+
+    class Config:
+        populate_by_name = True
+
+
+class SessionCreateRequest(BaseModel):
+    """Request to open a persistent execution session."""
+    project_root: str = Field(..., alias="projectRoot")
+    authorized_imports: list[str] = Field(default_factory=list, alias="authorizedImports")
+
+    class Config:
+        populate_by_name = True
+
+
+class SessionResponse(BaseModel):
+    """A persistent execution session."""
+    session_id: str = Field(..., alias="sessionId")
+    project_root: str = Field(..., alias="projectRoot")
+    idle_ttl: int = Field(..., alias="idleTtl")  # seconds
+
+    class Config:
+        populate_by_name = True
+
+
+class SessionExecutionRequest(BaseModel):
+    """Request to execute code in a session."""
+    code: str
+    timeout: int = Field(60000, gt=0)  # milliseconds
+    cpu_time_limit: int | None = Field(None, gt=0, alias="cpuTimeLimit")  # milliseconds
 
     class Config:
         populate_by_name = True
@@ -136,8 +453,21 @@ async def health_check():
     return HealthResponse(status="healthy", version="0.1.0")
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Expose metrics in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _path_payload(
+    valid: bool, resolved_path: str | None = None, error: str | None = None
+) -> dict:
+    """Wire form of PathValidationResponse."""
+    return {"valid": valid, "resolvedPath": resolved_path, "error": error}
+
+
 @app.post("/validate/path", response_model=PathValidationResponse)
-async def validate_path(request: PathValidationRequest):
+async def validate_path(request: PathValidationRequest, accept: str | None = Header(None)):
     """
     Validate a path against project isolation boundaries.
 
@@ -145,7 +475,7 @@ async def validate_path(request: PathValidationRequest):
     the project root directory.
     """
     try:
-        isolation = ProjectIsolation(request.project_root, enable_audit=True)
+        isolation = isolation_registry.get(request.project_root, enable_audit=True)
         validated_path = isolation.validate_path(request.path)
 
         logger.info(
@@ -155,10 +485,7 @@ async def validate_path(request: PathValidationRequest):
             resolved=str(validated_path),
         )
 
-        return PathValidationResponse(
-            valid=True,
-            resolved_path=str(validated_path),
-        )
+        return negotiated_response(_path_payload(True, resolved_path=str(validated_path)), accept)
     except PermissionError as e:
         logger.warning(
             "Path validation failed",
@@ -166,10 +493,7 @@ async def validate_path(request: PathValidationRequest):
             path=request.path,
             error=str(e),
         )
-        return PathValidationResponse(
-            valid=False,
-            error=str(e),
-        )
+        return negotiated_response(_path_payload(False, error=str(e)), accept)
     except Exception as e:
         logger.error(
             "Path validation error",
@@ -180,130 +504,650 @@ async def validate_path(request: PathValidationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _request_edits(request: CodeValidationRequest) -> list[LineEdit] | None:
+    """The edits a request describes relative to its base, if any."""
+    if request.changes is not None:
+        return [
+            LineEdit(c.old_start, c.old_lines, c.new_start, c.new_lines) for c in request.changes
+        ]
+    if request.patch is not None:
+        return parse_unified_diff(request.patch)
+    return None
+
+
+async def _cached_validate(
+    text: str,
+    cache_control: str | None,
+    base_hash: str | None = None,
+    edits: list[LineEdit] | None = None,
+) -> tuple[ValidationResult, bool, bool]:
+    """
+    Validate text through the result cache.
+
+    Honours ``Cache-Control: no-cache`` (revalidate, then store) and
+    ``no-store`` (bypass the cache entirely). On a miss, if the result for
+    ``base_hash`` is cached and ``edits`` describe how ``text`` differs
+    from it, only the edited regions are rescanned; edits that do not fit
+    fall back to a full validation, which is sharded across the validation
+    workers for large texts.
+
+    Returns:
+        The validation result, whether it was served from the cache and
+        whether it was revalidated incrementally
+    """
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    no_store = "no-store" in directives
+    no_cache = no_store or "no-cache" in directives
+
+    digest = content_hash(text)
+    if not no_cache:
+        cached = validation_cache.get(digest)
+        if cached is not None:
+            return cached, True, False
+
+    result = None
+    if base_hash and edits is not None:
+        base = validation_cache.get(base_hash.lower())
+        if base is not None and base.scan is not None:
+            try:
+                result = validator.revalidate(text, base.scan, edits)
+            except ValueError as e:
+                logger.warning("Incremental validation fell back to full", error=str(e))
+
+    incremental = result is not None
+    if result is None:
+        result = await sharded_validator.validate(text)
+    if not no_store:
+        validation_cache.put(digest, result)
+    return result, False, incremental
+
+
+def _vulnerability_payload(v: Vulnerability) -> dict:
+    """Wire form of SecurityVulnerability."""
+    return {
+        "id": v.id,
+        "category": v.category,
+        "severity": v.severity,
+        "title": v.title,
+        "description": v.description,
+        "location": v.location,
+        "remediation": v.remediation,
+        "line": v.line,
+        "column": v.column,
+        "endLine": v.end_line,
+        "endColumn": v.end_column,
+    }
+
+
+def _validation_payload(result: ValidationResult) -> dict:
+    """Wire form of CodeValidationResponse for validator findings."""
+    return {
+        "valid": result.valid,
+        "vulnerabilities": [_vulnerability_payload(v) for v in result.vulnerabilities],
+        "complianceScore": result.compliance_score,
+    }
+
+
 @app.post("/validate/code", response_model=CodeValidationResponse)
-async def validate_code(request: CodeValidationRequest):
+async def validate_code(
+    request: CodeValidationRequest,
+    cache_control: str | None = Header(None),
+    accept: str | None = Header(None),
+):
     """
     Validate code for security vulnerabilities.
 
     Uses OWASP Top 10 validation to detect common vulnerabilities
-    like SQL injection, XSS, command injection, etc.
+    like SQL injection, XSS, command injection, etc. Results are cached
+    by content hash. A request that names the hash of a previously
+    validated text (``baseHash``) and its ``patch`` or ``changes`` is
+    revalidated incrementally; ``X-Validation`` reports which way a
+    result was computed.
     """
     try:
-        validator = OWASPValidator()
-        result = validator.validate(request.code)
-
-        vulnerabilities = [
-            SecurityVulnerability(
-                id=v.id,
-                category=v.category,
-                severity=v.severity,
-                title=v.title,
-                description=v.description,
-                location=v.location,
-                remediation=v.remediation,
-            )
-            for v in result.vulnerabilities
-        ]
+        result, cache_hit, incremental = await _cached_validate(
+            request.code, cache_control, request.base_hash, _request_edits(request)
+        )
 
         logger.info(
             "Code validated",
-            vulnerabilities_count=len(vulnerabilities),
+            vulnerabilities_count=len(result.vulnerabilities),
             compliance_score=result.compliance_score,
+            cache_hit=cache_hit,
+            incremental=incremental,
         )
 
-        return CodeValidationResponse(
-            valid=result.valid,
-            vulnerabilities=vulnerabilities,
-            compliance_score=result.compliance_score,
-        )
+        headers = {"X-Cache": "HIT" if cache_hit else "MISS"}
+        if not cache_hit:
+            headers["X-Validation"] = "incremental" if incremental else "full"
+        return negotiated_response(_validation_payload(result), accept, headers=headers)
     except Exception as e:
         logger.error("Code validation error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/validate/owasp", response_model=CodeValidationResponse)
-async def validate_owasp(config: dict):
+async def validate_owasp(
+    config: dict,
+    cache_control: str | None = Header(None),
+    accept: str | None = Header(None),
+):
     """
     Run OWASP validation on configuration.
     """
     try:
-        validator = OWASPValidator()
         # Convert config to string for validation
         import json
         config_str = json.dumps(config)
-        result = validator.validate(config_str)
-
-        vulnerabilities = [
-            SecurityVulnerability(
-                id=v.id,
-                category=v.category,
-                severity=v.severity,
-                title=v.title,
-                description=v.description,
-                location=v.location,
-                remediation=v.remediation,
-            )
-            for v in result.vulnerabilities
-        ]
+        result, cache_hit, _ = await _cached_validate(config_str, cache_control)
 
-        return CodeValidationResponse(
-            valid=result.valid,
-            vulnerabilities=vulnerabilities,
-            compliance_score=result.compliance_score,
+        return negotiated_response(
+            _validation_payload(result),
+            accept,
+            headers={"X-Cache": "HIT" if cache_hit else "MISS"},
         )
     except Exception as e:
         logger.error("OWASP validation error", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/validate/paths:batch", response_model=PathBatchValidationResponse)
+async def validate_paths_batch(
+    request: PathBatchValidationRequest,
+    accept: str | None = Header(None),
+):
+    """
+    Validate many paths against one project root in a single round trip.
+
+    All paths share one ProjectIsolation. Failures are reported per path.
+    """
+    try:
+        isolation = isolation_registry.get(request.project_root, enable_audit=True)
+    except Exception as e:
+        logger.error(
+            "Path batch validation error",
+            project_root=request.project_root,
+            error=str(e),
+        )
+        raise HTTPException(status_code=500, detail=str(e))
+
+    results = []
+    blocked = 0
+    for path in request.paths:
+        try:
+            results.append(
+                _path_payload(True, resolved_path=str(isolation.validate_path(path)))
+            )
+        except Exception as e:
+            blocked += 1
+            results.append(_path_payload(False, error=str(e)))
+
+    logger.info(
+        "Path batch validated",
+        project_root=request.project_root,
+        count=len(results),
+        invalid=blocked,
+    )
+
+    return negotiated_response({"results": results}, accept)
+
+
+def _file_index(project_root: str):
+    """The file index of a project root, with request errors mapped to status codes."""
+    try:
+        return isolation_registry.get(project_root, enable_audit=True).file_index
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/files/list", response_model=FileListResponse)
+async def list_files(request: FileListRequest, accept: str | None = Header(None)):
+    """
+    List the files and directories of a project matching a glob pattern.
+
+    Answered from the project's file index (see src/security/file_index.py),
+    in path order, a page at a time: pass the returned ``nextCursor`` as
+    ``cursor`` to get the next page.
+    """
+    index = _file_index(request.project_root)
+    try:
+        # One extra entry tells whether another page follows
+        entries = list(islice(index.glob(request.pattern, request.cursor), request.limit + 1))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if len(entries) > request.limit:
+        entries = entries[: request.limit]
+        next_cursor = entries[-1].path
+
+    logger.debug(
+        "Files listed",
+        project_root=request.project_root,
+        pattern=request.pattern,
+        count=len(entries),
+        more=next_cursor is not None,
+    )
+    return negotiated_response(
+        {
+            "entries": [{"path": e.path, "isDir": e.is_dir} for e in entries],
+            "nextCursor": next_cursor,
+        },
+        accept,
+    )
+
+
+@app.post("/files/list/stream")
+async def list_files_stream(request: FileListRequest):
+    """
+    Stream every project entry matching a glob pattern as NDJSON.
+
+    Each entry is sent as ``{"type": "entry", "path": ..., "isDir": ...}``
+    in path order, starting after ``cursor`` if given (``limit`` is
+    ignored); the last line is ``{"type": "result", "count", "error"}``.
+    """
+    index = _file_index(request.project_root)
+    try:
+        entries = index.glob(request.pattern, request.cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def next_batch() -> list:
+        return list(islice(entries, FILE_STREAM_BATCH))
+
+    async def events():
+        count = 0
+        error = None
+        try:
+            while batch := await run_in_threadpool(next_batch):
+                count += len(batch)
+                yield b"".join(
+                    dumps_json({"type": "entry", "path": e.path, "isDir": e.is_dir}) + b"\n"
+                    for e in batch
+                )
+        except Exception as e:
+            logger.error("File listing error", project_root=request.project_root, error=str(e))
+            error = str(e)
+        yield dumps_json({"type": "result", "count": count, "error": error}) + b"\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.post("/validate/code:batch", response_model=CodeBatchValidationResponse)
+async def validate_code_batch(
+    request: CodeBatchValidationRequest,
+    cache_control: str | None = Header(None),
+    accept: str | None = Header(None),
+):
+    """
+    Validate many code snippets in a single round trip.
+
+    Snippets share the validator and result cache. Failures are reported
+    per snippet.
+    """
+    results = []
+    hits = 0
+    for item in request.items:
+        try:
+            result, cache_hit, _ = await _cached_validate(
+                item.code, cache_control, item.base_hash, _request_edits(item)
+            )
+            hits += cache_hit
+            results.append({**_validation_payload(result), "error": None})
+        except Exception as e:
+            logger.error("Code batch item validation error", error=str(e))
+            results.append(
+                {"valid": False, "vulnerabilities": [], "complianceScore": None, "error": str(e)}
+            )
+
+    logger.info("Code batch validated", count=len(results), cache_hits=hits)
+
+    return negotiated_response({"results": results}, accept)
+
+
+async def _body_text(request: Request) -> AsyncIterator[str]:
+    """The request body decoded as UTF-8 as it arrives."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in request.stream():
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+async def _file_text(f: TextIO, chunk_chars: int) -> AsyncIterator[str]:
+    """Read an open text file a chunk at a time, then close it."""
+    try:
+        while text := await run_in_threadpool(f.read, chunk_chars):
+            yield text
+    finally:
+        f.close()
+
+
+async def _validation_events(source: str, pieces: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Validate text as it arrives, yielding NDJSON lines for what is found."""
+    import time
+    start_time = time.time()
+    scanner: StreamScanner = validator.stream(settings.validation_stream_chunk_kb * 1024)
+
+    def lines(findings: list[Vulnerability]) -> bytes:
+        return b"".join(
+            dumps_json({"type": "vulnerability", **_vulnerability_payload(v)}) + b"\n"
+            for v in findings
+        )
+
+    error = None
+    try:
+        async for text in pieces:
+            # Scanning a chunk takes long enough that the loop should not wait on it
+            findings = await run_in_threadpool(scanner.feed, text)
+            if findings:
+                yield lines(findings)
+        findings = await run_in_threadpool(scanner.finish)
+        if findings:
+            yield lines(findings)
+    except ClientDisconnect:
+        logger.info("Stream validation abandoned by the client", source=source, chars=scanner.chars)
+        return
+    except Exception as e:
+        logger.error("Stream validation error", source=source, error=str(e))
+        error = str(e)
+
+    logger.info(
+        "Stream validated",
+        source=source,
+        chars=scanner.chars,
+        vulnerabilities_count=scanner.vulnerability_count,
+        compliance_score=scanner.compliance_score,
+        duration_ms=int((time.time() - start_time) * 1000),
+    )
+    result = {
+        "type": "result",
+        "valid": scanner.valid and error is None,
+        "complianceScore": scanner.compliance_score,
+        "vulnerabilityCount": scanner.vulnerability_count,
+        "chars": scanner.chars,
+        "lines": scanner.line_count,
+        "error": error,
+    }
+    yield dumps_json(result) + b"\n"
+
+
+@app.post("/validate/stream")
+async def validate_stream(request: Request):
+    """
+    Validate a request body of any size, streaming findings back as NDJSON.
+
+    The body is the text itself (e.g. a generated bundle or a config dump;
+    decoded as UTF-8), read and scanned a chunk at a time, so memory use
+    does not grow with its size. Each finding is sent as soon as its chunk
+    is scanned as ``{"type": "vulnerability", ...}`` with the fields of
+    SecurityVulnerability; the last line is ``{"type": "result", "valid",
+    "complianceScore", "vulnerabilityCount", "chars", "lines", "error"}``.
+    Findings are numbered in stream order and only the regex rules run
+    (see StreamScanner); results are not cached.
+    """
+    return DuplexStreamingResponse(
+        _validation_events("body", _body_text(request)),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/validate/file")
+async def validate_file(request: FileValidationRequest):
+    """
+    Validate a file inside a project root, streaming findings back as NDJSON.
+
+    The file is read a chunk at a time; the response is as for
+    /validate/stream. Responds 403 for a path outside the project and 404
+    if the file does not exist.
+    """
+    try:
+        isolation = isolation_registry.get(request.project_root, enable_audit=True)
+        path = isolation.validate_path(request.path)
+        # Newlines are kept as they are so columns match the file
+        f = open(path, "r", encoding="utf-8", errors="replace", newline="")
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        _validation_events(
+            "file", _file_text(f, settings.validation_stream_chunk_kb * 1024)
+        ),
+        media_type="application/x-ndjson",
+        # Covers a client that disconnects before the body starts
+        background=BackgroundTask(f.close),
+    )
+
+
+def _effective_limit(requested: int | None, configured: int) -> int:
+    """Apply a request's limit without exceeding the configured one (0 = unlimited)."""
+    if not requested:
+        return configured
+    return min(requested, configured) if configured else requested
+
+
+def _tenant(project_root: str) -> str:
+    """Admission key for a project root; spelling variants of one path share it."""
+    return os.path.normpath(project_root)
+
+
+def _execution_job(request: CodeExecutionRequest) -> ExecutionJob:
+    """Build a pool job with the request's limits capped by the sidecar's."""
+    output_kb = _effective_limit(request.output_limit_kb, settings.max_output_kb)
+    return ExecutionJob(
+        project_root=request.project_root,
+        code=request.code,
+        authorized_imports=request.authorized_imports,
+        timeout_ms=request.timeout,
+        output_limit=output_kb * 1024,
+        memory_limit_mb=_effective_limit(
+            request.memory_limit_mb, settings.execution_memory_limit_mb
+        ),
+        cpu_limit_ms=_effective_limit(
+            request.cpu_time_limit, settings.execution_cpu_limit_s * 1000
+        ),
+    )
+
+
+def _execution_payload(result: ExecutionResult, execution_time: int) -> dict:
+    """Wire form of CodeExecutionResponse for an executor result."""
+    return {
+        "success": result.success,
+        "result": str(result.result) if result.result is not None else None,
+        "output": result.output,
+        "error": result.error,
+        "executionTime": execution_time,
+        "timedOut": result.timed_out,
+        "limitExceeded": result.limit_exceeded,
+        "cpuTime": result.cpu_time_ms,
+        "wallTime": result.wall_time_ms,
+        "peakRssBytes": result.peak_rss_bytes,
+    }
+
+
+def _execution_error_payload(error: str) -> dict:
+    return CodeExecutionResponse(success=False, error=error).model_dump(by_alias=True)
+
+
 @app.post("/execute", response_model=CodeExecutionResponse)
-async def execute_code(request: CodeExecutionRequest):
+async def execute_code(request: CodeExecutionRequest, accept: str | None = Header(None)):
     """
     Execute code securely within project isolation.
 
-    Uses SecurePythonExecutor with:
+    Runs on a warm worker process from the execution pool using
+    SecurePythonExecutor with:
     - ProjectIsolation for path validation
     - Import authorization
     - Timeout enforcement
-    """
-    try:
-        isolation = ProjectIsolation(request.project_root, enable_audit=True)
-        executor = SecurePythonExecutor(
-            project_isolation=isolation,
-            additional_authorized_imports=request.authorized_imports,
-        )
 
-        import time
-        start_time = time.time()
+    Responds 429 or 503, with Retry-After, when the execution cannot be
+    admitted (see src/admission.py).
+    """
+    import time
+    start_time = time.time()
 
-        result = executor.execute(
-            request.code,
-            timeout_ms=request.timeout,
-        )
+    ticket = await execution_lane.acquire(_tenant(request.project_root))
+    try:
+        result = await execution_pool.run(_execution_job(request))
 
         execution_time = int((time.time() - start_time) * 1000)
 
         logger.info(
             "Code executed",
             success=result.success,
+            timed_out=result.timed_out,
             execution_time_ms=execution_time,
+            cpu_time_ms=result.cpu_time_ms,
+            peak_rss_bytes=result.peak_rss_bytes,
+            limit_exceeded=result.limit_exceeded,
         )
 
-        return CodeExecutionResponse(
-            success=result.success,
-            result=str(result.result) if result.result is not None else None,
-            output=result.output,
-            error=result.error,
-            execution_time=execution_time,
-        )
+        return negotiated_response(_execution_payload(result, execution_time), accept)
     except Exception as e:
         logger.error("Code execution error", error=str(e))
-        return CodeExecutionResponse(
-            success=False,
-            error=str(e),
+        return negotiated_response(_execution_error_payload(str(e)), accept)
+    finally:
+        ticket.release()
+
+
+@app.post("/execute/stream")
+async def execute_code_stream(request: CodeExecutionRequest):
+    """
+    Execute code and stream its output as newline-delimited JSON.
+
+    While the snippet runs, each chunk of output is sent as
+    ``{"type": "output", "stream": "stdout" | "stderr", "data": "..."}``.
+    The last line is ``{"type": "result", ...}`` with the fields of
+    CodeExecutionResponse; its ``output`` is null because it was streamed.
+    """
+    import time
+    start_time = time.time()
+
+    # Admitted before the response starts, so rejections are plain 429/503
+    ticket = await execution_lane.acquire(_tenant(request.project_root))
+    job = _execution_job(request)
+    stream = OutputStream(
+        execution_pool,
+        max_chunks=settings.stream_buffer_chunks,
+        stall_timeout_s=(request.timeout + settings.execution_kill_grace_ms) / 1000,
+    )
+
+    async def events():
+        try:
+            async for item in stream.run(job):
+                if isinstance(item, OutputChunk):
+                    line = {"type": "output", "stream": item.stream, "data": item.text}
+                    yield dumps_json(line) + b"\n"
+                    continue
+
+                execution_time = int((time.time() - start_time) * 1000)
+                logger.info(
+                    "Code executed (streamed)",
+                    success=item.success,
+                    timed_out=item.timed_out,
+                    execution_time_ms=execution_time,
+                    cpu_time_ms=item.cpu_time_ms,
+                    peak_rss_bytes=item.peak_rss_bytes,
+                    limit_exceeded=item.limit_exceeded,
+                )
+                payload = _execution_payload(item, execution_time)
+        except Exception as e:
+            logger.error("Code execution error", error=str(e))
+            payload = _execution_error_payload(str(e))
+        finally:
+            ticket.release()
+
+        yield dumps_json({"type": "result", **payload}) + b"\n"
+
+    # The background task covers a client that disconnects before the body starts
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(ticket.release),
+    )
+
+
+@app.post("/sessions", response_model=SessionResponse, status_code=201)
+async def create_session(request: SessionCreateRequest):
+    """
+    Open a persistent execution session bound to a project root.
+
+    Globals defined by one call stay available to later calls until the
+    session is closed or has been idle longer than its TTL.
+    """
+    if settings.http_workers > 1:
+        # Later calls could be accepted by a worker that does not hold the session
+        raise HTTPException(status_code=501, detail="Sessions require SIDECAR_HTTP_WORKERS=1")
+    try:
+        session_id = await session_manager.run(
+            session_manager.create,
+            request.project_root,
+            request.authorized_imports,
+        )
+    except SessionLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        logger.warning("Session creation failed", project_root=request.project_root, error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return SessionResponse(
+        session_id=session_id,
+        project_root=request.project_root,
+        idle_ttl=session_manager.idle_ttl_s,
+    )
+
+
+@app.post("/sessions/{session_id}/execute", response_model=CodeExecutionResponse)
+async def execute_in_session(
+    session_id: str,
+    request: SessionExecutionRequest,
+    accept: str | None = Header(None),
+):
+    """Execute code against a session's retained globals."""
+    import time
+    start_time = time.time()
+
+    try:
+        result = await session_manager.run(
+            session_manager.execute,
+            session_id,
+            request.code,
+            request.timeout,
+            _effective_limit(request.cpu_time_limit, settings.execution_cpu_limit_s * 1000),
         )
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    execution_time = int((time.time() - start_time) * 1000)
+
+    logger.info(
+        "Session code executed",
+        session_id=session_id,
+        success=result.success,
+        timed_out=result.timed_out,
+        execution_time_ms=execution_time,
+    )
+
+    return negotiated_response(_execution_payload(result, execution_time), accept)
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def close_session(session_id: str):
+    """Close a session and discard its state."""
+    try:
+        await session_manager.run(session_manager.close, session_id)
+    except SessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8766)
+    from .server import main
+
+    main(app)
@@ -0,0 +1,220 @@
+"""
+Prometheus metrics for the sidecar.
+
+Every series is allocated up front: recording a request or a validation
+only increments preallocated slots, and gauges and cache statistics are
+read when ``/metrics`` is scraped. Counters are updated from the event loop
+thread, so no locks are taken on the request path.
+
+Metrics are per process. With several HTTP workers each one serves its own
+series on the shared listener, so every series carries a ``worker`` label:
+a scrape reports one worker, and sum() across the label gives the totals
+without counters appearing to go backwards between scrapes.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from .cache import CacheStats
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# Validator time per rule category, in seconds
+VALIDATOR_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# Label used for requests that did not match a route
+UNMATCHED_ENDPOINT = "unmatched"
+
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` only touches preallocated slots."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bound plus the +Inf overflow slot
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class _EndpointStats:
+    __slots__ = ("latency", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statuses = [0] * len(_STATUS_CLASSES)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    Registry of the sidecar's metrics.
+
+    Args:
+        categories: Validator rule categories to time
+    """
+
+    def __init__(self, categories: Iterable[str]):
+        self._endpoints: dict[str, _EndpointStats] = {UNMATCHED_ENDPOINT: _EndpointStats()}
+        self._validator = {category: Histogram(VALIDATOR_BUCKETS) for category in categories}
+        self._gauges: list[tuple[str, str, Callable[[], float]]] = []
+        self._counters: list[tuple[str, str, Callable[[], float]]] = []
+        self._caches: list[tuple[str, Callable[[], CacheStats]]] = []
+        self._worker = 'worker="0"'
+
+    def set_worker(self, index: int) -> None:
+        """Label every series with this HTTP worker's index."""
+        self._worker = f'worker="{index}"'
+
+    def register_endpoints(self, paths: Iterable[str]) -> None:
+        """Allocate request series for route paths (templated, e.g. /sessions/{session_id})."""
+        for path in paths:
+            self._endpoints.setdefault(path, _EndpointStats())
+
+    def register_gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Expose ``read()`` as a gauge sampled at scrape time."""
+        self._gauges.append((name, help_text, read))
+
+    def register_counter(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Expose ``read()``, a monotonically increasing total, as a counter."""
+        self._counters.append((name, help_text, read))
+
+    def register_cache(self, name: str, read: Callable[[], CacheStats]) -> None:
+        """Expose a cache's counters and hit ratio, sampled at scrape time."""
+        self._caches.append((name, read))
+
+    def observe_request(self, endpoint: str | None, status: int, seconds: float) -> None:
+        stats = self._endpoints.get(endpoint) or self._endpoints[UNMATCHED_ENDPOINT]
+        stats.latency.observe(seconds)
+        stats.statuses[min(max(status // 100, 1), 5) - 1] += 1
+
+    def observe_validator_category(self, category: str, seconds: float) -> None:
+        histogram = self._validator.get(category)
+        if histogram is not None:
+            histogram.observe(seconds)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        worker = self._worker
+        lines = [
+            "# HELP sidecar_http_requests_total Requests handled, by endpoint and status class.",
+            "# TYPE sidecar_http_requests_total counter",
+        ]
+        for path, stats in self._endpoints.items():
+            for status_class, count in zip(_STATUS_CLASSES, stats.statuses):
+                lines.append(
+                    f'sidecar_http_requests_total{{{worker},endpoint="{_escape(path)}",'
+                    f'status="{status_class}"}} {count}'
+                )
+
+        lines += [
+            "# HELP sidecar_http_request_duration_seconds Request latency, by endpoint.",
+            "# TYPE sidecar_http_request_duration_seconds histogram",
+        ]
+        for path, stats in self._endpoints.items():
+            lines += stats.latency.render(
+                "sidecar_http_request_duration_seconds", f'{worker},endpoint="{_escape(path)}"'
+            )
+
+        lines += [
+            "# HELP sidecar_validator_category_seconds OWASP validator time per rule category.",
+            "# TYPE sidecar_validator_category_seconds histogram",
+        ]
+        for category, histogram in self._validator.items():
+            lines += histogram.render(
+                "sidecar_validator_category_seconds", f'{worker},category="{_escape(category)}"'
+            )
+
+        for name, help_text, read in self._gauges:
+            lines += [
+                f"# HELP {name} {help_text}",
+                f"# TYPE {name} gauge",
+                f"{name}{{{worker}}} {read()}",
+            ]
+
+        for name, help_text, read in self._counters:
+            lines += [
+                f"# HELP {name} {help_text}",
+                f"# TYPE {name} counter",
+                f"{name}{{{worker}}} {read()}",
+            ]
+
+        if self._caches:
+            snapshots = [(name, read()) for name, read in self._caches]
+            for metric, kind, help_text, value in (
+                ("hits_total", "counter", "Cache hits.", lambda s: s.hits),
+                ("misses_total", "counter", "Cache misses.", lambda s: s.misses),
+                ("evictions_total", "counter", "Cache evictions.", lambda s: s.evictions),
+                ("entries", "gauge", "Entries currently cached.", lambda s: s.entries),
+                ("bytes", "gauge", "Estimated size of cached entries.", lambda s: s.bytes),
+                ("hit_ratio", "gauge", "Hits divided by lookups.", lambda s: s.hit_ratio),
+            ):
+                lines += [
+                    f"# HELP sidecar_cache_{metric} {help_text}",
+                    f"# TYPE sidecar_cache_{metric} {kind}",
+                ]
+                lines += [
+                    f'sidecar_cache_{metric}{{{worker},cache="{name}"}} {value(stats)}'
+                    for name, stats in snapshots
+                ]
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts and latency per route."""
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route in the shared scope
+            route = scope.get("route")
+            self.metrics.observe_request(
+                getattr(route, "path", None), status, time.perf_counter() - start
+            )
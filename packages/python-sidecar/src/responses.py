@@ -0,0 +1,127 @@
+"""
+Fast response encoding with MessagePack negotiation.
+
+The endpoints with large bodies (execution output, long vulnerability lists)
+build plain dicts whose keys are already the camelCase wire names and return
+them through ``negotiated_response``. That skips constructing, validating
+and serializing Pydantic response models; the ``response_model`` declarations
+still document the bodies in OpenAPI.
+
+Bodies are encoded with orjson when it is installed, and as MessagePack when
+the client prefers ``application/msgpack`` in its Accept header and msgpack
+is installed. Anything that cannot be encoded that way (e.g. lone surrogates
+in captured output) falls back to ASCII-escaped JSON.
+"""
+
+import json
+from functools import lru_cache
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+_MSGPACK_ALIASES = frozenset({MSGPACK_MEDIA_TYPE, "application/x-msgpack"})
+_JSON_RANGES = frozenset({JSON_MEDIA_TYPE, "application/*", "*/*"})
+
+
+def _quality(params: list[str]) -> float:
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return min(max(float(value), 0.0), 1.0)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+@lru_cache(maxsize=128)
+def negotiate(accept: str | None) -> str:
+    """
+    Pick the response media type for an Accept header.
+
+    MessagePack is chosen only when it is named explicitly with a quality
+    at least that of JSON (or a range covering JSON); everything else,
+    including a missing header, gets JSON.
+    """
+    if msgpack is None or not accept or "msgpack" not in accept:
+        return JSON_MEDIA_TYPE
+
+    msgpack_q = 0.0
+    json_q = 0.0
+    for entry in accept.split(","):
+        media_range, *params = entry.split(";")
+        media_range = media_range.strip().lower()
+        if media_range in _MSGPACK_ALIASES:
+            msgpack_q = max(msgpack_q, _quality(params))
+        elif media_range in _JSON_RANGES:
+            json_q = max(json_q, _quality(params))
+
+    if msgpack_q > 0 and msgpack_q >= json_q:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def dumps_json(payload) -> bytes:
+    """Encode ``payload`` as compact JSON."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # orjson rejects strings that are not valid UTF-8
+            pass
+    try:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    except UnicodeEncodeError:
+        return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def negotiated_response(
+    payload: dict,
+    accept: str | None,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Encode ``payload`` as JSON or MessagePack, according to ``accept``."""
+    media_type = negotiate(accept)
+    body = None
+    if media_type == MSGPACK_MEDIA_TYPE:
+        try:
+            body = msgpack.packb(payload)
+        except UnicodeEncodeError:
+            media_type = JSON_MEDIA_TYPE
+    if body is None:
+        body = dumps_json(payload)
+
+    response = Response(
+        content=body, status_code=status_code, headers=headers, media_type=media_type
+    )
+    response.headers["Vary"] = "Accept"
+    return response
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose body iterator is still reading the request body.
+
+    StreamingResponse normally reads ``receive`` itself while streaming to
+    notice a disconnect, which would swallow request body messages. Here the
+    iterator sees the disconnect when it next reads the body instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
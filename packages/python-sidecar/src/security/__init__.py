@@ -1,7 +1,7 @@
 """Security modules for Python sidecar."""
 
-from .isolation import ProjectIsolation
+from .isolation import IsolationRegistry, ProjectIsolation
 from .owasp_validator import OWASPValidator
 from .secure_executor import SecurePythonExecutor
 
-__all__ = ["ProjectIsolation", "OWASPValidator", "SecurePythonExecutor"]
+__all__ = ["ProjectIsolation", "IsolationRegistry", "OWASPValidator", "SecurePythonExecutor"]
@@ -0,0 +1,256 @@
+"""
+AST-based analysis of Python snippets.
+
+A snippet is parsed once into a compact CodeSummary of its imports, dynamic
+imports and interesting call sites. The summary drives the executor's import
+decisions and the validator's command-injection checks, replacing substring
+scans that missed ``import  subprocess`` or ``import os, subprocess`` and
+flagged matches inside comments.
+"""
+
+import ast
+from dataclasses import dataclass
+
+from ..cache import CacheStats, LRUCache, content_hash
+
+# Filename used when compiling snippets; keeps error messages unchanged
+SNIPPET_FILENAME = "<string>"
+
+# Calls whose use matters to a security check
+_WATCHED_CALLS = frozenset(
+    {
+        "os.system",
+        "os.popen",
+        "subprocess.run",
+        "subprocess.call",
+        "subprocess.Popen",
+        "exec",
+        "eval",
+        "__import__",
+        "importlib.import_module",
+    }
+)
+
+
+@dataclass(frozen=True)
+class ImportRef:
+    """One imported module and, for ``from`` imports, the names taken from it."""
+
+    module: str
+    names: tuple[str, ...] = ()
+    line: int = 0
+
+    @property
+    def qualified_names(self) -> tuple[str, ...]:
+        """Dotted names bound by the import, e.g. "os.system" for ``from os import system``."""
+        if not self.names:
+            return (self.module,)
+        # Relative modules already end with a dot ("from . import x")
+        prefix = self.module if self.module.endswith(".") or not self.module else f"{self.module}."
+        return tuple(prefix + name for name in self.names)
+
+
+@dataclass(frozen=True)
+class CallSite:
+    """A call to a watched function, or any call passing ``shell=True``."""
+
+    # Dotted name after resolving import aliases, e.g. "subprocess.run"
+    name: str
+    line: int
+    column: int
+    end_line: int
+    end_column: int
+    # An argument builds a string with +, %, an f-string or str.format()
+    concatenated: bool
+    shell_true: bool
+
+
+@dataclass(frozen=True)
+class CodeSummary:
+    """What a snippet imports and calls, extracted from a single parse."""
+
+    imports: tuple[ImportRef, ...]
+    # Literal module names passed to __import__ / importlib.import_module
+    dynamic_imports: frozenset[str]
+    # Resolved names of calls made through imported names, e.g. "os.spawnv"
+    attribute_calls: frozenset[str]
+    # Whether the snippet references ``__builtins__`` directly
+    uses_builtins: bool
+    calls: tuple[CallSite, ...]
+    syntax_error: str | None = None
+
+    def referenced_names(self) -> set[str]:
+        """Every module, imported name and resolved call name the snippet uses."""
+        names = set(self.dynamic_imports) | self.attribute_calls
+        for ref in self.imports:
+            names.add(ref.module)
+            names.update(ref.qualified_names)
+        names.update(call.name for call in self.calls if call.name)
+        if self.uses_builtins:
+            names.add("__builtins__")
+        return names
+
+
+def _dotted_name(node: ast.expr) -> str | None:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def _builds_string(node: ast.AST) -> bool:
+    for child in ast.walk(node):
+        if isinstance(child, ast.BinOp) and isinstance(child.op, (ast.Add, ast.Mod)):
+            return True
+        if isinstance(child, ast.JoinedStr) and any(
+            isinstance(v, ast.FormattedValue) for v in child.values
+        ):
+            return True
+        if (
+            isinstance(child, ast.Call)
+            and isinstance(child.func, ast.Attribute)
+            and child.func.attr == "format"
+        ):
+            return True
+    return False
+
+
+class _Collector(ast.NodeVisitor):
+    def __init__(self, lines: list[bytes]):
+        self.lines = lines
+        self.aliases: dict[str, str] = {}
+        self.imports: list[ImportRef] = []
+        self.dynamic_imports: set[str] = set()
+        self.attribute_calls: set[str] = set()
+        self.uses_builtins = False
+        self.calls: list[CallSite] = []
+
+    def _column(self, line: int, byte_offset: int) -> int:
+        # AST offsets are UTF-8 byte offsets; report 1-based character columns
+        text = self.lines[line - 1] if 0 < line <= len(self.lines) else b""
+        return len(text[:byte_offset].decode("utf-8", errors="replace")) + 1
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports.append(ImportRef(module=alias.name, line=node.lineno))
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                top = alias.name.split(".")[0]
+                self.aliases[top] = top
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = "." * node.level + (node.module or "")
+        ref = ImportRef(
+            module=module,
+            names=tuple(alias.name for alias in node.names),
+            line=node.lineno,
+        )
+        self.imports.append(ref)
+        for alias, qualified in zip(node.names, ref.qualified_names):
+            self.aliases[alias.asname or alias.name] = qualified
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id == "__builtins__":
+            self.uses_builtins = True
+
+    def _resolve(self, dotted: str) -> str:
+        head, _, rest = dotted.partition(".")
+        base = self.aliases.get(head, head)
+        return f"{base}.{rest}" if rest else base
+
+    def visit_Call(self, node: ast.Call) -> None:
+        dotted = _dotted_name(node.func)
+        name = self._resolve(dotted) if dotted else None
+        if dotted and dotted.partition(".")[0] in self.aliases:
+            self.attribute_calls.add(name)
+
+        if name in ("__import__", "importlib.import_module") and node.args:
+            first = node.args[0]
+            if isinstance(first, ast.Constant) and isinstance(first.value, str):
+                self.dynamic_imports.add(first.value)
+
+        shell_true = any(
+            kw.arg == "shell" and isinstance(kw.value, ast.Constant) and kw.value.value is True
+            for kw in node.keywords
+        )
+        if name in _WATCHED_CALLS or shell_true:
+            arguments = [*node.args, *(kw.value for kw in node.keywords)]
+            self.calls.append(
+                CallSite(
+                    name=name or "",
+                    line=node.lineno,
+                    column=self._column(node.lineno, node.col_offset),
+                    end_line=node.end_lineno or node.lineno,
+                    end_column=self._column(
+                        node.end_lineno or node.lineno, node.end_col_offset or 0
+                    ),
+                    concatenated=any(_builds_string(arg) for arg in arguments),
+                    shell_true=shell_true,
+                )
+            )
+        self.generic_visit(node)
+
+
+def _unparsed_summary(error: str) -> CodeSummary:
+    return CodeSummary(
+        imports=(),
+        dynamic_imports=frozenset(),
+        attribute_calls=frozenset(),
+        uses_builtins=False,
+        calls=(),
+        syntax_error=error,
+    )
+
+
+def parse_snippet(code: str) -> tuple[ast.Module | None, CodeSummary]:
+    """
+    Parse ``code`` once and summarise it.
+
+    Returns:
+        The module AST (None on syntax errors) and its summary
+    """
+    try:
+        tree = ast.parse(code, filename=SNIPPET_FILENAME)
+        collector = _Collector(code.encode("utf-8", "surrogatepass").split(b"\n"))
+        collector.visit(tree)
+    except (SyntaxError, ValueError) as e:
+        return None, _unparsed_summary(str(e))
+    except (RecursionError, MemoryError):
+        # Nesting too deep for the parser or the visitor; treat it as non-Python
+        return None, _unparsed_summary("code is nested too deeply to parse")
+
+    return tree, CodeSummary(
+        imports=tuple(collector.imports),
+        dynamic_imports=frozenset(collector.dynamic_imports),
+        attribute_calls=frozenset(collector.attribute_calls),
+        uses_builtins=collector.uses_builtins,
+        calls=tuple(sorted(collector.calls, key=lambda call: (call.line, call.column))),
+    )
+
+
+_summary_cache: LRUCache[str, CodeSummary] = LRUCache(max_entries=256)
+
+
+def analyze_code(code: str) -> CodeSummary:
+    """Return the summary of ``code``, reusing it for repeated sources."""
+    key = content_hash(code)
+    summary = _summary_cache.get(key)
+    if summary is None:
+        _, summary = parse_snippet(code)
+        _summary_cache.put(key, summary)
+    return summary
+
+
+def summary_cache_stats() -> CacheStats:
+    """Return hit/miss counters of this process's summary cache."""
+    return _summary_cache.stats()
+
+
+def remember_summary(code: str, summary: CodeSummary) -> None:
+    """Seed the summary cache with a summary produced by ``parse_snippet``."""
+    _summary_cache.put(content_hash(code), summary)
@@ -0,0 +1,140 @@
+"""
+Per-job execution context.
+
+Replaces process-wide ``os.chdir`` and ``sys.stdout`` swapping with state
+bound to the running job through a ContextVar, so many snippets can execute
+in parallel threads without their working directories or output mixing.
+"""
+
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+_current: ContextVar["ExecutionContext | None"] = ContextVar("execution_context", default=None)
+
+_router_lock = threading.Lock()
+_router_installed = False
+
+# Appended once when a job's output reaches its limit
+TRUNCATION_MARKER = "\n[output truncated after {limit} characters]\n"
+
+
+class OutputCapture(io.TextIOBase):
+    """One output stream of a job; writes are accounted by the owning context."""
+
+    def __init__(self, context: "ExecutionContext", name: str):
+        self._context = context
+        self._name = name
+        self._buffer = io.StringIO()
+
+    def write(self, s: str) -> int:
+        self._context._write(self._name, s)
+        return len(s)
+
+    def getvalue(self) -> str:
+        return self._buffer.getvalue()
+
+
+@dataclass
+class ExecutionContext:
+    """
+    Working directory and output capture owned by a single job.
+
+    Output is buffered, or handed to ``on_output(stream, text)`` as it is
+    written when a sink is given (and also buffered if ``keep_output``).
+    Once ``output_limit`` characters have been written across stdout and
+    stderr, a truncation marker is emitted and further output is dropped.
+    """
+
+    cwd: Path
+    output_limit: int = 0
+    on_output: Callable[[str, str], None] | None = None
+    keep_output: bool = False
+    truncated: bool = field(default=False, init=False)
+    _written: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.stdout = OutputCapture(self, "stdout")
+        self.stderr = OutputCapture(self, "stderr")
+
+    @contextmanager
+    def activate(self) -> Iterator["ExecutionContext"]:
+        """Bind this context to the current thread for the duration of the block."""
+        install_stream_router()
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def _write(self, stream: str, text: str) -> None:
+        if self.truncated or not text:
+            return
+        if self.output_limit and self._written + len(text) > self.output_limit:
+            text = text[: self.output_limit - self._written]
+            text += TRUNCATION_MARKER.format(limit=self.output_limit)
+            self.truncated = True
+        self._written += len(text)
+
+        if self.on_output is not None:
+            self.on_output(stream, text)
+        if self.on_output is None or self.keep_output:
+            getattr(self, stream)._buffer.write(text)
+
+
+def current_context() -> ExecutionContext | None:
+    """Return the execution context bound to the calling thread, if any."""
+    return _current.get()
+
+
+class _ContextStream(io.TextIOBase):
+    """
+    Stand-in for sys.stdout/sys.stderr.
+
+    Writes go to the active job's capture buffer when one is bound and to the
+    original stream otherwise.
+    """
+
+    def __init__(self, name: str, fallback):
+        self._name = name
+        self._fallback = fallback
+
+    def _target(self):
+        context = _current.get()
+        if context is None:
+            return self._fallback
+        return getattr(context, self._name)
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return _current.get() is None and self._fallback.isatty()
+
+    def fileno(self) -> int:
+        return self._fallback.fileno()
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self._fallback, "encoding", "utf-8")
+
+
+def install_stream_router() -> None:
+    """Route sys.stdout/sys.stderr through the active context (idempotent)."""
+    global _router_installed
+    if _router_installed:
+        return
+    with _router_lock:
+        if _router_installed:
+            return
+        sys.stdout = _ContextStream("stdout", sys.stdout)
+        sys.stderr = _ContextStream("stderr", sys.stderr)
+        _router_installed = True
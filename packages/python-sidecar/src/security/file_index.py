@@ -0,0 +1,274 @@
+"""
+Per-project index of the file tree, for fast glob listings.
+
+A FileIndex keeps the sorted entries of each directory it has listed and
+answers glob patterns from them instead of walking the tree. Directories
+are listed lazily, the first time a query reaches them, and a listing is
+reused while ``lstat`` of the directory reports the same device, inode and
+mtime (adding, removing or renaming an entry changes the mtime). A query
+therefore costs one ``lstat`` per directory it visits, or none for a
+directory checked within the last ``recheck_ms``.
+
+Matches are produced lazily in path order, comparing paths component by
+component, so a page of results after a cursor (the last path of the
+previous page) is found without listing what comes before it.
+
+Pattern syntax is that of ``Path.glob``: components are separated by
+``/``, a ``**`` component matches any number of directories (and, as the
+last component, directories only), and other components use fnmatch
+wildcards, case-sensitively. Symlinks are listed but never descended into,
+since their targets may lie outside the project; absolute patterns and
+``..`` components are rejected.
+"""
+
+import fnmatch
+import os
+import re
+import stat
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Entry kinds
+_FILE = 0
+_DIR = 1
+# A symlink, which is not descended into; _LINK_DIR points at a directory
+_LINK = 2
+_LINK_DIR = 3
+
+# A "**" component
+_RECURSIVE = object()
+_WILDCARD_CHARS = frozenset("*?[")
+
+
+class IndexEntry(NamedTuple):
+    """A listed path, relative to the project root in POSIX form."""
+
+    path: str
+    is_dir: bool
+
+
+class _Dir:
+    """The indexed entries of one directory."""
+
+    __slots__ = ("identity", "checked", "names", "kinds", "children")
+
+    def __init__(self):
+        # (st_dev, st_ino, st_mtime_ns) when listed; None forces a relisting
+        self.identity: tuple[int, int, int] | None = None
+        self.checked = float("-inf")
+        self.names: list[str] = []
+        self.kinds: list[int] = []
+        # Subdirectories that have been visited, by name
+        self.children: dict[str, _Dir] = {}
+
+
+def _compile(pattern: str) -> list:
+    """Split ``pattern`` into components: _RECURSIVE, a literal name or a regex."""
+    if not pattern:
+        raise ValueError("Empty glob pattern")
+    if pattern.startswith("/"):
+        raise ValueError(f"Glob pattern must be relative to the project root: {pattern}")
+
+    parts: list = []
+    for part in pattern.split("/"):
+        if part in ("", "."):
+            continue
+        if part == "..":
+            raise ValueError(f"Glob pattern must not leave the project root: {pattern}")
+        if part == "**":
+            # Consecutive ** match the same as one
+            if not parts or parts[-1] is not _RECURSIVE:
+                parts.append(_RECURSIVE)
+        elif "**" in part:
+            raise ValueError("Invalid pattern: '**' can only be an entire path component")
+        elif _WILDCARD_CHARS.intersection(part):
+            parts.append(re.compile(fnmatch.translate(part)))
+        else:
+            parts.append(part)
+    if not parts:
+        raise ValueError(f"Glob pattern matches only the project root: {pattern}")
+    return parts
+
+
+def _closure(parts: list, positions: set[int]) -> frozenset[int]:
+    """Add the positions reached by letting each ``**`` match no directories."""
+    closed = set(positions)
+    for position in sorted(positions):
+        while position < len(parts) and parts[position] is _RECURSIVE:
+            position += 1
+            closed.add(position)
+    return frozenset(closed)
+
+
+class FileIndex:
+    """
+    Sorted, lazily built listing of a project tree.
+
+    Args:
+        root: Resolved project root
+        recheck_ms: How long a directory's listing is trusted without
+            checking its mtime again (0 = check on every query)
+    """
+
+    def __init__(self, root: Path, recheck_ms: int = 0):
+        self.root = root
+        self.recheck_s = recheck_ms / 1000
+        self.listed = 0
+        self._root = _Dir()
+        # Serialises relisting; queries may run on several threads
+        self._lock = threading.Lock()
+
+    def glob(self, pattern: str, after: str | None = None) -> Iterator[IndexEntry]:
+        """
+        Yield the entries matching ``pattern`` in path order.
+
+        Args:
+            pattern: Glob pattern relative to the project root
+            after: Only yield paths that sort after this one (a cursor)
+
+        Raises:
+            ValueError: If the pattern is invalid or leaves the project root
+        """
+        parts = _compile(pattern)
+        cursor = tuple(p for p in after.split("/") if p) if after else None
+        return _Query(self, parts).walk(self._root, (), _closure(parts, {0}), cursor)
+
+    def _refresh(self, node: _Dir, prefix: tuple[str, ...]) -> None:
+        """Relist ``node`` if its directory changed since it was listed."""
+        now = time.monotonic()
+        if now - node.checked < self.recheck_s:
+            return
+        path = os.path.join(self.root, *prefix)
+        with self._lock:
+            try:
+                st = os.lstat(path)
+                identity = (
+                    (st.st_dev, st.st_ino, st.st_mtime_ns) if stat.S_ISDIR(st.st_mode) else None
+                )
+            except OSError:
+                identity = None
+            if identity is None:
+                # Gone, or replaced by something that is not a directory
+                node.identity = None
+                node.names, node.kinds, node.children = [], [], {}
+                node.checked = now
+                return
+            if identity == node.identity:
+                node.checked = now
+                return
+
+            entries = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_symlink():
+                                kind = _LINK_DIR if entry.is_dir() else _LINK
+                            else:
+                                kind = _DIR if entry.is_dir(follow_symlinks=False) else _FILE
+                        except OSError:
+                            kind = _FILE
+                        entries.append((entry.name, kind))
+            except OSError as e:
+                logger.warning("Failed to list directory", path=path, error=str(e))
+            entries.sort()
+
+            node.names = [name for name, _ in entries]
+            node.kinds = [kind for _, kind in entries]
+            node.children = {
+                name: child
+                for name, child in node.children.items()
+                if (index := bisect_left(node.names, name)) < len(entries)
+                and node.names[index] == name
+                and node.kinds[index] == _DIR
+            }
+            try:
+                # Relist next time if the directory changed while it was read
+                st = os.lstat(path)
+                unchanged = (st.st_dev, st.st_ino, st.st_mtime_ns) == identity
+            except OSError:
+                unchanged = False
+            node.identity = identity if unchanged else None
+            node.checked = now
+            self.listed += 1
+
+
+class _Query:
+    """One glob over a FileIndex: a walk of the directories it can match in."""
+
+    def __init__(self, index: FileIndex, parts: list):
+        self.index = index
+        self.parts = parts
+        self.end = len(parts)
+        self.trailing_recursive = parts[-1] is _RECURSIVE
+        # Pattern positions an entry leads to, by the positions it matched
+        self._reached: dict[frozenset[int], frozenset[int]] = {}
+
+    def walk(
+        self,
+        node: _Dir,
+        prefix: tuple[str, ...],
+        positions: frozenset[int],
+        cursor: tuple[str, ...] | None,
+    ) -> Iterator[IndexEntry]:
+        self.index._refresh(node, prefix)
+        parts, end = self.parts, self.end
+        names, kinds = node.names, node.kinds
+
+        pending = [i for i in positions if i < end]
+        recursive = frozenset(i for i in pending if parts[i] is _RECURSIVE)
+        matchers = [(i + 1, parts[i]) for i in pending if parts[i] is not _RECURSIVE]
+
+        # Only named components can match: look them up instead of
+        # testing every entry
+        if not recursive and all(isinstance(part, str) for _, part in matchers):
+            literals = {part for _, part in matchers}
+            indexes = sorted(
+                index
+                for index in (bisect_left(names, name) for name in literals)
+                if index < len(names) and names[index] in literals
+            )
+        else:
+            indexes = range(len(names))
+
+        depth = len(prefix)
+        first = bisect_left(names, cursor[depth]) if cursor else 0
+        base = "/".join(prefix) + "/" if prefix else ""
+        for index in indexes:
+            if index < first:
+                continue
+            name, kind = names[index], kinds[index]
+
+            matched = [
+                after
+                for after, part in matchers
+                if (part == name if isinstance(part, str) else part.match(name))
+            ]
+            if kind == _DIR and recursive:
+                matched.extend(recursive)
+            if not matched:
+                continue
+            key = frozenset(matched)
+            reached = self._reached.get(key)
+            if reached is None:
+                reached = self._reached[key] = _closure(parts, key)
+
+            # Still on the cursor's path: the entry itself was returned already
+            on_cursor = cursor is not None and name == cursor[depth]
+            is_dir = kind == _DIR or kind == _LINK_DIR
+            if not on_cursor and end in reached and (is_dir or not self.trailing_recursive):
+                yield IndexEntry(base + name, is_dir)
+
+            if kind == _DIR and (len(reached) > 1 or end not in reached):
+                child_cursor = cursor if on_cursor and len(cursor) > depth + 1 else None
+                child = node.children.get(name)
+                if child is None:
+                    child = node.children[name] = _Dir()
+                yield from self.walk(child, prefix + (name,), reached, child_cursor)
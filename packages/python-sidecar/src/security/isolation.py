@@ -3,24 +3,48 @@ Project root isolation with audit logging.
 Ported from bt1zar_bt1_CLI/core/src/security/isolation.py
 """
 
+import os
+import stat
 from pathlib import Path
 from typing import Any, Callable
 
 import structlog
 
+from ..cache import CacheStats, LRUCache
+from .execution_context import ExecutionContext, current_context
+from .file_index import FileIndex
+
 logger = structlog.get_logger(__name__)
 
+# (st_dev, st_ino, st_mtime_ns) of a directory
+_DirIdentity = tuple[int, int, int]
+
+
+def _dir_identity(st: os.stat_result) -> _DirIdentity:
+    return (st.st_dev, st.st_ino, st.st_mtime_ns)
+
 
 class ProjectIsolation:
     """Enforces strict project boundary isolation for security."""
 
-    def __init__(self, project_root: str, enable_audit: bool = True):
+    def __init__(
+        self,
+        project_root: str,
+        enable_audit: bool = True,
+        path_cache_size: int = 4096,
+        file_index_recheck_ms: int = 0,
+    ):
         self.project_root = Path(project_root).resolve()
         self.enable_audit = enable_audit
 
         if not self.project_root.exists():
             raise ValueError(f"Project root does not exist: {project_root}")
 
+        # Unresolved parent directory -> (resolved directory, identity when resolved)
+        self._dir_cache: LRUCache[str, tuple[Path, _DirIdentity]] = LRUCache(path_cache_size)
+        # Directory listings, built as glob queries reach them
+        self.file_index = FileIndex(self.project_root, recheck_ms=file_index_recheck_ms)
+
         logger.info(
             "Project isolation initialized",
             project_root=str(self.project_root),
@@ -43,9 +67,9 @@ class ProjectIsolation:
         try:
             # Handle both relative and absolute paths
             if Path(path).is_absolute():
-                target = Path(path).resolve()
+                target = self._resolve(Path(path))
             else:
-                target = (self.project_root / path).resolve()
+                target = self._resolve(self.project_root / path)
 
             # Check if target is within project boundary
             if not target.is_relative_to(self.project_root):
@@ -55,6 +79,7 @@ class ProjectIsolation:
                         requested_path=path,
                         resolved_path=str(target),
                         project_root=str(self.project_root),
+                        audit=True,
                     )
                 raise PermissionError(f"Path traversal detected: {path}")
 
@@ -71,13 +96,66 @@ class ProjectIsolation:
             raise
         except Exception as e:
             if self.enable_audit:
-                logger.error("Path validation failed", requested_path=path, error=str(e))
+                logger.error(
+                    "Path validation failed", requested_path=path, error=str(e), audit=True
+                )
             raise
 
+    def _resolve(self, candidate: Path) -> Path:
+        """
+        Resolve ``candidate`` like ``Path.resolve()``, caching its parent.
+
+        The resolved parent directory is reused while ``stat`` of the
+        unresolved parent still reports the same device, inode and mtime.
+        Re-pointing any component of the parent at another directory
+        changes that identity, so a symlink swap always forces a fresh
+        resolve. The final component is checked with ``lstat`` on every
+        call and resolved fully if it is a symlink.
+        """
+        parent, name = os.path.split(str(candidate))
+        if not name or name in (".", ".."):
+            return candidate.resolve()
+
+        try:
+            identity = _dir_identity(os.stat(parent))
+        except OSError:
+            return candidate.resolve()
+
+        cached = self._dir_cache.get(parent)
+        if cached is not None and cached[1] == identity:
+            resolved_parent = cached[0]
+        else:
+            resolved_parent = Path(parent).resolve()
+            try:
+                # Only cache if nothing changed while we were resolving
+                if _dir_identity(os.stat(resolved_parent)) == identity:
+                    self._dir_cache.put(parent, (resolved_parent, identity))
+            except OSError:
+                pass
+
+        leaf = resolved_parent / name
+        try:
+            if stat.S_ISLNK(os.lstat(leaf).st_mode):
+                return leaf.resolve()
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return candidate.resolve()
+        return leaf
+
+    def path_cache_stats(self) -> CacheStats:
+        """Return the counters of the resolved parent directory cache."""
+        return self._dir_cache.stats()
+
     def sandbox_exec(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
         """
         Execute function within project sandbox.
 
+        The function runs under an ExecutionContext rooted at the project
+        root instead of changing the process working directory, so
+        concurrent sandboxes in other threads are unaffected. An already
+        active context is reused when it lies within this project.
+
         Args:
             func: Function to execute
             *args: Function arguments
@@ -86,34 +164,37 @@ class ProjectIsolation:
         Returns:
             Function result
         """
-        import os
-
-        old_cwd = os.getcwd()
+        context = current_context()
+        if context is None or not context.cwd.is_relative_to(self.project_root):
+            context = ExecutionContext(cwd=self.project_root)
 
         if self.enable_audit:
             logger.info(
                 "Entering sandbox execution",
                 function=func.__name__,
-                old_cwd=old_cwd,
                 sandbox_root=str(self.project_root),
+                sandbox_cwd=str(context.cwd),
+                audit=True,
             )
 
         try:
-            os.chdir(self.project_root)
-            result = func(*args, **kwargs)
+            with context.activate():
+                result = func(*args, **kwargs)
 
             if self.enable_audit:
-                logger.info("Sandbox execution completed successfully", function=func.__name__)
+                logger.info(
+                    "Sandbox execution completed successfully",
+                    function=func.__name__,
+                    audit=True,
+                )
             return result
 
         except Exception as e:
             if self.enable_audit:
-                logger.error("Sandbox execution failed", function=func.__name__, error=str(e))
+                logger.error(
+                    "Sandbox execution failed", function=func.__name__, error=str(e), audit=True
+                )
             raise
-        finally:
-            os.chdir(old_cwd)
-            if self.enable_audit:
-                logger.debug("Restored original working directory", restored_cwd=old_cwd)
 
     def is_safe_path(self, path: str) -> bool:
         """
@@ -151,6 +232,9 @@ class ProjectIsolation:
         """
         List all paths matching pattern within project boundary.
 
+        Answered from the project's file index, in path order; symlinked
+        directories are not descended into.
+
         Args:
             pattern: Glob pattern to match
 
@@ -158,7 +242,7 @@ class ProjectIsolation:
             List of allowed paths
         """
         try:
-            paths = list(self.project_root.glob(pattern))
+            paths = [self.project_root / entry.path for entry in self.file_index.glob(pattern)]
             if self.enable_audit:
                 logger.debug("Listed allowed paths", pattern=pattern, count=len(paths))
             return paths
@@ -166,3 +250,60 @@ class ProjectIsolation:
             if self.enable_audit:
                 logger.error("Failed to list paths", pattern=pattern, error=str(e))
             return []
+
+
+class IsolationRegistry:
+    """
+    Reuses ProjectIsolation instances across requests.
+
+    Instances are keyed by the project root string and audit flag. Each
+    lookup stats the root once and rebuilds the instance if the root now
+    refers to a different directory or no longer exists.
+    """
+
+    def __init__(
+        self, max_entries: int = 256, path_cache_size: int = 4096, file_index_recheck_ms: int = 0
+    ):
+        self.path_cache_size = path_cache_size
+        self.file_index_recheck_ms = file_index_recheck_ms
+        self._entries: LRUCache[tuple[str, bool], tuple[ProjectIsolation, tuple[int, int]]] = (
+            LRUCache(max_entries)
+        )
+
+    def get(self, project_root: str, enable_audit: bool = True) -> ProjectIsolation:
+        """
+        Return an isolation for ``project_root``, creating it if needed.
+
+        Raises:
+            ValueError: If the project root does not exist
+        """
+        key = (project_root, enable_audit)
+        try:
+            st = os.stat(project_root)
+            identity = (st.st_dev, st.st_ino)
+        except OSError:
+            self._entries.pop(key)
+            identity = None
+
+        cached = self._entries.get(key)
+        if cached is not None and cached[1] == identity:
+            return cached[0]
+
+        isolation = ProjectIsolation(
+            project_root,
+            enable_audit=enable_audit,
+            path_cache_size=self.path_cache_size,
+            file_index_recheck_ms=self.file_index_recheck_ms,
+        )
+        if identity is not None:
+            self._entries.put(key, (isolation, identity))
+        return isolation
+
+    def stats(self) -> CacheStats:
+        """Return the counters of the instance cache itself."""
+        return self._entries.stats()
+
+    def path_cache_stats(self) -> CacheStats:
+        """Sum the resolved-directory cache counters of the cached instances."""
+        reports = [isolation.path_cache_stats() for isolation, _ in self._entries.values()]
+        return CacheStats.total(reports)
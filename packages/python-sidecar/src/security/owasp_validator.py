@@ -3,16 +3,24 @@ OWASP Top 10 Security Validator.
 Simplified version ported from bt1zar_bt1_CLI/core/src/security/owasp_validator.py
 """
 
+import hashlib
 import re
+import time
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import Callable, Literal
 
 import structlog
 
+from .code_analysis import CallSite, CodeSummary, analyze_code
+
 logger = structlog.get_logger(__name__)
 
 Severity = Literal["critical", "high", "medium", "low", "info"]
 
+# Characters of new input StreamScanner collects before scanning them
+DEFAULT_STREAM_CHUNK_CHARS = 1024 * 1024
+
 
 @dataclass
 class Vulnerability:
@@ -25,6 +33,31 @@ class Vulnerability:
     description: str
     location: str | None = None
     remediation: str | None = None
+    # 1-based span of the match; end_column is exclusive
+    line: int | None = None
+    column: int | None = None
+    end_line: int | None = None
+    end_column: int | None = None
+
+
+# 1-based (line, column, end_line, end_column) of a finding; end_column is exclusive
+Span = tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class ScanState:
+    """
+    What each rule found in one text, kept with its result so a revision of
+    the text can be revalidated incrementally.
+    """
+
+    line_count: int
+    # Hash of each line, to check that a revision left the unedited lines alone
+    line_hashes: tuple[int, ...]
+    # Findings of each rule, in rule order and then in report order
+    spans: tuple[tuple[Span, ...], ...]
+    # Whether each rule's findings came from its AST call check
+    from_ast: tuple[bool, ...]
 
 
 @dataclass
@@ -34,6 +67,285 @@ class ValidationResult:
     valid: bool
     vulnerabilities: list[Vulnerability] = field(default_factory=list)
     compliance_score: float = 100.0
+    scan: ScanState | None = field(default=None, repr=False, compare=False)
+
+
+@dataclass(frozen=True)
+class LineEdit:
+    """
+    One changed region between a text and its revision, like a diff hunk.
+
+    ``old_lines`` lines starting at ``old_start`` were replaced by
+    ``new_lines`` lines starting at ``new_start`` (1-based). With a count of
+    0 the start is the line the insertion or deletion happened before.
+    """
+
+    old_start: int
+    old_lines: int
+    new_start: int
+    new_lines: int
+
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+
+
+def parse_unified_diff(patch: str) -> list[LineEdit]:
+    """Read the hunk headers of a unified diff as LineEdits."""
+    edits = []
+    for match in _HUNK_HEADER.finditer(patch):
+        old_start, old_lines, new_start, new_lines = (
+            int(value) if value is not None else 1 for value in match.groups()
+        )
+        # diff numbers an empty side by the line before it
+        edits.append(
+            LineEdit(
+                old_start=old_start + 1 if old_lines == 0 else old_start,
+                old_lines=old_lines,
+                new_start=new_start + 1 if new_lines == 0 else new_start,
+                new_lines=new_lines,
+            )
+        )
+    return edits
+
+
+class LineIndex:
+    """
+    Maps character offsets to 1-based (line, column) positions.
+
+    Newline offsets are collected once per input, so each lookup is a
+    binary search instead of a rescan of the text before the match.
+    """
+
+    def __init__(self, text: str):
+        starts = [0]
+        find = text.find
+        pos = find("\n")
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find("\n", pos + 1)
+        self._starts = starts
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Return the (line, column) of ``offset``, both 1-based."""
+        line = bisect_right(self._starts, offset)
+        return line, offset - self._starts[line - 1] + 1
+
+
+# Characters that re.IGNORECASE matches against ASCII letters but that
+# str.lower() does not lower to them: it leaves dotless i and long s alone
+# and turns dotted capital I into "i" plus a combining dot. Mapped before
+# lowering so keyword prefiltering never misses a match
+_CASE_FOLD_FIXES = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+def _fold(text: str) -> str:
+    """Lowercase text the way the case-insensitive rules compare it."""
+    return text.translate(_CASE_FOLD_FIXES).lower()
+
+
+@dataclass(frozen=True)
+class _Rule:
+    """A compiled detection rule."""
+
+    category: str
+    title: str
+    regex: re.Pattern[str]
+    # Each group must have at least one member present in the folded input
+    keywords: tuple[tuple[str, ...], ...]
+    # AST alternative used when the input parses as Python: literals that
+    # must be present, and a predicate selecting matching call sites
+    call_check: tuple[tuple[str, ...], Callable[[CallSite], bool]] | None = None
+
+    def may_match(self, folded: str, seen: dict[str, bool]) -> bool:
+        """Cheap literal prefilter; False means the regex cannot match."""
+        return all(any(_present(k, folded, seen) for k in group) for group in self.keywords)
+
+
+def _present(keyword: str, folded: str, seen: dict[str, bool]) -> bool:
+    """Whether ``keyword`` occurs in the folded input, memoised in ``seen``."""
+    present = seen.get(keyword)
+    if present is None:
+        present = seen[keyword] = keyword in folded
+    return present
+
+
+class _CategoryTimer:
+    """
+    Adds up the time spent on each rule category.
+
+    Call ``enter`` as each rule starts and ``stop`` after the last one.
+    Scans made in pieces (windows, shards) accumulate into one timer and
+    report a single observation per category.
+    """
+
+    __slots__ = ("enabled", "seconds", "_category", "_start")
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.seconds: dict[str, float] = {}
+        self._category: str | None = None
+        self._start = 0.0
+
+    def enter(self, category: str | None) -> None:
+        if not self.enabled or category == self._category:
+            return
+        now = time.perf_counter()
+        if self._category is not None:
+            self.add(self._category, now - self._start)
+        self._category, self._start = category, now
+
+    def stop(self) -> None:
+        self.enter(None)
+
+    def add(self, category: str, seconds: float) -> None:
+        self.seconds[category] = self.seconds.get(category, 0.0) + seconds
+
+    def report(self, observe: Callable[[str, float], None] | None) -> None:
+        if observe is not None:
+            for category, seconds in self.seconds.items():
+                observe(category, seconds)
+        self.seconds.clear()
+
+
+def _compile_rules(
+    categories: dict[str, list[tuple[str, str, tuple]]],
+    call_checks: dict[str, tuple[tuple[str, ...], Callable[[CallSite], bool]]],
+) -> tuple[_Rule, ...]:
+    """Compile rule tables once, preserving category and pattern order."""
+    rules = []
+    for category, patterns in categories.items():
+        for pattern, desc, keywords in patterns:
+            rules.append(
+                _Rule(
+                    category=category,
+                    title=desc,
+                    regex=re.compile(pattern),
+                    keywords=tuple(
+                        (k,) if isinstance(k, str) else tuple(k) for k in keywords
+                    ),
+                    call_check=call_checks.get(desc),
+                )
+            )
+    return tuple(rules)
+
+
+def _ruleset_version(categories: dict[str, list[tuple[str, str, tuple]]], *extra: str) -> str:
+    """Fingerprint the rule tables so cached results expire when rules change."""
+    fingerprint = repr((sorted(categories.items()), extra))
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+
+def _python_summary(code: str) -> CodeSummary | None:
+    """Return the AST summary of ``code``, or None if it is not Python source."""
+    # A lone carriage return starts a new line for the parser but not for
+    # LineIndex; keep positions consistent by using the regexes instead
+    if "\r" in code and "\r" in code.replace("\r\n", ""):
+        return None
+    summary = analyze_code(code)
+    return None if summary.syntax_error else summary
+
+
+def _line_hashes(code: str) -> tuple[int, ...]:
+    # str hashes are keyed per process, so lines cannot be crafted to collide
+    return tuple(map(hash, code.split("\n")))
+
+
+def _check_unchanged(
+    edits: list[LineEdit], base_hashes: tuple[int, ...], new_hashes: tuple[int, ...]
+) -> None:
+    """Check that the lines outside ``edits`` are the same in both texts."""
+    old_line = new_line = 1
+    for edit in edits:
+        if (
+            base_hashes[old_line - 1 : edit.old_start - 1]
+            != new_hashes[new_line - 1 : edit.new_start - 1]
+        ):
+            raise ValueError("Unedited lines differ from the base text")
+        old_line = edit.old_start + edit.old_lines
+        new_line = edit.new_start + edit.new_lines
+    if base_hashes[old_line - 1 :] != new_hashes[new_line - 1 :]:
+        raise ValueError("Unedited lines differ from the base text")
+
+
+def _check_edits(edits: list[LineEdit], old_count: int, new_count: int) -> list[LineEdit]:
+    """Order ``edits`` and check they turn ``old_count`` lines into ``new_count`` lines."""
+    edits = sorted((e for e in edits if e.old_lines or e.new_lines), key=lambda e: e.old_start)
+    delta = 0
+    old_end = 0
+    for edit in edits:
+        if min(edit.old_start, edit.new_start) < 1 or min(edit.old_lines, edit.new_lines) < 0:
+            raise ValueError("Edit line numbers must be positive")
+        if edit.old_start <= old_end:
+            raise ValueError("Edits overlap")
+        if edit.new_start - edit.old_start != delta:
+            raise ValueError("Edit line numbers do not agree between the texts")
+        if (
+            edit.old_start + edit.old_lines > old_count + 1
+            or edit.new_start + edit.new_lines > new_count + 1
+        ):
+            raise ValueError("Edit is past the end of the text")
+        old_end = edit.old_start + edit.old_lines - 1
+        delta += edit.new_lines - edit.old_lines
+    if old_count + delta != new_count:
+        raise ValueError("Edits do not account for the revised text's line count")
+    return edits
+
+
+def _shift(line: int, edits: list[LineEdit]) -> int | None:
+    """Where an unchanged base line ended up, or None if an edit replaced it."""
+    delta = 0
+    for edit in edits:
+        if line < edit.old_start:
+            break
+        if line < edit.old_start + edit.old_lines:
+            return None
+        delta += edit.new_lines - edit.old_lines
+    return line + delta
+
+
+def _widen(
+    first: int, last: int, line_count: int, blank: Callable[[int], bool], context: int
+) -> tuple[int, int]:
+    """Extend lines ``first..last`` by ``context`` non-blank lines and the blanks past them."""
+    remaining = context
+    while first > 1 and (remaining or blank(first - 1)):
+        first -= 1
+        if not blank(first):
+            remaining -= 1
+    remaining = context
+    while last < line_count and (remaining or blank(last + 1)):
+        last += 1
+        if not blank(last):
+            remaining -= 1
+    return first, last
+
+
+def _merge_windows(windows: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for first, last in sorted(windows):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _overlaps(windows: list[tuple[int, int]], first: int, last: int) -> bool:
+    return any(start <= last and first <= end for start, end in windows)
+
+
+def _contains(windows: list[tuple[int, int]], first: int, last: int) -> bool:
+    return any(start <= first and last <= end for start, end in windows)
+
+
+def _score(critical: int, high: int, medium: int) -> tuple[float, bool]:
+    """Compliance score and validity for the given finding counts by severity."""
+    # Deduct points: critical=25, high=15, medium=5
+    score = max(0.0, 100.0 - (critical * 25) - (high * 15) - (medium * 5))
+    return score, critical + high == 0
+
+
+_SUBPROCESS_CALLS = frozenset({"subprocess.run", "subprocess.call", "subprocess.Popen"})
 
 
 class OWASPValidator:
@@ -46,65 +358,134 @@ class OWASPValidator:
     - Command Injection (A03:2021)
     - Path Traversal (A01:2021)
     - SSRF (A10:2021)
+
+    Rules are compiled once when the class is created. Each rule lists the
+    literals any match must contain (lowercase); a rule only runs its regex
+    when all of them occur in the input, so most rules cost a substring
+    search instead of a backtracking scan. Command injection rules inspect
+    call sites from a single AST parse when the input is Python source.
     """
 
-    # SQL Injection patterns
+    # SQL Injection patterns: (regex, title, required literals)
     SQL_PATTERNS = [
-        (r"(?i)\bSELECT\b.*\bFROM\b.*\bWHERE\b.*=\s*['\"]?\s*\+", "SQL concatenation"),
-        (r"(?i)\bINSERT\b.*\bINTO\b.*\bVALUES\b.*\+", "SQL INSERT concatenation"),
-        (r"(?i)\bUPDATE\b.*\bSET\b.*=.*\+", "SQL UPDATE concatenation"),
-        (r"(?i)\bDELETE\b.*\bFROM\b.*\bWHERE\b.*\+", "SQL DELETE concatenation"),
-        (r"(?i)execute\s*\(\s*['\"].*\+", "Dynamic SQL execution"),
-        (r"(?i)f['\"].*\{.*\}.*SELECT", "F-string SQL query"),
-        (r"(?i)f['\"].*\{.*\}.*INSERT", "F-string SQL query"),
-        (r"(?i)f['\"].*\{.*\}.*UPDATE", "F-string SQL query"),
-        (r"(?i)f['\"].*\{.*\}.*DELETE", "F-string SQL query"),
+        (
+            r"(?i)\bSELECT\b.*\bFROM\b.*\bWHERE\b.*=\s*['\"]?\s*\+",
+            "SQL concatenation",
+            ("select", "from", "where", "=", "+"),
+        ),
+        (
+            r"(?i)\bINSERT\b.*\bINTO\b.*\bVALUES\b.*\+",
+            "SQL INSERT concatenation",
+            ("insert", "into", "values", "+"),
+        ),
+        (
+            r"(?i)\bUPDATE\b.*\bSET\b.*=.*\+",
+            "SQL UPDATE concatenation",
+            ("update", "set", "=", "+"),
+        ),
+        (
+            r"(?i)\bDELETE\b.*\bFROM\b.*\bWHERE\b.*\+",
+            "SQL DELETE concatenation",
+            ("delete", "from", "where", "+"),
+        ),
+        (r"(?i)execute\s*\(\s*['\"].*\+", "Dynamic SQL execution", ("execute", "(", "+")),
+        (r"(?i)f['\"].*\{.*\}.*SELECT", "F-string SQL query", ("{", "}", "select")),
+        (r"(?i)f['\"].*\{.*\}.*INSERT", "F-string SQL query", ("{", "}", "insert")),
+        (r"(?i)f['\"].*\{.*\}.*UPDATE", "F-string SQL query", ("{", "}", "update")),
+        (r"(?i)f['\"].*\{.*\}.*DELETE", "F-string SQL query", ("{", "}", "delete")),
     ]
 
     # XSS patterns
     XSS_PATTERNS = [
-        (r"(?i)innerHTML\s*=", "Direct innerHTML assignment"),
-        (r"(?i)document\.write\s*\(", "document.write usage"),
-        (r"(?i)eval\s*\(", "eval() usage"),
-        (r"<script.*>.*</script>", "Inline script tag"),
-        (r"(?i)on\w+\s*=\s*['\"]", "Inline event handler"),
+        (r"(?i)innerHTML\s*=", "Direct innerHTML assignment", ("innerhtml", "=")),
+        (r"(?i)document\.write\s*\(", "document.write usage", ("document.write", "(")),
+        (r"(?i)eval\s*\(", "eval() usage", ("eval", "(")),
+        (r"<script.*>.*</script>", "Inline script tag", ("<script", "</script>")),
+        (r"(?i)on\w+\s*=\s*['\"]", "Inline event handler", ("on", "=")),
     ]
 
     # Command Injection patterns
     CMD_PATTERNS = [
-        (r"(?i)os\.system\s*\(.*\+", "os.system with concatenation"),
-        (r"(?i)subprocess\.(?:run|call|Popen)\s*\(.*\+", "subprocess with concatenation"),
-        (r"(?i)exec\s*\(.*\+", "exec with concatenation"),
-        (r"(?i)shell\s*=\s*True", "shell=True in subprocess"),
-        (r"(?i)os\.popen\s*\(", "os.popen usage"),
+        (r"(?i)os\.system\s*\(.*\+", "os.system with concatenation", ("os.system", "+")),
+        (
+            r"(?i)subprocess\.(?:run|call|Popen)\s*\(.*\+",
+            "subprocess with concatenation",
+            ("subprocess.", "+"),
+        ),
+        (r"(?i)exec\s*\(.*\+", "exec with concatenation", ("exec", "(", "+")),
+        (r"(?i)shell\s*=\s*True", "shell=True in subprocess", ("shell", "=", "true")),
+        (r"(?i)os\.popen\s*\(", "os.popen usage", ("os.popen", "(")),
     ]
 
     # Path Traversal patterns
     PATH_PATTERNS = [
-        (r"\.\./", "Parent directory traversal"),
-        (r"\.\.\\\\", "Windows parent directory traversal"),
-        (r"(?i)/etc/passwd", "Access to /etc/passwd"),
-        (r"(?i)/etc/shadow", "Access to /etc/shadow"),
-        (r"(?i)C:\\\\Windows", "Windows system directory"),
+        (r"\.\./", "Parent directory traversal", ("../",)),
+        (r"\.\.\\\\", "Windows parent directory traversal", ("..\\\\",)),
+        (r"(?i)/etc/passwd", "Access to /etc/passwd", ("/etc/passwd",)),
+        (r"(?i)/etc/shadow", "Access to /etc/shadow", ("/etc/shadow",)),
+        (r"(?i)C:\\\\Windows", "Windows system directory", ("c:\\\\windows",)),
     ]
 
     # SSRF patterns
     SSRF_PATTERNS = [
-        (r"(?i)requests\.(?:get|post|put|delete)\s*\(.*\+", "HTTP request with concatenation"),
-        (r"(?i)urllib\.request\.urlopen\s*\(.*\+", "urlopen with concatenation"),
-        (r"(?i)http\.client", "http.client usage"),
-        (r"(?i)127\.0\.0\.1|localhost", "Localhost access"),
-        (r"(?i)169\.254\.", "AWS metadata IP"),
+        (
+            r"(?i)requests\.(?:get|post|put|delete)\s*\(.*\+",
+            "HTTP request with concatenation",
+            ("requests.", "(", "+"),
+        ),
+        (
+            r"(?i)urllib\.request\.urlopen\s*\(.*\+",
+            "urlopen with concatenation",
+            ("urllib.request.urlopen", "+"),
+        ),
+        (r"(?i)http\.client", "http.client usage", ("http.client",)),
+        (r"(?i)127\.0\.0\.1|localhost", "Localhost access", (("127.0.0.1", "localhost"),)),
+        (r"(?i)169\.254\.", "AWS metadata IP", ("169.254.",)),
     ]
 
-    def __init__(self):
-        self.patterns = {
-            "A03:2021-Injection-SQL": self.SQL_PATTERNS,
-            "A03:2021-Injection-XSS": self.XSS_PATTERNS,
-            "A03:2021-Injection-CMD": self.CMD_PATTERNS,
-            "A01:2021-Broken Access Control": self.PATH_PATTERNS,
-            "A10:2021-SSRF": self.SSRF_PATTERNS,
-        }
+    # Command injection checks on resolved call sites, keyed by rule title.
+    # They replace the regexes above for input that parses as Python, so
+    # aliased imports are caught and comments or strings are not flagged.
+    CMD_CALL_CHECKS = {
+        "os.system with concatenation": (
+            ("system",),
+            lambda call: call.name == "os.system" and call.concatenated,
+        ),
+        "subprocess with concatenation": (
+            ("subprocess",),
+            lambda call: call.name in _SUBPROCESS_CALLS and call.concatenated,
+        ),
+        "exec with concatenation": (
+            ("exec",),
+            lambda call: call.name == "exec" and call.concatenated,
+        ),
+        "shell=True in subprocess": (("shell", "true"), lambda call: call.shell_true),
+        "os.popen usage": (("popen",), lambda call: call.name == "os.popen"),
+    }
+
+    CATEGORIES = {
+        "A03:2021-Injection-SQL": SQL_PATTERNS,
+        "A03:2021-Injection-XSS": XSS_PATTERNS,
+        "A03:2021-Injection-CMD": CMD_PATTERNS,
+        "A01:2021-Broken Access Control": PATH_PATTERNS,
+        "A10:2021-SSRF": SSRF_PATTERNS,
+    }
+
+    _RULES = _compile_rules(CATEGORIES, CMD_CALL_CHECKS)
+    RULESET_VERSION = _ruleset_version(CATEGORIES, "ast-calls-v1", *sorted(CMD_CALL_CHECKS))
+    # No rule sets DOTALL, so a match only continues onto another line
+    # through a \s run; one touching a changed line lies within this many
+    # non-blank lines of it
+    CONTEXT_LINES = max(rule.regex.pattern.count(r"\s") for rule in _RULES)
+
+    def __init__(self, observe_category: Callable[[str, float], None] | None = None):
+        """
+        Args:
+            observe_category: Called with ``(category, seconds)`` after each
+                category's rules have run, e.g. to feed a latency histogram
+        """
+        self.patterns = dict(self.CATEGORIES)
+        self._observe_category = observe_category
 
     def validate(self, code: str) -> ValidationResult:
         """
@@ -116,40 +497,248 @@ class OWASPValidator:
         Returns:
             ValidationResult with detected vulnerabilities
         """
-        vulnerabilities: list[Vulnerability] = []
-        vuln_id = 0
-
-        for category, patterns in self.patterns.items():
-            for pattern, desc in patterns:
-                matches = list(re.finditer(pattern, code))
-                for match in matches:
-                    vuln_id += 1
-
-                    # Determine line number
-                    line_num = code[: match.start()].count("\n") + 1
-
-                    vulnerabilities.append(
-                        Vulnerability(
-                            id=f"OWASP-{vuln_id:04d}",
-                            category=category,
-                            severity=self._get_severity(category),
-                            title=desc,
-                            description=f"Potential {desc} vulnerability detected",
-                            location=f"Line {line_num}",
-                            remediation=self._get_remediation(category),
+        spans_by_rule: list[list[Span]] = []
+        from_ast: list[bool] = []
+
+        folded = _fold(code)
+        seen: dict[str, bool] = {}
+        lines: LineIndex | None = None
+        # Parsed by the first AST rule whose literals are present; False
+        # marks input that is not Python
+        summary: CodeSummary | None | bool = None
+
+        # Rules are grouped by category; time each group when observed
+        timer = _CategoryTimer(self._observe_category is not None)
+
+        for rule in self._RULES:
+            timer.enter(rule.category)
+            spans: list[Span] = []
+            spans_by_rule.append(spans)
+            use_regex = True
+
+            if rule.call_check is not None and summary is not False:
+                call_keywords, call_matches = rule.call_check
+                # The regex literals imply these, so the regex cannot match either
+                if not all(_present(keyword, folded, seen) for keyword in call_keywords):
+                    from_ast.append(False)
+                    continue
+                if summary is None:
+                    summary = _python_summary(code) or False
+                if summary is not False:
+                    spans.extend(
+                        (call.line, call.column, call.end_line, call.end_column)
+                        for call in summary.calls
+                        if call_matches(call)
+                    )
+                    use_regex = False
+            from_ast.append(not use_regex)
+
+            if use_regex and rule.may_match(folded, seen):
+                # Determine spans, indexing newlines on the first finding
+                for match in rule.regex.finditer(code):
+                    if lines is None:
+                        lines = LineIndex(code)
+                    spans.append((*lines.position(match.start()), *lines.position(match.end())))
+
+        timer.stop()
+        timer.report(self._observe_category)
+
+        line_hashes = _line_hashes(code)
+        scan = ScanState(
+            line_count=len(line_hashes),
+            line_hashes=line_hashes,
+            spans=tuple(tuple(spans) for spans in spans_by_rule),
+            from_ast=tuple(from_ast),
+        )
+        return self._result(scan)
+
+    def revalidate(
+        self, code: str, base: ScanState, edits: list[LineEdit]
+    ) -> ValidationResult:
+        """
+        Validate a revision of an already validated text.
+
+        Only the lines around ``edits`` are rescanned by the regex rules,
+        widened by CONTEXT_LINES non-blank lines on each side so every
+        match touching a changed line is seen whole; findings elsewhere are
+        carried over from ``base`` with their lines shifted. The AST call
+        checks need the whole file (aliases and syntax errors are not
+        local), so they are re-run in full when their literals are present.
+        The result, IDs included, is the same as ``validate(code)`` gives.
+
+        The edits come from the client, so every line outside them is
+        checked against the base's line hashes before anything is carried.
+
+        Args:
+            code: The revised text
+            base: ScanState of the text the edits were made to
+            edits: The changed regions, as in the hunks of a diff
+
+        Raises:
+            ValueError: If the edits do not fit the base and revised texts,
+                or the lines outside them differ from the base
+        """
+        line_starts = LineIndex(code)._starts
+        line_count = len(line_starts)
+        edits = _check_edits(edits, base.line_count, line_count)
+        line_hashes = _line_hashes(code)
+        _check_unchanged(edits, base.line_hashes, line_hashes)
+
+        def blank(line: int) -> bool:
+            end = line_starts[line] if line < line_count else len(code)
+            return code[line_starts[line - 1] : end].isspace() or end == line_starts[line - 1]
+
+        windows = []
+        for edit in edits:
+            if edit.new_lines:
+                first, last = edit.new_start, edit.new_start + edit.new_lines - 1
+            else:
+                # A deletion joins the lines on either side of it
+                first, last = max(1, edit.new_start - 1), min(line_count, edit.new_start)
+            windows.append(_widen(first, last, line_count, blank, self.CONTEXT_LINES))
+        windows = _merge_windows(windows)
+
+        # Base findings that survive, per rule, in revised line numbers;
+        # windows grow to swallow any that straddle their edges
+        carried: list[list[Span]] = []
+        while True:
+            carried = []
+            grown = False
+            for spans in base.spans:
+                kept = []
+                for span in spans:
+                    start = _shift(span[0], edits)
+                    end = _shift(span[2], edits)
+                    if start is not None and end is not None and not _overlaps(
+                        windows, start, end
+                    ):
+                        kept.append((start, span[1], end, span[3]))
+                        continue
+                    # Rescan all of it; a span that touches an edit already
+                    # lies within that edit's window
+                    if start is not None and end is not None and not _contains(
+                        windows, start, end
+                    ):
+                        windows = _merge_windows(windows + [(start, end)])
+                        grown = True
+                carried.append(kept)
+            if not grown:
+                break
+
+        rescans = []
+        for first, last in windows:
+            end = line_starts[last] if last < line_count else len(code)
+            text = code[line_starts[first - 1] : end]
+            rescans.append((first, text, _fold(text), {}))
+
+        folded: str | None = None
+        seen: dict[str, bool] = {}
+        summary: CodeSummary | None | bool = None
+        spans_by_rule: list[tuple[Span, ...]] = []
+        from_ast: list[bool] = []
+        timer = _CategoryTimer(self._observe_category is not None)
+
+        for index, rule in enumerate(self._RULES):
+            timer.enter(rule.category)
+            if rule.call_check is not None and summary is not False:
+                call_keywords, call_matches = rule.call_check
+                if folded is None:
+                    folded = _fold(code)
+                if not all(_present(keyword, folded, seen) for keyword in call_keywords):
+                    spans_by_rule.append(())
+                    from_ast.append(False)
+                    continue
+                if summary is None:
+                    summary = _python_summary(code) or False
+                if summary is not False:
+                    spans_by_rule.append(
+                        tuple(
+                            (call.line, call.column, call.end_line, call.end_column)
+                            for call in summary.calls
+                            if call_matches(call)
                         )
                     )
+                    from_ast.append(True)
+                    continue
+
+            from_ast.append(False)
+            if base.from_ast[index]:
+                # The base has no regex findings for this rule to carry over
+                if folded is None:
+                    folded = _fold(code)
+                spans = []
+                if rule.may_match(folded, seen):
+                    lines = LineIndex(code)
+                    for match in rule.regex.finditer(code):
+                        spans.append(
+                            (*lines.position(match.start()), *lines.position(match.end()))
+                        )
+                spans_by_rule.append(tuple(spans))
+                continue
+
+            spans = carried[index]
+            for first, text, window_folded, window_seen in rescans:
+                if not rule.may_match(window_folded, window_seen):
+                    continue
+                lines = None
+                for match in rule.regex.finditer(text):
+                    if lines is None:
+                        lines = LineIndex(text)
+                    line, column = lines.position(match.start())
+                    end_line, end_column = lines.position(match.end())
+                    spans.append((line + first - 1, column, end_line + first - 1, end_column))
+            spans.sort()
+            spans_by_rule.append(tuple(spans))
+        timer.stop()
+        timer.report(self._observe_category)
+
+        logger.debug(
+            "Incremental revalidation",
+            edits=len(edits),
+            rescanned_lines=sum(last - first + 1 for first, last in windows),
+            line_count=line_count,
+        )
+        return self._result(
+            ScanState(
+                line_count=line_count,
+                line_hashes=line_hashes,
+                spans=tuple(spans_by_rule),
+                from_ast=tuple(from_ast),
+            )
+        )
+
+    def stream(self, chunk_chars: int = DEFAULT_STREAM_CHUNK_CHARS) -> "StreamScanner":
+        """Start validating a text that arrives (or is read) in pieces."""
+        return StreamScanner(self, chunk_chars)
+
+    def _vulnerability(self, rule: _Rule, vuln_id: int, span: Span) -> Vulnerability:
+        line_num, column, end_line, end_column = span
+        return Vulnerability(
+            id=f"OWASP-{vuln_id:04d}",
+            category=rule.category,
+            severity=self._get_severity(rule.category),
+            title=rule.title,
+            description=f"Potential {rule.title} vulnerability detected",
+            location=f"Line {line_num}",
+            remediation=self._get_remediation(rule.category),
+            line=line_num,
+            column=column,
+            end_line=end_line,
+            end_column=end_column,
+        )
+
+    def _result(self, scan: ScanState) -> ValidationResult:
+        """Number the findings of ``scan`` in rule order and score them."""
+        vulnerabilities: list[Vulnerability] = []
+
+        for rule, spans in zip(self._RULES, scan.spans):
+            for span in spans:
+                vulnerabilities.append(self._vulnerability(rule, len(vulnerabilities) + 1, span))
 
-        # Calculate compliance score
         critical_count = sum(1 for v in vulnerabilities if v.severity == "critical")
         high_count = sum(1 for v in vulnerabilities if v.severity == "high")
         medium_count = sum(1 for v in vulnerabilities if v.severity == "medium")
-
-        # Deduct points: critical=25, high=15, medium=5
-        score = 100.0 - (critical_count * 25) - (high_count * 15) - (medium_count * 5)
-        score = max(0.0, score)
-
-        valid = len([v for v in vulnerabilities if v.severity in ("critical", "high")]) == 0
+        score, valid = _score(critical_count, high_count, medium_count)
 
         logger.info(
             "OWASP validation complete",
@@ -164,6 +753,7 @@ class OWASPValidator:
             valid=valid,
             vulnerabilities=vulnerabilities,
             compliance_score=score,
+            scan=scan,
         )
 
     def _get_severity(self, category: str) -> Severity:
@@ -186,3 +776,160 @@ class OWASPValidator:
             "A10:2021-SSRF": "Validate URLs against allowlist, block internal IPs",
         }
         return remediations.get(category, "Review and fix the identified vulnerability")
+
+
+class StreamScanner:
+    """
+    Validates a text fed to it in pieces, holding a bounded window of it.
+
+    Input is scanned in windows of about ``chunk_chars`` new characters,
+    cut at line ends. Each window starts with the last CONTEXT_LINES
+    non-blank lines of the previous one, which were held back: a match
+    spans at most that many more non-blank lines, so every match starting
+    before that overlap is seen whole and reported, and the rest are
+    found again, whole, in the next window. Memory stays at about two
+    chunks however long the input is.
+
+    Findings are returned as soon as their window is scanned, numbered in
+    the order they are reported (by position within a window), not in
+    rule order as ``validate`` numbers them. Only the regex rules run; the
+    AST call checks need the whole file. A line longer than a chunk is
+    scanned in pieces, so a match on it may be reported once per piece or
+    with a shorter extent than a full scan would give.
+
+    Call ``feed`` with each piece of text and ``finish`` at the end.
+    """
+
+    def __init__(self, validator: OWASPValidator, chunk_chars: int = DEFAULT_STREAM_CHUNK_CHARS):
+        self.validator = validator
+        self.chunk_chars = max(1, chunk_chars)
+        self.chars = 0
+        self.counts = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
+        self.finished = False
+        rules = validator._RULES
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        # Held-back overlap: its text, offset in the input and (line, column)
+        self._tail = ""
+        self._tail_offset = 0
+        self._tail_position = (1, 1)
+        # Per rule, the input offset its next match may start at; finditer
+        # never starts a match inside the previous one
+        self._resume = [0] * len(rules)
+        # Rule time summed over the windows, observed once at the end
+        self._timer = _CategoryTimer(validator._observe_category is not None)
+
+    @property
+    def vulnerability_count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def line_count(self) -> int:
+        return self._tail_position[0]
+
+    @property
+    def compliance_score(self) -> float:
+        return _score(self.counts["critical"], self.counts["high"], self.counts["medium"])[0]
+
+    @property
+    def valid(self) -> bool:
+        return _score(self.counts["critical"], self.counts["high"], self.counts["medium"])[1]
+
+    def feed(self, text: str) -> list[Vulnerability]:
+        """Add the next piece of input; returns the findings it completed."""
+        if self.finished:
+            raise ValueError("StreamScanner is finished")
+        self.chars += len(text)
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars < self.chunk_chars:
+            return []
+        return self._scan(final=False)
+
+    def finish(self) -> list[Vulnerability]:
+        """End the input; returns the remaining findings."""
+        if self.finished:
+            return []
+        self.finished = True
+        findings = self._scan(final=True)
+        self._timer.report(self.validator._observe_category)
+        logger.info(
+            "OWASP stream validation complete",
+            chars=self.chars,
+            vulnerabilities=self.vulnerability_count,
+            critical=self.counts["critical"],
+            high=self.counts["high"],
+            compliance_score=self.compliance_score,
+            valid=self.valid,
+        )
+        return findings
+
+    def _scan(self, final: bool) -> list[Vulnerability]:
+        data = "".join(self._pending)
+        # Scan complete lines; a chunk without a line end is cut where it is
+        cut = len(data) if final else (data.rfind("\n") + 1 or len(data))
+        rest = data[cut:]
+        self._pending = [rest] if rest else []
+        self._pending_chars = len(rest)
+
+        window = self._tail + data[:cut]
+        offset = self._tail_offset
+        first_line, first_column = self._tail_position
+        lines = LineIndex(window)
+        line_starts = lines._starts
+
+        # Report matches starting before the last CONTEXT_LINES non-blank
+        # lines; the rest of the window is carried over
+        limit = len(window)
+        if not final:
+            remaining = self.validator.CONTEXT_LINES
+            index = len(line_starts) - 1
+            if line_starts[index] == len(window):
+                index -= 1
+            while index >= 0 and remaining:
+                end = line_starts[index + 1] if index + 1 < len(line_starts) else len(window)
+                if not window[line_starts[index] : end].isspace():
+                    remaining -= 1
+                index -= 1
+            limit = line_starts[index + 1] if remaining == 0 else 0
+            # Bound the overlap, e.g. for whitespace-only runs
+            limit = max(limit, len(window) - self.chunk_chars)
+
+        def position(pos: int) -> tuple[int, int]:
+            line, column = lines.position(pos)
+            if line == 1:
+                column += first_column - 1
+            return line + first_line - 1, column
+
+        found: list[tuple[int, int, _Rule, Span]] = []
+        folded = _fold(window)
+        seen: dict[str, bool] = {}
+        for index, rule in enumerate(self.validator._RULES):
+            self._timer.enter(rule.category)
+            start = max(self._resume[index] - offset, 0)
+            if start < limit and rule.may_match(folded, seen):
+                for match in rule.regex.finditer(window, start):
+                    if match.start() >= limit:
+                        break
+                    found.append(
+                        (
+                            match.start(),
+                            index,
+                            rule,
+                            (*position(match.start()), *position(match.end())),
+                        )
+                    )
+                    self._resume[index] = offset + match.end()
+            self._resume[index] = max(self._resume[index], offset + limit)
+        self._timer.stop()
+
+        self._tail = window[limit:]
+        self._tail_offset = offset + limit
+        self._tail_position = position(limit)
+
+        findings = []
+        for _, _, rule, span in sorted(found, key=lambda item: item[:2]):
+            vulnerability = self.validator._vulnerability(rule, self.vulnerability_count + 1, span)
+            self.counts[vulnerability.severity] += 1
+            findings.append(vulnerability)
+        return findings
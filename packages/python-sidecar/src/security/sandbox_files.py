@@ -0,0 +1,301 @@
+"""
+File access for sandboxed code.
+
+``secure_read_file`` and ``secure_write_file`` hold a whole file in memory.
+For large files sandboxed code can instead use:
+
+- ``secure_read_lines``: iterate a text file line by line, reading it in
+  chunks (lines longer than ``max_line_length`` are yielded in pieces).
+- ``secure_read_range``: read ``length`` bytes starting at ``offset``.
+- ``secure_map_file``: a read-only memory-mapped view of a file or a window
+  of it; slicing copies only the slice, and ``memoryview()`` exposes the
+  mapping without copying (``re`` can search it directly).
+- ``secure_open_writer``: a writer that appends to (or truncates) a file
+  and writes it incrementally.
+
+Every function validates its path with ``ProjectIsolation.validate_path``
+when it is called. Handles are tracked per SandboxFiles instance so the
+executor can close whatever a one-shot execution left open.
+"""
+
+import errno
+import mmap
+import os
+import weakref
+from pathlib import Path
+from typing import IO, Iterator
+
+from .isolation import ProjectIsolation
+
+# Bytes read from disk at a time by secure_read_lines
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Longest piece of a line secure_read_lines yields at once, in characters
+DEFAULT_MAX_LINE_LENGTH = 1024 * 1024
+
+
+class FileView:
+    """
+    Read-only, memory-mapped view of ``length`` bytes of a file from ``offset``.
+
+    Indexing and slicing work like on ``bytes`` and copy only what is
+    selected. Close the view (or use it as a context manager) to unmap it;
+    the mapping stays alive while a memoryview of it is still referenced.
+    """
+
+    __slots__ = ("name", "offset", "closed", "_mmap", "_view", "_delta", "__weakref__")
+
+    def __init__(self, path: Path, offset: int = 0, length: int = 0):
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must not be negative")
+        self.name = path.name
+        self.offset = offset
+        self.closed = False
+        self._mmap = None
+        self._delta = 0
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if offset > size:
+                raise ValueError(f"offset {offset} is past the end of the file ({size} bytes)")
+            length = min(length, size - offset) if length else size - offset
+            if length == 0:
+                # mmap cannot map zero bytes
+                self._view = memoryview(b"")
+                return
+
+            # Mappings must start on an allocation boundary
+            self._delta = offset % mmap.ALLOCATIONGRANULARITY
+            try:
+                self._mmap = mmap.mmap(
+                    f.fileno(),
+                    self._delta + length,
+                    access=mmap.ACCESS_READ,
+                    offset=offset - self._delta,
+                )
+            except OSError as e:
+                if e.errno == errno.ENOMEM:
+                    # Mappings count against the execution's memory limit
+                    raise MemoryError(
+                        f"Cannot map {length} bytes of {self.name}; "
+                        "map a smaller window with offset and length"
+                    ) from None
+                raise
+        self._view = memoryview(self._mmap)[self._delta : self._delta + length]
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def __getitem__(self, key):
+        item = self._view[key]
+        return item.tobytes() if isinstance(item, memoryview) else item
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.iter_lines()
+
+    def __enter__(self) -> "FileView":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        state = "closed" if self.closed else f"length={len(self._view)}"
+        return f"<FileView {self.name} offset={self.offset} {state}>"
+
+    def memoryview(self) -> memoryview:
+        """The mapped bytes without copying (read-only)."""
+        return self._view[:]
+
+    def find(self, sub: bytes, start: int = 0, end: int | None = None) -> int:
+        """Lowest index of ``sub`` within ``[start, end)``, or -1."""
+        return self._search(False, sub, start, end)
+
+    def rfind(self, sub: bytes, start: int = 0, end: int | None = None) -> int:
+        """Highest index of ``sub`` within ``[start, end)``, or -1."""
+        return self._search(True, sub, start, end)
+
+    def decode(
+        self,
+        start: int = 0,
+        end: int | None = None,
+        encoding: str = "utf-8",
+        errors: str = "strict",
+    ) -> str:
+        """Decode the bytes in ``[start, end)`` as text."""
+        return str(self._view[start:end], encoding, errors)
+
+    def iter_lines(self, keepends: bool = True) -> Iterator[bytes]:
+        """Yield the view's lines, split on ``\\n``, as bytes."""
+        size = len(self._view)
+        pos = 0
+        while pos < size:
+            newline = self.find(b"\n", pos)
+            if newline < 0:
+                yield self[pos:]
+                return
+            yield self[pos : newline + 1 if keepends else newline]
+            pos = newline + 1
+
+    def close(self) -> None:
+        """Unmap the view (idempotent)."""
+        if self.closed:
+            return
+        self.closed = True
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A memoryview handed out is still referenced; the mapping
+                # goes away once it is released or collected
+                pass
+            self._mmap = None
+
+    def _search(self, reverse: bool, sub: bytes, start: int, end: int | None) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file view")
+        start, end, _ = slice(start, end).indices(len(self._view))
+        if self._mmap is None:
+            return -1 if sub else start
+        method = self._mmap.rfind if reverse else self._mmap.find
+        index = method(sub, self._delta + start, self._delta + end)
+        return index - self._delta if index >= 0 else -1
+
+
+class FileWriter:
+    """
+    Incremental writer for one file; close it (or use it as a context
+    manager) to flush. ``write`` takes ``str`` for text writers and
+    bytes-like objects for binary ones.
+    """
+
+    __slots__ = ("name", "_file", "__weakref__")
+
+    def __init__(self, path: Path, append: bool, binary: bool, encoding: str):
+        mode = ("a" if append else "w") + ("b" if binary else "")
+        self.name = path.name
+        self._file: IO = open(path, mode) if binary else open(path, mode, encoding=encoding)
+
+    def __enter__(self) -> "FileWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        state = "closed" if self.closed else self._file.mode
+        return f"<FileWriter {self.name} {state}>"
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def write(self, data) -> int:
+        return self._file.write(data)
+
+    def writelines(self, lines) -> None:
+        self._file.writelines(lines)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _iter_lines(f: IO[str], max_line_length: int) -> Iterator[str]:
+    with f:
+        while line := f.readline(max_line_length):
+            yield line
+
+
+class SandboxFiles:
+    """
+    The file functions exposed to sandboxed code, bound to one project.
+
+    Args:
+        isolation: Project whose boundary every path is validated against
+    """
+
+    def __init__(self, isolation: ProjectIsolation):
+        self.isolation = isolation
+        # Line iterators, views and writers handed out and not yet collected
+        self._handles: weakref.WeakSet = weakref.WeakSet()
+
+    def globals(self) -> dict:
+        """The functions to add to a sandbox's globals, by name."""
+        return {
+            "secure_read_file": self.read_file,
+            "secure_write_file": self.write_file,
+            "secure_read_lines": self.read_lines,
+            "secure_read_range": self.read_range,
+            "secure_map_file": self.map_file,
+            "secure_open_writer": self.open_writer,
+        }
+
+    def read_file(self, path: str) -> str:
+        """Securely read a file within project isolation."""
+        validated_path = self.isolation.validate_path(path)
+        with open(validated_path, "r") as f:
+            return f.read()
+
+    def write_file(self, path: str, content: str) -> None:
+        """Securely write a file within project isolation."""
+        validated_path = self.isolation.validate_path(path)
+        validated_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(validated_path, "w") as f:
+            f.write(content)
+
+    def read_lines(
+        self,
+        path: str,
+        encoding: str = "utf-8",
+        errors: str = "strict",
+        max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[str]:
+        """Iterate the lines of a text file, keeping line endings."""
+        validated_path = self.isolation.validate_path(path)
+        f = open(
+            validated_path, "r", encoding=encoding, errors=errors, buffering=max(chunk_size, 1)
+        )
+        lines = _iter_lines(f, max(max_line_length, 1))
+        self._handles.add(lines)
+        return lines
+
+    def read_range(self, path: str, offset: int = 0, length: int = -1) -> bytes:
+        """Read up to ``length`` bytes from ``offset`` (-1 = to the end of the file)."""
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        validated_path = self.isolation.validate_path(path)
+        with open(validated_path, "rb", buffering=0) as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def map_file(self, path: str, offset: int = 0, length: int = 0) -> FileView:
+        """Memory-map ``length`` bytes of a file from ``offset`` (0 = to the end) read-only."""
+        view = FileView(self.isolation.validate_path(path), offset, length)
+        self._handles.add(view)
+        return view
+
+    def open_writer(
+        self, path: str, append: bool = True, binary: bool = False, encoding: str = "utf-8"
+    ) -> FileWriter:
+        """Open a file for incremental writing, appending unless ``append`` is False."""
+        validated_path = self.isolation.validate_path(path)
+        validated_path.parent.mkdir(parents=True, exist_ok=True)
+        writer = FileWriter(validated_path, append, binary, encoding)
+        self._handles.add(writer)
+        return writer
+
+    def close_all(self) -> None:
+        """Close every handle still open, e.g. when a one-shot execution ends."""
+        for handle in list(self._handles):
+            try:
+                handle.close()
+            except Exception:
+                pass
+        self._handles.clear()
@@ -3,15 +3,21 @@ Secure Python Executor.
 Simplified version ported from bt1zar_bt1_CLI/core/src/agents/executors/secure_executor.py
 """
 
-import io
-import sys
-from contextlib import redirect_stdout, redirect_stderr
+import ctypes
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any
+from types import CodeType
+from typing import Any, Callable
 
 import structlog
 
+from ..cache import CacheStats, LRUCache, content_hash
+from ..config import get_settings
+from .code_analysis import SNIPPET_FILENAME, CodeSummary, parse_snippet, remember_summary
+from .execution_context import ExecutionContext
 from .isolation import ProjectIsolation
+from .sandbox_files import SandboxFiles
 
 logger = structlog.get_logger(__name__)
 
@@ -54,6 +60,118 @@ BLOCKED_IMPORTS = [
 ]
 
 
+def _matches_blocked(name: str, blocked: str) -> bool:
+    """
+    Whether a module or dotted name falls under a BLOCKED_IMPORTS entry.
+
+    Module entries match the module and its submodules; attribute entries
+    such as "os.spawn" match as a prefix so they cover spawnl, spawnv, ...
+    """
+    if name == blocked or name.startswith(blocked + "."):
+        return True
+    return "." in blocked and name.startswith(blocked)
+
+
+@dataclass(frozen=True)
+class _CompiledSnippet:
+    """Cached outcome of checking and compiling one source text."""
+
+    blocked: tuple[str, ...]
+    summary: CodeSummary
+    code: CodeType | None = None
+    syntax_error: str | None = None
+
+
+# Builtins available to sandboxed code; built once per process (and shared
+# copy-on-write by forked workers), copied into each namespace
+_SAFE_BUILTINS = {
+    # Safe built-in functions
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "ascii": ascii,
+    "bin": bin,
+    "bool": bool,
+    "bytearray": bytearray,
+    "bytes": bytes,
+    "callable": callable,
+    "chr": chr,
+    "complex": complex,
+    "dict": dict,
+    "dir": dir,
+    "divmod": divmod,
+    "enumerate": enumerate,
+    "filter": filter,
+    "float": float,
+    "format": format,
+    "frozenset": frozenset,
+    "getattr": getattr,
+    "hasattr": hasattr,
+    "hash": hash,
+    "hex": hex,
+    "id": id,
+    "int": int,
+    "isinstance": isinstance,
+    "issubclass": issubclass,
+    "iter": iter,
+    "len": len,
+    "list": list,
+    "map": map,
+    "max": max,
+    "min": min,
+    "next": next,
+    "object": object,
+    "oct": oct,
+    "ord": ord,
+    "pow": pow,
+    "print": print,
+    "range": range,
+    "repr": repr,
+    "reversed": reversed,
+    "round": round,
+    "set": set,
+    "slice": slice,
+    "sorted": sorted,
+    "str": str,
+    "sum": sum,
+    "tuple": tuple,
+    "type": type,
+    "zip": zip,
+    # Safe exceptions
+    "Exception": Exception,
+    "ValueError": ValueError,
+    "TypeError": TypeError,
+    "KeyError": KeyError,
+    "IndexError": IndexError,
+    "AttributeError": AttributeError,
+    "RuntimeError": RuntimeError,
+    # None, True, False
+    "None": None,
+    "True": True,
+    "False": False,
+}
+
+
+def _snippet_size(snippet: _CompiledSnippet) -> int:
+    # Code objects are not cheaply measurable; approximate from the bytecode
+    if snippet.code is None:
+        return 256
+    return 512 + 4 * len(snippet.code.co_code)
+
+
+# Per-process cache of compiled snippets keyed by source hash
+_code_cache: LRUCache[str, _CompiledSnippet] = LRUCache(
+    max_entries=get_settings().code_cache_entries,
+    max_bytes=get_settings().code_cache_mb * 1024 * 1024,
+    sizeof=_snippet_size,
+)
+
+
+def code_cache_stats() -> CacheStats:
+    """Return hit/miss counters of this process's compiled code cache."""
+    return _code_cache.stats()
+
+
 @dataclass
 class ExecutionResult:
     """Result of code execution."""
@@ -62,6 +180,79 @@ class ExecutionResult:
     result: Any = None
     output: str | None = None
     error: str | None = None
+    timed_out: bool = False
+    # Which limit stopped or truncated the run: "memory", "cpu" or "output"
+    limit_exceeded: str | None = None
+    # CPU time of the executing thread and wall time of the snippet itself
+    cpu_time_ms: int | None = None
+    wall_time_ms: int | None = None
+    # Peak resident memory of the executing process during the run, where
+    # the process is dedicated to it
+    peak_rss_bytes: int | None = None
+
+
+class ExecutionTimeout(BaseException):
+    """
+    Raised inside the executing thread when its deadline passes.
+
+    Derives from BaseException so sandboxed ``except Exception`` blocks
+    cannot swallow it.
+    """
+
+
+class CPUTimeExceeded(ExecutionTimeout):
+    """Raised inside the executing thread when its CPU time limit is reached."""
+
+
+class _Watchdog:
+    """
+    Interrupts a thread once its deadline has passed.
+
+    After the deadline the watchdog keeps re-raising ExecutionTimeout in the
+    target thread every ``retry_interval`` seconds until ``stop`` is called,
+    so code that catches the first interruption is still torn down.
+    """
+
+    def __init__(self, timeout_s: float, retry_interval: float = 0.05):
+        self.timeout_s = timeout_s
+        self.retry_interval = retry_interval
+        self.fired = False
+        self._target = threading.get_ident()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="exec-watchdog", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Disarm the watchdog; must be called from the watched thread."""
+        while True:
+            try:
+                with self._lock:
+                    self._stopped.set()
+                    # Drop an interruption that was raised but not yet delivered
+                    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                        ctypes.c_ulong(self._target), None
+                    )
+                return
+            except ExecutionTimeout:
+                # Delivered while disarming; once stopped no further ones follow
+                continue
+
+    def _run(self) -> None:
+        if self._stopped.wait(self.timeout_s):
+            return
+        while True:
+            with self._lock:
+                if self._stopped.is_set():
+                    return
+                self.fired = True
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(self._target), ctypes.py_object(ExecutionTimeout)
+                )
+            if self._stopped.wait(self.retry_interval):
+                return
 
 
 class SecurePythonExecutor:
@@ -72,7 +263,7 @@ class SecurePythonExecutor:
     - Project isolation (path validation)
     - Import authorization
     - Stdout/stderr capture
-    - Timeout enforcement (basic)
+    - Timeout enforcement (interrupts the executing thread at the deadline)
     """
 
     def __init__(
@@ -91,39 +282,88 @@ class SecurePythonExecutor:
             authorized_imports=len(self.authorized_imports),
         )
 
-    def execute(self, code: str, timeout_ms: int = 60000) -> ExecutionResult:
+    def execute(
+        self,
+        code: str,
+        timeout_ms: int = 60000,
+        namespace: dict | None = None,
+        output_limit: int = 0,
+        on_output: Callable[[str, str], None] | None = None,
+        keep_output: bool = False,
+    ) -> ExecutionResult:
         """
         Execute code securely.
 
         Args:
             code: Python code to execute
             timeout_ms: Execution timeout in milliseconds
+            namespace: Globals from ``create_namespace`` to run against and
+                keep between calls; a fresh namespace is used if omitted
+            output_limit: Maximum characters of stdout plus stderr to keep
+                (0 = unlimited); output past it is replaced by a marker
+            on_output: Called with ``(stream, text)`` as output is written
+                instead of buffering it; the result then carries no output
+            keep_output: Buffer output passed to ``on_output`` as well, so
+                the result carries it
 
         Returns:
             ExecutionResult with output and any errors
         """
         logger.info("Executing code", code_length=len(code), timeout_ms=timeout_ms)
 
-        # Check for blocked imports
-        blocked = self._check_blocked_imports(code)
-        if blocked:
+        # Check imports against the snippet's AST summary (cached alongside
+        # the compiled code)
+        snippet = self._compile(code)
+        if snippet.blocked:
             return ExecutionResult(
                 success=False,
-                error=f"Blocked import detected: {', '.join(blocked)}",
+                error=f"Blocked import detected: {', '.join(snippet.blocked)}",
+            )
+        unauthorized = self._check_authorized_imports(snippet.summary)
+        if unauthorized:
+            return ExecutionResult(
+                success=False,
+                error=f"Unauthorized import detected: {', '.join(unauthorized)}",
             )
 
-        # Prepare execution environment
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
-
-        # Create safe globals
-        safe_globals = self._create_safe_globals()
+        # Prepare execution environment; output is captured per job rather
+        # than by swapping sys.stdout for the whole process
+        context = ExecutionContext(
+            cwd=self.isolation.project_root,
+            output_limit=output_limit,
+            on_output=on_output,
+            keep_output=keep_output,
+        )
+        stdout_capture = context.stdout
+        stderr_capture = context.stderr
+
+        # Create safe globals, or reuse a session's namespace without the
+        # previous call's result; a session's file handles stay open
+        # between calls
+        files = None
+        if namespace is None:
+            files = SandboxFiles(self.isolation)
+            safe_globals = self._create_safe_globals(files)
+        else:
+            safe_globals = namespace
+            safe_globals.pop("result", None)
+            safe_globals.pop("_", None)
+        watchdog = _Watchdog(timeout_ms / 1000)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
 
         try:
             # Execute within isolation
+            if snippet.code is None:
+                raise SyntaxError(snippet.syntax_error)
+
             def run_code():
-                with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-                    exec(code, safe_globals)
+                with context.activate():
+                    watchdog.start()
+                    try:
+                        exec(snippet.code, safe_globals)
+                    finally:
+                        watchdog.stop()
                 return safe_globals.get("result", safe_globals.get("_", None))
 
             result = self.isolation.sandbox_exec(run_code)
@@ -137,128 +377,131 @@ class SecurePythonExecutor:
                 stderr_length=len(stderr_output),
             )
 
-            return ExecutionResult(
+            execution_result = ExecutionResult(
                 success=True,
                 result=result,
                 output=stdout_output if stdout_output else None,
                 error=stderr_output if stderr_output else None,
             )
 
+        except CPUTimeExceeded:
+            watchdog.stop()
+            logger.warning("Code execution exceeded its CPU time limit")
+            execution_result = ExecutionResult(
+                success=False,
+                error="CPU time limit exceeded",
+                output=stdout_capture.getvalue() or None,
+                limit_exceeded="cpu",
+            )
+
+        except ExecutionTimeout:
+            watchdog.stop()
+            logger.warning("Code execution timed out", timeout_ms=timeout_ms)
+            execution_result = ExecutionResult(
+                success=False,
+                error=f"Execution timed out after {timeout_ms}ms",
+                output=stdout_capture.getvalue() or None,
+                timed_out=True,
+            )
+
+        except MemoryError as e:
+            # Usually raised bare, so say what happened
+            logger.warning("Code execution ran out of memory")
+            execution_result = ExecutionResult(
+                success=False,
+                error=str(e) or "Out of memory",
+                output=stdout_capture.getvalue() or None,
+                limit_exceeded="memory",
+            )
+
         except Exception as e:
             logger.error("Code execution failed", error=str(e))
-            return ExecutionResult(
+            execution_result = ExecutionResult(
                 success=False,
                 error=str(e),
                 output=stdout_capture.getvalue() or None,
             )
 
-    def _check_blocked_imports(self, code: str) -> list[str]:
-        """Check for blocked imports in code."""
-        blocked_found = []
-
-        for blocked in BLOCKED_IMPORTS:
-            # Check various import patterns
-            patterns = [
-                f"import {blocked}",
-                f"from {blocked}",
-                f"__import__('{blocked}'",
-                f'__import__("{blocked}"',
-            ]
-            for pattern in patterns:
-                if pattern in code:
-                    blocked_found.append(blocked)
-                    break
-
-        return blocked_found
-
-    def _create_safe_globals(self) -> dict:
-        """Create a safe globals dictionary for execution."""
-        safe_builtins = {
-            # Safe built-in functions
-            "abs": abs,
-            "all": all,
-            "any": any,
-            "ascii": ascii,
-            "bin": bin,
-            "bool": bool,
-            "bytearray": bytearray,
-            "bytes": bytes,
-            "callable": callable,
-            "chr": chr,
-            "complex": complex,
-            "dict": dict,
-            "dir": dir,
-            "divmod": divmod,
-            "enumerate": enumerate,
-            "filter": filter,
-            "float": float,
-            "format": format,
-            "frozenset": frozenset,
-            "getattr": getattr,
-            "hasattr": hasattr,
-            "hash": hash,
-            "hex": hex,
-            "id": id,
-            "int": int,
-            "isinstance": isinstance,
-            "issubclass": issubclass,
-            "iter": iter,
-            "len": len,
-            "list": list,
-            "map": map,
-            "max": max,
-            "min": min,
-            "next": next,
-            "object": object,
-            "oct": oct,
-            "ord": ord,
-            "pow": pow,
-            "print": print,
-            "range": range,
-            "repr": repr,
-            "reversed": reversed,
-            "round": round,
-            "set": set,
-            "slice": slice,
-            "sorted": sorted,
-            "str": str,
-            "sum": sum,
-            "tuple": tuple,
-            "type": type,
-            "zip": zip,
-            # Safe exceptions
-            "Exception": Exception,
-            "ValueError": ValueError,
-            "TypeError": TypeError,
-            "KeyError": KeyError,
-            "IndexError": IndexError,
-            "AttributeError": AttributeError,
-            "RuntimeError": RuntimeError,
-            # None, True, False
-            "None": None,
-            "True": True,
-            "False": False,
-        }
+        if files is not None:
+            files.close_all()
+        if context.truncated and execution_result.limit_exceeded is None:
+            execution_result.limit_exceeded = "output"
+        execution_result.cpu_time_ms = int((time.thread_time() - cpu_start) * 1000)
+        execution_result.wall_time_ms = int((time.perf_counter() - wall_start) * 1000)
+        return execution_result
+
+    def create_namespace(self) -> dict:
+        """Create a globals dictionary that can be reused across ``execute`` calls."""
+        return self._create_safe_globals(SandboxFiles(self.isolation))
+
+    def _compile(self, code: str) -> _CompiledSnippet:
+        """Check and compile ``code``, reusing the result for repeated sources."""
+        key = content_hash(code)
+        snippet = _code_cache.get(key)
+        if snippet is not None:
+            return snippet
+
+        # One parse feeds both the import checks and compilation
+        tree, summary = parse_snippet(code)
+        remember_summary(code, summary)
+
+        blocked = tuple(self._check_blocked_imports(summary))
+        if blocked:
+            snippet = _CompiledSnippet(blocked=blocked, summary=summary)
+        elif tree is None:
+            snippet = _CompiledSnippet(
+                blocked=(), summary=summary, syntax_error=summary.syntax_error
+            )
+        else:
+            try:
+                code_obj = compile(tree, SNIPPET_FILENAME, "exec")
+                snippet = _CompiledSnippet(blocked=(), summary=summary, code=code_obj)
+            except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+                snippet = _CompiledSnippet(blocked=(), summary=summary, syntax_error=str(e))
+
+        _code_cache.put(key, snippet)
+        return snippet
+
+    def _check_blocked_imports(self, summary: CodeSummary) -> list[str]:
+        """Return the BLOCKED_IMPORTS entries the snippet imports or calls."""
+        names = summary.referenced_names()
+        return [
+            blocked
+            for blocked in BLOCKED_IMPORTS
+            if any(_matches_blocked(name, blocked) for name in names)
+        ]
+
+    def _check_authorized_imports(self, summary: CodeSummary) -> list[str]:
+        """Return imported modules that are not authorized for this executor."""
+        unauthorized = []
+
+        for ref in summary.imports:
+            if self._is_authorized(ref.module):
+                continue
+            # "from os import path" is fine when "os.path" is authorized
+            if ref.names and all(self._is_authorized(name) for name in ref.qualified_names):
+                continue
+            unauthorized.append(ref.module)
+
+        unauthorized.extend(
+            module for module in sorted(summary.dynamic_imports) if not self._is_authorized(module)
+        )
+        return list(dict.fromkeys(unauthorized))
+
+    def _is_authorized(self, module: str) -> bool:
+        """A module is authorized if it or one of its parent packages is."""
+        parts = module.split(".")
+        return any(".".join(parts[:i]) in self.authorized_imports for i in range(1, len(parts) + 1))
 
+    def _create_safe_globals(self, files: SandboxFiles) -> dict:
+        """Create a safe globals dictionary for execution."""
         return {
-            "__builtins__": safe_builtins,
+            # Each namespace gets its own copy, so snippets cannot alter
+            # another's builtins
+            "__builtins__": dict(_SAFE_BUILTINS),
             "__name__": "__main__",
             "__doc__": None,
             # Add secure file functions
-            "secure_read_file": self._secure_read_file,
-            "secure_write_file": self._secure_write_file,
+            **files.globals(),
             "get_project_root": lambda: str(self.isolation.project_root),
         }
-
-    def _secure_read_file(self, path: str) -> str:
-        """Securely read a file within project isolation."""
-        validated_path = self.isolation.validate_path(path)
-        with open(validated_path, "r") as f:
-            return f.read()
-
-    def _secure_write_file(self, path: str, content: str) -> None:
-        """Securely write a file within project isolation."""
-        validated_path = self.isolation.validate_path(path)
-        validated_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(validated_path, "w") as f:
-            f.write(content)
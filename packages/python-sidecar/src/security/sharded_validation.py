@@ -0,0 +1,341 @@
+"""
+Parallel validation of large inputs on a process pool.
+
+Input of at least ``threshold_chars`` is cut at line ends into one shard per
+worker. Each shard is sent with the CONTEXT_LINES non-blank lines that
+follow it, since no rule match spans more lines than that. A worker
+reports the regex matches that start within the shard, with their input
+offsets and line positions. When a command injection rule's literals are
+present, one more worker parses the whole input for the AST call checks,
+alongside the shards.
+
+Matches are merged per rule in input order. A shard scanned from its first
+line can find a match that the previous shard's last match overlaps, which
+a single scan would not report. When that happens, the rule is rescanned
+from the end of that match until it finds one the shard also found. From
+that point the two scans agree. The merged findings go through the
+validator's numbering and scoring, so the result, IDs included, is the one
+``OWASPValidator.validate`` gives.
+"""
+
+import asyncio
+import math
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import structlog
+
+from ..execution.pool import get_worker_context
+from .owasp_validator import (
+    LineIndex,
+    OWASPValidator,
+    ScanState,
+    Span,
+    ValidationResult,
+    _CategoryTimer,
+    _fold,
+    _line_hashes,
+    _present,
+    _python_summary,
+)
+
+logger = structlog.get_logger(__name__)
+
+# A match's (start, end) input offsets and its (line, column, end line,
+# end column) span
+_Match = tuple[int, int, Span]
+
+
+def _warm() -> int:
+    """Run in each worker at start so the first request does not import the rules."""
+    return len(OWASPValidator._RULES)
+
+
+def _scan_shard(
+    text: str, offset: int, limit: int, first_line: int, timed: bool
+) -> tuple[list[list[_Match]], dict[str, float]]:
+    """
+    Regex matches of every rule starting before ``limit`` in ``text``.
+
+    ``text`` starts at input offset ``offset``, the start of line
+    ``first_line``; matches are returned in input terms, with the seconds
+    spent per rule category if ``timed``.
+    """
+    timer = _CategoryTimer(timed)
+    folded = _fold(text)
+    seen: dict[str, bool] = {}
+    lines: LineIndex | None = None
+    matches: list[list[_Match]] = []
+    for rule in OWASPValidator._RULES:
+        timer.enter(rule.category)
+        found = []
+        if rule.may_match(folded, seen):
+            for match in rule.regex.finditer(text):
+                start, end = match.span()
+                if start >= limit:
+                    break
+                if lines is None:
+                    lines = LineIndex(text)
+                line, column = lines.position(start)
+                end_line, end_column = lines.position(end)
+                span = (line + first_line - 1, column, end_line + first_line - 1, end_column)
+                found.append((offset + start, offset + end, span))
+        matches.append(found)
+    timer.stop()
+    return matches, timer.seconds
+
+
+def _call_spans(
+    code: str, rule_indexes: list[int], timed: bool
+) -> tuple[dict | None, dict[str, float]]:
+    """
+    AST call check findings of the given rules, or None if ``code`` is not
+    Python, with the seconds spent per rule category if ``timed``.
+    """
+    rules = OWASPValidator._RULES
+    timer = _CategoryTimer(timed)
+    # The parse is charged to the first rule that needs it, as in validate()
+    timer.enter(rules[rule_indexes[0]].category)
+    summary = _python_summary(code)
+    spans = None
+    if summary is not None:
+        spans = {}
+        for index in rule_indexes:
+            timer.enter(rules[index].category)
+            _, call_matches = rules[index].call_check
+            spans[index] = [
+                (call.line, call.column, call.end_line, call.end_column)
+                for call in summary.calls
+                if call_matches(call)
+            ]
+    timer.stop()
+    return spans, timer.seconds
+
+
+def _shard_bounds(code: str, shards: int, context_lines: int) -> list[tuple[int, int, int]]:
+    """Cut ``code`` at line ends into about ``shards`` pieces: (start, end, end with context)."""
+    size = len(code)
+    target = math.ceil(size / shards)
+    bounds = []
+    start = 0
+    while start < size:
+        end = code.find("\n", start + target - 1) + 1 or size
+        # Follow the shard with enough non-blank lines to complete its matches
+        context_end = end
+        remaining = context_lines
+        while remaining and context_end < size:
+            line_end = code.find("\n", context_end) + 1 or size
+            if not code[context_end:line_end].isspace():
+                remaining -= 1
+            context_end = line_end
+        bounds.append((start, end, context_end))
+        start = end
+    return bounds
+
+
+class _LazyLineIndex:
+    """A LineIndex of the whole input, built only if a merge needs one."""
+
+    def __init__(self, code: str):
+        self.code = code
+        self._index: LineIndex | None = None
+
+    def span(self, start: int, end: int) -> Span:
+        if self._index is None:
+            self._index = LineIndex(self.code)
+        return (*self._index.position(start), *self._index.position(end))
+
+
+class ShardedValidator:
+    """
+    Validates inputs of ``threshold_chars`` or more across ``workers`` processes.
+
+    Args:
+        validator: Validator used for smaller inputs and to number and score results
+        workers: Worker processes (fewer than 2 disables sharding)
+        threshold_chars: Smallest input that is sharded
+        start_method: multiprocessing start method for the workers
+    """
+
+    def __init__(
+        self,
+        validator: OWASPValidator,
+        workers: int,
+        threshold_chars: int,
+        start_method: str = "forkserver",
+    ):
+        self.validator = validator
+        self.workers = workers
+        self.threshold_chars = max(1, threshold_chars)
+        self.start_method = start_method
+        self.sharded = 0
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers >= 2
+
+    def start(self) -> None:
+        """Start the worker processes (no-op when sharding is disabled)."""
+        if not self.enabled or self._pool is not None:
+            return
+        self._pool = self._new_pool()
+        logger.info(
+            "Validation workers started",
+            workers=self.workers,
+            threshold_chars=self.threshold_chars,
+        )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=get_worker_context(self.start_method)
+        )
+        for _ in range(self.workers):
+            pool.submit(_warm)
+        return pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a new pool for ``broken``, unless another request already has."""
+        # Runs on the event loop, so the check and swap cannot interleave
+        if self._pool is not broken:
+            return
+        logger.warning("Validation worker pool broke, restarting it")
+        self._pool = self._new_pool()
+        # The broken pool's processes are gone; do not wait for its threads
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def should_shard(self, code: str) -> bool:
+        return self._pool is not None and len(code) >= self.threshold_chars
+
+    async def validate(self, code: str) -> ValidationResult:
+        """Validate ``code``, across the workers if it is large enough."""
+        if not self.should_shard(code):
+            return self.validator.validate(code)
+        pool = self._pool
+        try:
+            return await self._validate_sharded(pool, code)
+        except BrokenProcessPool:
+            # A worker died (e.g. it was killed for memory); replace them all
+            self._replace_pool(pool)
+            return self.validator.validate(code)
+
+    async def _validate_sharded(self, pool: ProcessPoolExecutor, code: str) -> ValidationResult:
+        rules = self.validator._RULES
+        observe = self.validator._observe_category
+        # Rule time in the workers and in the merge, summed per category
+        timer = _CategoryTimer(observe is not None)
+        bounds = _shard_bounds(code, self.workers, self.validator.CONTEXT_LINES)
+        loop = asyncio.get_running_loop()
+        shard_futures = []
+        first_line = 1
+        for start, end, context_end in bounds:
+            shard_futures.append(
+                loop.run_in_executor(
+                    pool,
+                    _scan_shard,
+                    code[start:context_end],
+                    start,
+                    end - start,
+                    first_line,
+                    timer.enabled,
+                )
+            )
+            first_line += code.count("\n", start, end)
+
+        # Rules whose AST call check applies, as in validate()
+        folded = _fold(code)
+        seen: dict[str, bool] = {}
+        call_rules = [
+            index
+            for index, rule in enumerate(rules)
+            if rule.call_check is not None
+            and all(_present(keyword, folded, seen) for keyword in rule.call_check[0])
+        ]
+        ast_future = (
+            loop.run_in_executor(pool, _call_spans, code, call_rules, timer.enabled)
+            if call_rules
+            else None
+        )
+
+        # Awaited together so a broken pool leaves no exception unretrieved
+        if ast_future is not None:
+            *shard_results, (call_spans, call_seconds) = await asyncio.gather(
+                *shard_futures, ast_future
+            )
+        else:
+            shard_results = await asyncio.gather(*shard_futures)
+            call_spans, call_seconds = None, {}
+        shard_matches = [matches for matches, _ in shard_results]
+        for seconds in [call_seconds, *(seconds for _, seconds in shard_results)]:
+            for category, category_seconds in seconds.items():
+                timer.add(category, category_seconds)
+
+        lines = _LazyLineIndex(code)
+        spans_by_rule = []
+        from_ast = []
+        for index, rule in enumerate(rules):
+            timer.enter(rule.category)
+            if call_spans is not None and index in call_spans:
+                spans_by_rule.append(tuple(call_spans[index]))
+                from_ast.append(True)
+                continue
+            from_ast.append(False)
+            if rule.call_check is not None and index not in call_rules:
+                # Its literals are absent, so the regex cannot match either
+                spans_by_rule.append(())
+                continue
+
+            matches = self._merge(
+                rule, [shard[index] for shard in shard_matches], bounds, code, lines
+            )
+            spans_by_rule.append(tuple(span for _, _, span in matches))
+        timer.stop()
+        timer.report(observe)
+
+        self.sharded += 1
+        logger.debug("Sharded validation", chars=len(code), shards=len(bounds))
+        return self.validator._result(
+            ScanState(
+                line_count=code.count("\n") + 1,
+                line_hashes=_line_hashes(code),
+                spans=tuple(spans_by_rule),
+                from_ast=tuple(from_ast),
+            )
+        )
+
+    @staticmethod
+    def _merge(
+        rule,
+        shards: list[list[_Match]],
+        bounds: list[tuple[int, int, int]],
+        code: str,
+        lines: "_LazyLineIndex",
+    ) -> list[_Match]:
+        """Join one rule's per-shard matches into the matches of a single scan."""
+        merged: list[_Match] = []
+        last_end = 0
+        for matches, (_, shard_end, _) in zip(shards, bounds):
+            if not matches or matches[0][0] >= last_end:
+                merged.extend(matches)
+            else:
+                # The previous shard's last match overlaps this shard's first
+                # ones; rescan until both scans find the same match
+                starts = [start for start, _, _ in matches]
+                for match in rule.regex.finditer(code, last_end):
+                    start, end = match.span()
+                    if start >= shard_end:
+                        break
+                    index = bisect_left(starts, start)
+                    if index < len(matches) and matches[index][:2] == (start, end):
+                        merged.extend(matches[index:])
+                        break
+                    merged.append((start, end, lines.span(start, end)))
+            if merged:
+                last_end = merged[-1][1]
+        return merged
@@ -0,0 +1,53 @@
+"""
+Content-addressed cache of OWASP validation results.
+
+Results are keyed by the SHA-256 of the validated text together with the
+validator's rule-set version, so a rule change never serves stale findings.
+Each result keeps the ScanState it was computed from, so a cached result can
+serve as the base of an incremental revalidation.
+"""
+
+from ..cache import CacheStats, LRUCache
+from .owasp_validator import OWASPValidator, ValidationResult
+
+# Rough per-finding overhead of the dataclass and its small fields
+_VULNERABILITY_OVERHEAD = 400
+# Rough size of one rule's span tuple in a ScanState, and of one span in it
+_RULE_SCAN_OVERHEAD = 60
+_SPAN_OVERHEAD = 120
+# An int in a ScanState's line hashes, with its tuple slot
+_LINE_HASH_OVERHEAD = 40
+
+
+def _estimate_size(result: ValidationResult) -> int:
+    size = 200
+    for v in result.vulnerabilities:
+        size += _VULNERABILITY_OVERHEAD + len(v.title) + len(v.description)
+    if result.scan is not None:
+        size += _LINE_HASH_OVERHEAD * len(result.scan.line_hashes)
+        for spans in result.scan.spans:
+            size += _RULE_SCAN_OVERHEAD + _SPAN_OVERHEAD * len(spans)
+    return size
+
+
+class ValidationCache:
+    """LRU cache of ValidationResults bounded by entries and bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.ruleset_version = OWASPValidator.RULESET_VERSION
+        self._cache: LRUCache[tuple[str, str], ValidationResult] = LRUCache(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            sizeof=_estimate_size,
+        )
+
+    def get(self, digest: str) -> ValidationResult | None:
+        """Look up a result by content hash."""
+        return self._cache.get((self.ruleset_version, digest))
+
+    def put(self, digest: str, result: ValidationResult) -> None:
+        """Store the result for a content hash."""
+        self._cache.put((self.ruleset_version, digest), result)
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
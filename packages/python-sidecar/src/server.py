@@ -0,0 +1,304 @@
+"""
+Sidecar entrypoint: serve the app on TCP, a Unix domain socket, or both.
+
+Run with ``python -m src.server``. When the agent runs in the same pod or
+host, pointing it at the socket (SIDECAR_UDS_PATH) avoids the TCP loopback
+stack on every request; set SIDECAR_PORT=0 to serve on the socket only.
+
+With SIDECAR_HTTP_WORKERS > 1 the parent imports the app once (compiling
+the validator rules and building the executor's globals template), moves
+everything it has loaded into the garbage collector's permanent generation
+and forks that many workers, which accept on the inherited listeners and
+share the preloaded memory copy-on-write. The parent only supervises: it
+restarts workers that exit unexpectedly and stops them all on SIGTERM or
+SIGINT. Each worker has its own execution pool, admission lane, caches and
+/metrics (every series is labelled with the worker's index), and persistent
+sessions are unavailable since a session's calls could land on any worker.
+"""
+
+import gc
+import importlib
+import os
+import signal
+import socket
+import stat
+import threading
+import time
+
+import structlog
+import uvicorn
+from uvicorn.importer import import_from_string
+
+from .config import SidecarSettings, get_settings
+from .logging_config import configure_logging, stop_logging
+from .startup import report as startup_report
+
+logger = structlog.get_logger(__name__)
+
+# Dependencies imported (and timed) before the app itself
+PRELOAD_IMPORTS = ("pydantic", "fastapi")
+# Time workers get to finish in-flight requests on shutdown
+SHUTDOWN_GRACE_S = 30.0
+# A worker that exits sooner than this after starting is restarted with a
+# growing delay, up to MAX_RESTART_DELAY_S
+MIN_WORKER_UPTIME_S = 10.0
+MAX_RESTART_DELAY_S = 10.0
+
+
+def _tcp_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    return socket.create_server((host, port), family=family, backlog=2048)
+
+
+def _unix_socket(path: str, mode: int) -> socket.socket:
+    """Bind a listening Unix socket at ``path``, replacing a stale socket file."""
+    try:
+        if stat.S_ISSOCK(os.lstat(path).st_mode):
+            os.unlink(path)
+        else:
+            raise ValueError(f"SIDECAR_UDS_PATH exists and is not a socket: {path}")
+    except FileNotFoundError:
+        pass
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(path)
+        os.chmod(path, mode)
+        sock.listen(2048)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def bind_sockets(settings: SidecarSettings) -> list[socket.socket]:
+    """Open the configured listeners."""
+    if not settings.port and not settings.uds_path:
+        raise ValueError("No listener configured: set SIDECAR_PORT and/or SIDECAR_UDS_PATH")
+
+    sockets = []
+    try:
+        if settings.port:
+            sockets.append(_tcp_socket(settings.host, settings.port))
+        if settings.uds_path:
+            sockets.append(_unix_socket(settings.uds_path, settings.uds_mode))
+    except Exception:
+        for sock in sockets:
+            sock.close()
+        raise
+    return sockets
+
+
+def load_app(app):
+    """Import ``app`` if it is given as "module:attribute", timing the imports."""
+    if not isinstance(app, str):
+        return app
+    for module in PRELOAD_IMPORTS:
+        importlib.import_module(module)
+        startup_report.mark(f"import {module}")
+    app = import_from_string(app)
+    startup_report.mark("import app")
+    return app
+
+
+def _serve(app, sockets: list[socket.socket]) -> None:
+    config = uvicorn.Config(
+        app,
+        # Records are written by the app's own log handler
+        log_config=None,
+    )
+    server = uvicorn.Server(config)
+    try:
+        server.run(sockets=sockets)
+    except KeyboardInterrupt:
+        # The server has already shut down gracefully, as uvicorn.run() does
+        pass
+
+
+def _exit_gracefully(signum, frame) -> None:
+    raise SystemExit(0)
+
+
+class Supervisor:
+    """
+    Forks HTTP workers from this preloaded process and keeps them running.
+
+    Args:
+        app: The loaded ASGI app
+        sockets: Listeners the workers accept on
+        settings: Sidecar settings (worker count, logging)
+    """
+
+    _SIGNALS = {signal.SIGCHLD, signal.SIGTERM, signal.SIGINT}
+
+    def __init__(self, app, sockets: list[socket.socket], settings: SidecarSettings):
+        self.app = app
+        self.sockets = sockets
+        self.settings = settings
+        # pid -> (worker index, monotonic start time)
+        self._workers: dict[int, tuple[int, float]] = {}
+        # Worker index -> (monotonic time it may be restarted, delay used)
+        self._restarts: dict[int, tuple[float, float]] = {}
+
+    def run(self) -> None:
+        """Fork the workers and supervise them until SIGTERM or SIGINT."""
+        # Signals are handled synchronously below instead of interrupting
+        # whatever the loop is doing; workers unblock them after forking
+        signal.pthread_sigmask(signal.SIG_BLOCK, self._SIGNALS)
+        try:
+            self._preload()
+            for index in range(self.settings.http_workers):
+                self._spawn(index)
+            logger.info(
+                "HTTP workers started",
+                workers=self.settings.http_workers,
+                preload_ms=int(startup_report.total_s * 1000),
+            )
+
+            while True:
+                received = signal.sigtimedwait(self._SIGNALS, 1.0)
+                self._reap()
+                if received is not None and received.si_signo != signal.SIGCHLD:
+                    logger.info("Stopping HTTP workers", signal=signal.strsignal(received.si_signo))
+                    break
+                self._restart_due()
+        finally:
+            self._stop()
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, self._SIGNALS)
+
+    def _preload(self) -> None:
+        # A thread running at fork time (such as the background log writer)
+        # could leave locks held in the children
+        stop_logging()
+        others = [
+            thread.name for thread in threading.enumerate() if thread is not threading.main_thread()
+        ]
+        if others:
+            logger.warning("Threads running before fork", threads=others)
+
+        # Keep the collector from touching (and so copying) preloaded objects
+        gc.collect()
+        gc.freeze()
+        startup_report.mark("preload")
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid:
+            self._workers[pid] = (index, time.monotonic())
+            return
+
+        code = 1
+        try:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, self._SIGNALS)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            # Used before uvicorn installs its handlers, and by the signal
+            # uvicorn re-raises once it has shut down
+            signal.signal(signal.SIGTERM, _exit_gracefully)
+            signal.signal(signal.SIGINT, _exit_gracefully)
+
+            startup_report.forked(index)
+            configure_logging(self.settings)
+            _serve(self.app, self.sockets)
+            code = 0
+        except SystemExit:
+            code = 0
+        except BaseException:
+            logger.exception("HTTP worker failed", worker=index)
+        finally:
+            stop_logging()
+            # Skip the parent's cleanup (atexit handlers, socket unlinking)
+            os._exit(code)
+
+    def _reap(self) -> None:
+        """Collect exited workers and schedule their restarts."""
+        while self._workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            entry = self._workers.pop(pid, None)
+            if entry is None:
+                continue
+
+            index, started = entry
+            uptime_s = time.monotonic() - started
+            delay = 0.0
+            if uptime_s < MIN_WORKER_UPTIME_S:
+                previous = self._restarts.get(index, (0.0, 0.0))[1]
+                delay = min(max(previous * 2, 0.5), MAX_RESTART_DELAY_S)
+            logger.warning(
+                "HTTP worker exited",
+                worker=index,
+                pid=pid,
+                exit_code=os.waitstatus_to_exitcode(status),
+                uptime_s=round(uptime_s, 1),
+                restart_in_s=delay,
+            )
+            self._restarts[index] = (time.monotonic() + delay, delay)
+
+    def _restart_due(self) -> None:
+        running = {index for index, _ in self._workers.values()}
+        now = time.monotonic()
+        for index, (due, delay) in list(self._restarts.items()):
+            if index in running or now < due:
+                continue
+            self._spawn(index)
+            # Keep the delay so a crash loop keeps backing off
+            self._restarts[index] = (float("inf"), delay)
+
+    def _stop(self) -> None:
+        """Ask every worker to shut down gracefully, then kill stragglers."""
+        for pid in self._workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + SHUTDOWN_GRACE_S
+        while self._workers and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self._workers.pop(pid, None)
+            else:
+                time.sleep(0.05)
+
+        for pid in self._workers:
+            logger.warning("Killing HTTP worker after shutdown timeout", pid=pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._workers.clear()
+
+
+def main(app="src.main:app") -> None:
+    """Serve ``app`` (an ASGI app or its import string) on the configured listeners."""
+    settings = get_settings()
+    sockets = bind_sockets(settings)
+    try:
+        app = load_app(app)
+        if settings.http_workers > 1:
+            Supervisor(app, sockets, settings).run()
+        else:
+            # uvicorn re-raises SIGTERM after shutting down; exit normally
+            # so the listeners are cleaned up
+            signal.signal(signal.SIGTERM, _exit_gracefully)
+            _serve(app, sockets)
+    finally:
+        for sock in sockets:
+            sock.close()
+        if settings.uds_path:
+            try:
+                os.unlink(settings.uds_path)
+            except OSError:
+                pass
+
+
+if __name__ == "__main__":
+    main()
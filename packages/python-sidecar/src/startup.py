@@ -0,0 +1,88 @@
+"""
+Startup timing report.
+
+Each serving process records how long the phases of its start took, from
+interpreter start until it is ready to serve, and logs them once as
+"Startup complete" (warning when SIDECAR_STARTUP_BUDGET_MS is exceeded).
+A forked HTTP worker inherits the phases its parent spent importing and
+preloading the app, then adds its own time from fork to ready, so every
+report covers that worker's full cold start. The total is also exported
+as the sidecar_startup_seconds gauge.
+"""
+
+import os
+import time
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+def _process_age_s() -> float:
+    """Seconds since this process was started, or 0.0 where /proc is unavailable."""
+    try:
+        with open("/proc/self/stat") as f:
+            stat = f.read()
+        with open("/proc/uptime") as f:
+            uptime_s = float(f.read().split()[0])
+        # starttime is field 22; fields after the command name start at 3
+        start_ticks = int(stat.rpartition(")")[2].split()[19])
+        return max(0.0, uptime_s - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupReport:
+    """Durations of the startup phases of this process, in order."""
+
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+        self.worker: int | None = None
+        self.completed = False
+        self._last = time.perf_counter()
+        # Everything before this module was imported: interpreter start-up
+        # and whatever the entrypoint imported first
+        age = _process_age_s()
+        if age:
+            self.phases.append(("interpreter", age))
+
+    @property
+    def total_s(self) -> float:
+        return sum(duration for _, duration in self.phases)
+
+    def mark(self, phase: str) -> None:
+        """End ``phase`` now; it started when the previous one ended."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def forked(self, worker: int) -> None:
+        """Start timing a forked worker; the parent's phases are kept."""
+        self.worker = worker
+        self._last = time.perf_counter()
+
+    def complete(self, phase: str, budget_ms: int = 0) -> None:
+        """End the final ``phase`` and log the report (once per process)."""
+        if self.completed:
+            return
+        self.mark(phase)
+        self.completed = True
+
+        total_ms = int(self.total_s * 1000)
+        fields = {
+            "total_ms": total_ms,
+            "phases_ms": {name: round(duration * 1000, 1) for name, duration in self.phases},
+        }
+        if self.worker is not None:
+            fields["worker"] = self.worker
+
+        logger.info("Startup complete", **fields)
+        if budget_ms and total_ms > budget_ms:
+            slowest = max(self.phases, key=lambda item: item[1])[0]
+            logger.warning(
+                "Startup exceeded its budget", budget_ms=budget_ms, slowest_phase=slowest, **fields
+            )
+
+
+# The report of this process
+report = StartupReport()
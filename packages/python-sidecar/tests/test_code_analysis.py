@@ -0,0 +1,30 @@
+"""Tests for the AST snippet analysis."""
+
+from src.security.code_analysis import parse_snippet
+from src.security.owasp_validator import OWASPValidator
+
+DEEPLY_NESTED = "import os\nos.system('ls ' + cmd)\ny = " + "a+" * 2000 + "a"
+
+
+def test_parse_snippet_collects_calls():
+    tree, summary = parse_snippet("import os as o\no.system('ls ' + cmd)\n")
+
+    assert tree is not None
+    assert summary.syntax_error is None
+    assert [call.name for call in summary.calls] == ["os.system"]
+    assert summary.calls[0].concatenated
+
+
+def test_parse_snippet_treats_deep_nesting_as_unparsed():
+    tree, summary = parse_snippet(DEEPLY_NESTED)
+
+    assert tree is None
+    assert summary.syntax_error
+    assert summary.calls == ()
+
+
+def test_validator_falls_back_to_patterns_on_deep_nesting():
+    result = OWASPValidator().validate(DEEPLY_NESTED)
+
+    assert not result.valid
+    assert [v.title for v in result.vulnerabilities] == ["os.system with concatenation"]
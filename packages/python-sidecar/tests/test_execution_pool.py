@@ -0,0 +1,67 @@
+"""Tests for the process execution pool."""
+
+import pytest
+
+from src.execution.pool import ExecutionPool
+from src.execution.worker import ExecutionJob
+
+
+@pytest.fixture
+def pool():
+    pool = ExecutionPool(size=1, start_method="fork")
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def _fail_spawn():
+    raise RuntimeError("Execution worker failed to start")
+
+
+def test_failed_respawn_keeps_the_slot(pool, tmp_path, monkeypatch):
+    job = ExecutionJob(project_root=str(tmp_path), code="result = 6 * 7")
+
+    # A recycle whose replacement cannot start leaves an empty slot
+    monkeypatch.setattr(pool, "_spawn_worker", _fail_spawn)
+    assert pool._replace_worker(pool._idle.get(), "test") is None
+    pool._idle.put(None)
+
+    result = pool.submit(job).result(timeout=10)
+    assert not result.success
+    assert "could be started" in result.error
+    assert pool._idle.qsize() == 1
+
+    # Once spawning works again the next job refills the slot
+    monkeypatch.undo()
+    result = pool.submit(job).result(timeout=30)
+    assert result.success
+    assert result.result == "42"
+    assert pool._idle.get(timeout=1) is not None
+
+
+def test_killed_worker_returns_partial_output(tmp_path):
+    pool = ExecutionPool(size=1, start_method="fork", kill_grace_ms=300)
+    pool.start()
+    # Swallows its timeout interruption, so the pool has to kill the worker
+    code = (
+        "print('started')\n"
+        "while True:\n"
+        "    try:\n"
+        "        while True:\n"
+        "            pass\n"
+        "    except:\n"
+        "        pass\n"
+    )
+    try:
+        job = ExecutionJob(project_root=str(tmp_path), code=code, timeout_ms=200)
+        result = pool.submit(job).result(timeout=10)
+        assert result.timed_out
+        assert result.output == "started\n"
+
+        # Output still arrives in the reply of a job that completes
+        job = ExecutionJob(project_root=str(tmp_path), code="print('done')")
+        result = pool.submit(job).result(timeout=30)
+        assert result.success
+        assert result.output == "done\n"
+    finally:
+        pool.shutdown()
@@ -0,0 +1,96 @@
+"""Tests for incremental revalidation from a cached base."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.cache import content_hash
+from src.main import app
+from src.security.owasp_validator import LineEdit, OWASPValidator
+
+BASE = "import os\n\nx = 1\nos.system('ls ' + path)\ny = 2\n"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_revalidate_matches_full_validation():
+    validator = OWASPValidator()
+    base = validator.validate(BASE)
+    revised = BASE.replace("x = 1\n", "x = 1\neval(user_input + suffix)\n")
+
+    result = validator.revalidate(revised, base.scan, [LineEdit(4, 0, 4, 1)])
+
+    assert result == validator.validate(revised)
+    assert result.scan.line_hashes == validator.validate(revised).scan.line_hashes
+
+
+def test_revalidate_rejects_edits_that_disagree_with_the_base():
+    validator = OWASPValidator()
+    base = validator.validate("x = 1\n")
+
+    # Same line count, no edits claimed, different text
+    with pytest.raises(ValueError, match="differ from the base"):
+        validator.revalidate("eval(user_input)\n", base.scan, [])
+
+    # An edit that covers line 1 but leaves a changed line 3 unclaimed
+    base = validator.validate("a = 1\nb = 2\nc = 3\n")
+    with pytest.raises(ValueError, match="differ from the base"):
+        validator.revalidate(
+            "a = 2\nb = 2\neval(user_input)\n", base.scan, [LineEdit(1, 1, 1, 1)]
+        )
+
+
+def test_forged_base_falls_back_to_full_scan(client):
+    client.post("/validate/code", json={"code": "x = 1\n"})
+
+    # Same line count as the base, and edits claiming nothing changed
+    response = client.post(
+        "/validate/code",
+        json={"code": "eval(user_input)\n", "baseHash": content_hash("x = 1\n"), "changes": []},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Validation"] == "full"
+    assert not response.json()["valid"]
+
+
+def test_forged_base_does_not_poison_the_cache(client):
+    client.post("/validate/code", json={"code": "z = 1\n"})
+    code = "eval(request_input)\n"
+    client.post(
+        "/validate/code",
+        json={
+            "code": code,
+            "baseHash": content_hash("z = 1\n"),
+            "patch": "@@ -1,0 +1,0 @@\n",
+        },
+    )
+
+    single = client.post("/validate/code", json={"code": code})
+    batch = client.post("/validate/code:batch", json={"items": [{"code": code}]})
+
+    assert single.headers["X-Cache"] == "HIT"
+    assert not single.json()["valid"]
+    assert not batch.json()["results"][0]["valid"]
+
+
+def test_matching_edit_is_revalidated_incrementally(client):
+    client.post("/validate/code", json={"code": BASE})
+    revised = BASE.replace("y = 2\n", "y = 3\n")
+
+    response = client.post(
+        "/validate/code",
+        json={
+            "code": revised,
+            "baseHash": content_hash(BASE),
+            "changes": [{"oldStart": 5, "oldLines": 1, "newStart": 5, "newLines": 1}],
+        },
+    )
+
+    assert response.headers["X-Validation"] == "incremental"
+    full = OWASPValidator().validate(revised)
+    assert response.json()["valid"] == full.valid
+    assert len(response.json()["vulnerabilities"]) == len(full.vulnerabilities)
@@ -0,0 +1,17 @@
+"""Tests for the Prometheus metrics registry."""
+
+from src.metrics import Metrics
+
+
+def test_every_series_is_labelled_with_the_worker():
+    metrics = Metrics(categories=["A03:2021-Injection-SQL"])
+    metrics.register_endpoints(["/validate/code"])
+    metrics.register_gauge("sidecar_test_gauge", "A gauge.", lambda: 1)
+    metrics.register_counter("sidecar_test_total", "A counter.", lambda: 2)
+    metrics.set_worker(3)
+
+    samples = [line for line in metrics.render().splitlines() if not line.startswith("#")]
+
+    assert samples
+    assert all('{worker="3",' in line or '{worker="3"}' in line for line in samples)
+    assert 'sidecar_test_total{worker="3"} 2' in samples
@@ -0,0 +1,71 @@
+"""Tests for the OWASP validator's rule prefiltering."""
+
+import re
+import sys
+
+import pytest
+
+from src.security.owasp_validator import OWASPValidator, _fold
+
+SAMPLES = [
+    "x = 'INSERT INTO t VALUES (' + a",
+    "q = \"SELECT * FROM t WHERE id = '\" + x",
+    "q = 'UPDATE t SET a = ' + b",
+    "q = 'DELETE FROM t WHERE a = ' + b",
+    "cursor.execute('SELECT ' + x)",
+    "q = f'{x} select insert update delete'",
+    "el.innerHTML = html",
+    "document.write(html)",
+    "eval(user_input)",
+    "<div onclick='go()'><script>x</script></div>",
+    "os.system('ls ' + path)",
+    "subprocess.run('ls ' + path, shell=True)",
+    "exec(code + suffix)",
+    "os.popen(cmd)",
+    "open('/etc/passwd'); open('/etc/shadow'); p = 'C:\\\\Windows'",
+    "requests.post(url + path); urllib.request.urlopen(url + path)",
+    "import http.client; h = 'localhost'",
+]
+
+# Stand-ins that re.IGNORECASE matches against the ASCII letters they replace
+SUBSTITUTES = {"i": ["\u0130", "\u0131"], "s": ["\u017f"]}
+
+
+def _variants(text: str) -> list[str]:
+    variants = []
+    for letter, substitutes in SUBSTITUTES.items():
+        for substitute in substitutes:
+            variants.append(re.sub(letter, substitute, text, flags=re.IGNORECASE))
+    variants.append(
+        text.replace("I", "\u0130").replace("i", "\u0131").replace("s", "\u017f")
+    )
+    return variants
+
+
+def test_fold_lowers_every_ignorecase_match_of_an_ascii_letter():
+    chars = "".join(
+        chr(codepoint)
+        for codepoint in range(128, sys.maxunicode + 1)
+        if not 0xD800 <= codepoint < 0xE000
+    )
+    for char in re.findall("[a-z]", chars, re.IGNORECASE):
+        folded = _fold(char)
+        assert len(folded) == 1 and folded.isascii(), hex(ord(char))
+        assert re.fullmatch(folded, char, re.IGNORECASE), hex(ord(char))
+
+
+@pytest.mark.parametrize("text", [v for s in SAMPLES for v in [s, *_variants(s)]])
+def test_prefilter_never_skips_a_matching_rule(text):
+    folded = _fold(text)
+    for rule in OWASPValidator._RULES:
+        if rule.regex.search(text):
+            assert rule.may_match(folded, {}), (rule.title, text)
+
+
+def test_dotted_capital_i_does_not_bypass_validation():
+    validator = OWASPValidator()
+    plain = validator.validate("x = 'Insert into t values (' + a")
+    dotted = validator.validate("x = '\u0130nsert into t values (' + a")
+
+    assert not dotted.valid
+    assert dotted == plain
@@ -0,0 +1,48 @@
+"""Tests for persistent execution sessions."""
+
+import multiprocessing
+import os
+
+import pytest
+
+from src.execution import sessions
+from src.execution.sessions import SessionManager
+
+
+@pytest.fixture
+def manager():
+    manager = SessionManager(max_sessions=4, idle_ttl_s=60, start_method="fork")
+    manager.start()
+    yield manager
+    manager.shutdown()
+
+
+def _open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_session_runs_against_retained_globals(manager, tmp_path):
+    session_id = manager.create(str(tmp_path))
+
+    manager.execute(session_id, "x = 20")
+    result = manager.execute(session_id, "result = x + 22")
+
+    assert result.success
+    assert result.result == "42"
+
+
+@pytest.mark.parametrize("timeout_s", [sessions.SESSION_START_TIMEOUT_S, 0])
+def test_failed_create_releases_pipe_and_process(manager, tmp_path, monkeypatch, timeout_s):
+    manager.create(str(tmp_path))  # warm up lazily opened descriptors
+    fds = _open_fds()
+    # A missing project root fails in the worker; no time to start times out
+    monkeypatch.setattr(sessions, "SESSION_START_TIMEOUT_S", timeout_s)
+    project_root = str(tmp_path / "missing") if timeout_s else str(tmp_path)
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            manager.create(project_root)
+
+    assert _open_fds() == fds
+    assert manager.active_sessions == 1
+    assert len(multiprocessing.active_children()) == 1
@@ -0,0 +1,43 @@
+"""Tests for sharded validation on a process pool."""
+
+import asyncio
+import os
+import signal
+
+import pytest
+
+from src.security.owasp_validator import OWASPValidator
+from src.security.sharded_validation import ShardedValidator
+
+LARGE_CODE = "x = 1\n" * 2000 + "os.system('ls ' + cmd)\n" + "y = 2\n" * 2000
+
+
+@pytest.fixture
+def sharded():
+    sharded = ShardedValidator(OWASPValidator(), workers=2, threshold_chars=1000)
+    sharded.start()
+    yield sharded
+    sharded.shutdown()
+
+
+async def test_sharded_result_matches_single_scan(sharded):
+    result = await sharded.validate(LARGE_CODE)
+
+    assert sharded.sharded == 1
+    assert result == OWASPValidator().validate(LARGE_CODE)
+
+
+async def test_broken_pool_is_replaced_once(sharded):
+    await sharded.validate(LARGE_CODE)
+    broken = sharded._pool
+    for pid in list(broken._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    expected = OWASPValidator().validate(LARGE_CODE)
+    results = await asyncio.gather(*(sharded.validate(LARGE_CODE) for _ in range(3)))
+
+    assert results == [expected] * 3
+    replacement = sharded._pool
+    assert replacement is not broken
+    assert await sharded.validate(LARGE_CODE) == expected
+    assert sharded._pool is replacement
@@ -0,0 +1,61 @@
+"""Tests that every validation path reports per-category rule time."""
+
+from collections import Counter
+
+import pytest
+
+from src.security.owasp_validator import LineEdit, OWASPValidator
+from src.security.sharded_validation import ShardedValidator
+
+CODE = "import os\nx = 1\nos.system('ls ' + path)\n" * 200
+
+
+@pytest.fixture
+def observed():
+    return Counter()
+
+
+@pytest.fixture
+def validator(observed):
+    return OWASPValidator(observe_category=lambda category, seconds: observed.update([category]))
+
+
+def _once_per_category(observed: Counter) -> bool:
+    return observed == Counter(list(OWASPValidator.CATEGORIES))
+
+
+def test_validate_observes_each_category_once(validator, observed):
+    validator.validate(CODE)
+
+    assert _once_per_category(observed)
+
+
+def test_revalidate_observes_each_category_once(validator, observed):
+    base = OWASPValidator().validate(CODE)
+
+    validator.revalidate(CODE + "y = 2\n", base.scan, [LineEdit(601, 0, 601, 1)])
+
+    assert _once_per_category(observed)
+
+
+def test_stream_observes_each_category_once_at_the_end(validator, observed):
+    scanner = validator.stream(chunk_chars=256)
+    for start in range(0, len(CODE), 100):
+        scanner.feed(CODE[start : start + 100])
+    assert not observed
+
+    scanner.finish()
+
+    assert _once_per_category(observed)
+
+
+async def test_sharded_validation_observes_each_category_once(validator, observed):
+    sharded = ShardedValidator(validator, workers=2, threshold_chars=1000)
+    sharded.start()
+    try:
+        await sharded.validate(CODE)
+    finally:
+        sharded.shutdown()
+
+    assert sharded.sharded == 1
+    assert _once_per_category(observed)